@@ -3,7 +3,7 @@ API v1 routes
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import serial, session, commands, health, test_results
+from app.api.v1.endpoints import serial, session, commands, health, test_results, workflow, dispatcher, fixtures
 from app.api.v1 import websocket
 
 api_router = APIRouter()
@@ -14,4 +14,7 @@ api_router.include_router(session.router, prefix="/session", tags=["会话管理
 api_router.include_router(serial.router, prefix="/serial", tags=["串口通信"])
 api_router.include_router(commands.router, prefix="/commands", tags=["指令管理"])
 api_router.include_router(test_results.router, prefix="/test-results", tags=["测试结果"])
+api_router.include_router(workflow.router, prefix="/workflow", tags=["工作流"])
+api_router.include_router(dispatcher.router, prefix="/dispatcher", tags=["多工装调度"])
+api_router.include_router(fixtures.router, prefix="/fixtures", tags=["工装配置"])
 api_router.include_router(websocket.router, prefix="/ws", tags=["WebSocket", "实时通信"])
\ No newline at end of file
@@ -14,7 +14,8 @@ from app.schemas.command_schemas import (
     SavedCommand, 
     CreateCommandRequest, 
     UpdateCommandRequest, 
-    CommandsListResponse
+    CommandsListResponse,
+    CommandTimeoutInfo
 )
 
 logger = logging.getLogger(__name__)
@@ -67,6 +68,29 @@ async def create_command(
         return APIResponse.error(code=500, msg="指令创建失败")
 
 
+@router.get("/timeouts", response_model=APIResponse[List[CommandTimeoutInfo]])
+async def get_command_timeouts():
+    """获取每条指令的超时设置与各串口历史耗时（p50/p99）及学习到的超时"""
+    try:
+        timeouts = await command_service.get_command_timeouts()
+        return APIResponse.success(data=timeouts, msg=f"获取到 {len(timeouts)} 条指令的超时信息")
+        
+    except Exception as e:
+        logger.error(f"Error getting command timeouts: {e}")
+        return APIResponse.error(code=500, msg="获取指令超时信息失败")
+
+
+@router.delete("/{command_id}/latency", response_model=APIResponse)
+async def reset_command_latency(
+    command_id: str,
+    session_id: Optional[str] = Depends(get_session_id_from_header)
+):
+    """清除指令的历史耗时统计，重新学习超时"""
+    if not await command_service.reset_command_latency(command_id):
+        return APIResponse.error(code=404, msg="指令不存在")
+    return APIResponse.success(msg="已清除指令耗时统计")
+
+
 @router.get("/{command_id}", response_model=APIResponse[SavedCommand])
 async def get_command(command_id: str):
     """根据ID获取指令详情"""
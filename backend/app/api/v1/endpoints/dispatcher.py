@@ -0,0 +1,61 @@
+"""
+Dispatcher API Endpoints
+多工装调度API端点
+"""
+
+import logging
+from fastapi import APIRouter, Depends
+
+from app.core.response import APIResponse
+from app.core.dependencies import validate_session_dependency
+from app.services.dispatcher_service import dispatcher_service
+from app.schemas.dispatcher_schemas import (
+    DispatchEnqueueRequest,
+    DispatcherStartRequest,
+    DispatcherStatus
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/status", response_model=APIResponse[DispatcherStatus])
+async def get_status():
+    """获取调度状态与各串口产能（每小时完成单元数）"""
+    return APIResponse.success(data=dispatcher_service.get_status(), msg="获取调度状态成功")
+
+
+@router.post("/units", response_model=APIResponse)
+async def enqueue_units(
+    request: DispatchEnqueueRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """加入待测单元（需要有效会话）"""
+    queued = dispatcher_service.enqueue(request.units)
+    return APIResponse.success(data={"queued": queued}, msg=f"已加入 {len(request.units)} 个待测单元")
+
+
+@router.delete("/units", response_model=APIResponse)
+async def clear_units(session_id: str = Depends(validate_session_dependency)):
+    """清空排队中的单元（需要有效会话）"""
+    cleared = dispatcher_service.clear()
+    return APIResponse.success(data={"cleared": cleared}, msg=f"已清除 {cleared} 个待测单元")
+
+
+@router.post("/start", response_model=APIResponse[DispatcherStatus])
+async def start_dispatcher(
+    request: DispatcherStartRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """在已连接串口上启动调度（需要有效会话）"""
+    status = dispatcher_service.start(request.serial_ids)
+    logger.info(f"Dispatcher started by session: {session_id}")
+    return APIResponse.success(data=status, msg="调度已启动")
+
+
+@router.post("/stop", response_model=APIResponse[DispatcherStatus])
+async def stop_dispatcher(session_id: str = Depends(validate_session_dependency)):
+    """停止调度（需要有效会话），排队中的单元保留"""
+    await dispatcher_service.stop()
+    logger.info(f"Dispatcher stopped by session: {session_id}")
+    return APIResponse.success(data=dispatcher_service.get_status(), msg="调度已停止")
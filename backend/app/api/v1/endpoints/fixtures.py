@@ -0,0 +1,62 @@
+"""
+Fixture API Endpoints
+工装配置API端点
+"""
+
+import logging
+from typing import List
+from fastapi import APIRouter, Depends, status
+
+from app.core.response import APIResponse
+from app.core.dependencies import validate_session_dependency
+from app.services.fixture_service import fixture_service
+from app.schemas.fixture_schemas import FixtureConnectResult, FixtureProfileCreateRequest, FixtureProfileResponse
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/", response_model=APIResponse[FixtureProfileResponse], status_code=status.HTTP_201_CREATED)
+async def create_profile(request: FixtureProfileCreateRequest):
+    """创建工装配置"""
+    profile = await fixture_service.create_profile(request)
+    return APIResponse.success(data=profile, msg="工装配置创建成功")
+
+
+@router.get("/", response_model=APIResponse[List[FixtureProfileResponse]])
+async def get_profiles():
+    """获取所有工装配置及其连接状态"""
+    profiles = await fixture_service.get_profiles()
+    return APIResponse.success(data=profiles, msg=f"获取到 {len(profiles)} 个工装配置")
+
+
+@router.post("/connect", response_model=APIResponse[List[FixtureConnectResult]])
+async def connect_all(session_id: str = Depends(validate_session_dependency)):
+    """并行连接所有启用的工装（需要有效会话）"""
+    results = await fixture_service.connect_all()
+    logger.info(f"Fixtures connected by session: {session_id}")
+    return APIResponse.success(data=results, msg="工装连接完成")
+
+
+@router.get("/{profile_id}", response_model=APIResponse[FixtureProfileResponse])
+async def get_profile(profile_id: str):
+    """根据ID获取工装配置"""
+    profile = await fixture_service.get_profile(profile_id)
+    if profile is None:
+        return APIResponse.error(code=404, msg="工装配置不存在")
+    return APIResponse.success(data=profile, msg="获取工装配置成功")
+
+
+@router.delete("/{profile_id}", response_model=APIResponse)
+async def delete_profile(profile_id: str):
+    """删除工装配置"""
+    if not await fixture_service.delete_profile(profile_id):
+        return APIResponse.error(code=404, msg="工装配置不存在")
+    return APIResponse.success(msg="工装配置删除成功")
+
+
+@router.post("/{profile_id}/connect", response_model=APIResponse[FixtureConnectResult])
+async def connect_profile(profile_id: str, session_id: str = Depends(validate_session_dependency)):
+    """连接单个工装（需要有效会话）"""
+    result = await fixture_service.connect(profile_id)
+    return APIResponse.success(data=result, msg="工装连接成功" if result.connected else "工装连接失败")
@@ -2,15 +2,20 @@
 Serial Communication API Endpoints for AT Commands
 """
 
+import json
 import logging
 from fastapi import APIRouter, Request, Depends, status
+from fastapi.responses import StreamingResponse
 from typing import Optional
 
 from app.core.response import APIResponse
 from app.core.dependencies import validate_session_dependency
+from app.services.baudrate_service import baudrate_service
 from app.services.serial_service import serial_service
+from app.services.urc_service import urc_service
 from app.schemas.serial_schemas import (
-    SerialConfig, RawDataRequest, SerialConnectRequest, SerialConnectResponse, SerialDisconnectRequest
+    BaudrateDetectRequest, SerialConfig, RawDataRequest, SerialConnectRequest, SerialConnectResponse, SerialDisconnectRequest,
+    BatchRequest, BatchStepResult, BroadcastRequest
 )
 
 logger = logging.getLogger(__name__)
@@ -22,12 +27,12 @@ router = APIRouter()
     response_model=APIResponse, 
     status_code=status.HTTP_200_OK,
     summary="获取可用串口列表",
-    description="扫描系统中所有可用的串口设备，返回详细的设备信息",
+    description="返回缓存的串口设备清单（插拔时自动更新），refresh=true 时先重新扫描",
     tags=["串口管理"]
 )
-async def get_available_ports():
+async def get_available_ports(refresh: bool = False):
     """获取可用串口列表"""
-    ports = await serial_service.get_available_ports()
+    ports = await serial_service.get_available_ports(refresh)
     return APIResponse.success(data=ports, msg="获取串口列表成功")
 
 
@@ -38,6 +43,18 @@ async def auto_detect_port():
     return APIResponse.success(data={"port": port}, msg="自动检测成功")
 
 
+@router.post("/detect-baudrate", response_model=APIResponse)
+async def detect_baudrate(
+    detect_request: BaudrateDetectRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """并行检测多个串口的波特率（需要有效会话），已有检测记录的设备直接返回记录"""
+    results = await baudrate_service.detect_many(
+        detect_request.ports, detect_request.test_command, detect_request.force
+    )
+    return APIResponse.success(data=results, msg="波特率检测完成")
+
+
 @router.post("/connect", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
 async def connect_serial(
     config: SerialConfig,
@@ -79,6 +96,12 @@ async def get_connection_status():
     return APIResponse.success(data=status, msg="获取状态成功")
 
 
+@router.get("/urcs", response_model=APIResponse)
+async def get_recent_urcs(serial_id: Optional[int] = None):
+    """获取最近收到的主动上报（URC），实时上报通过 WebSocket 'urc' 消息推送"""
+    return APIResponse.success(data=urc_service.get_recent(serial_id), msg="获取主动上报成功")
+
+
 @router.post("/send-at", response_model=APIResponse)
 async def send_at_command(
     request_data: RawDataRequest,
@@ -89,7 +112,9 @@ async def send_at_command(
     import time
     
     # 注释掉原有的服务调用
-    result = await serial_service.send_at_command(request_data.data, request_data.serial_id)
+    result = await serial_service.send_at_command(
+        request_data.data, request_data.serial_id, idle_gap=request_data.idle_gap
+    )
     
     # 模拟返回期望值内容
     # def get_mock_response(command: str) -> str:
@@ -170,5 +195,51 @@ async def send_raw_data(
     session_id: str = Depends(validate_session_dependency)
 ):
     """发送原始数据（需要有效会话）"""
-    result = await serial_service.send_raw_data(request_data.data, request_data.serial_id)
-    return APIResponse.success(data=result, msg="发送原始数据成功")
\ No newline at end of file
+    result = await serial_service.send_raw_data(
+        request_data.data, request_data.serial_id, idle_gap=request_data.idle_gap
+    )
+    return APIResponse.success(data=result, msg="发送原始数据成功")
+
+
+@router.post(
+    "/broadcast",
+    response_model=APIResponse,
+    summary="广播指令",
+    description="同一指令并行发送到多个串口（不指定则所有已连接串口），返回各串口结果与耗时；每个串口受 port_timeout 限制",
+    tags=["串口通信"]
+)
+async def broadcast_command(
+    broadcast_request: BroadcastRequest,
+    request: Request,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """广播指令（需要有效会话）"""
+    result = await serial_service.broadcast(broadcast_request)
+    return APIResponse.success(data=result, msg="广播指令完成")
+
+
+@router.post(
+    "/batch",
+    summary="批量执行指令",
+    description="在后端按顺序执行一组指令，以NDJSON逐行返回每一步结果，最后一行为汇总",
+    tags=["串口通信"]
+)
+async def run_batch(
+    batch_request: BatchRequest,
+    request: Request,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """批量执行指令（需要有效会话）- NDJSON流式返回"""
+    logger.info(f"Batch of {len(batch_request.steps)} steps started by session: {session_id}")
+    
+    async def stream():
+        async for item in serial_service.run_batch(batch_request):
+            line_type = "step" if isinstance(item, BatchStepResult) else "summary"
+            yield json.dumps({"type": line_type, "data": item.model_dump()}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        # 显式声明编码以跳过GZip中间件，保证每一步结果立即推送
+        headers={"Content-Encoding": "identity", "Cache-Control": "no-cache"}
+    )
\ No newline at end of file
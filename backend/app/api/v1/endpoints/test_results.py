@@ -4,14 +4,13 @@ Test Results API Endpoints
 """
 
 import logging
-from fastapi import APIRouter, Depends, status, Query
-from sqlmodel import Session
+from fastapi import APIRouter, status, Query
 from typing import Optional
 from datetime import datetime
 
 from app.core.response import APIResponse
 from app.core.dependencies import get_session_id_from_header
-from app.core.database import get_session
+from app.services.result_spool_service import result_spool_service
 from app.services.test_result_service import test_result_service
 from app.schemas.test_result_schemas import (
     SaveTestResultRequest,
@@ -29,7 +28,7 @@ router = APIRouter()
     response_model=APIResponse,
     status_code=status.HTTP_201_CREATED,
     summary="保存测试结果",
-    description="保存工作流测试结果到数据库",
+    description="保存工作流测试结果到数据库；启用后写队列时落盘到本地 spool 后立即返回，稍后写入数据库",
     responses={
         201: {"description": "测试结果保存成功"},
         400: {"description": "参数错误"},
@@ -37,13 +36,13 @@ router = APIRouter()
     }
 )
 async def save_test_result(
-    request: SaveTestResultRequest,
-    db_session: Session = Depends(get_session)
+    request: SaveTestResultRequest
 ):
     """保存测试结果"""
     try:
-        result = await test_result_service.save_test_result(db_session, request)
-        return APIResponse.success(data=result, msg="测试结果保存成功")
+        result = await result_spool_service.submit(request)
+        msg = "测试结果已接收" if result_spool_service.enabled else "测试结果保存成功"
+        return APIResponse.success(data=result, msg=msg)
     except Exception as e:
         logger.error(f"保存测试结果失败: {e}")
         return APIResponse.error(code=500, msg=f"保存测试结果失败: {str(e)}")
@@ -61,12 +60,11 @@ async def save_test_result(
     }
 )
 async def get_test_result_detail(
-    test_result_id: str,
-    db_session: Session = Depends(get_session)
+    test_result_id: str
 ):
     """获取测试结果详情"""
     try:
-        result = await test_result_service.get_test_result_by_id(db_session, test_result_id)
+        result = await test_result_service.get_test_result_by_id(test_result_id)
         if not result:
             return APIResponse.error(code=404, msg="测试结果不存在")
         return APIResponse.success(data=result, msg="获取测试结果详情成功")
@@ -93,8 +91,7 @@ async def get_test_results(
     workstation: Optional[str] = Query(None, description="工位筛选"),
     device_id: Optional[str] = Query(None, description="设备ID筛选"),
     start_date: Optional[str] = Query(None, description="开始日期筛选 (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="结束日期筛选 (YYYY-MM-DD)"),
-    db_session: Session = Depends(get_session)
+    end_date: Optional[str] = Query(None, description="结束日期筛选 (YYYY-MM-DD)")
 ):
     """获取测试结果列表"""
     try:
@@ -107,7 +104,6 @@ async def get_test_results(
             end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
         
         results, total = await test_result_service.get_test_results(
-            db_session,
             page=page,
             page_size=page_size,
             mac_address=mac_address,
@@ -146,12 +142,11 @@ async def get_test_results(
     }
 )
 async def delete_test_result(
-    test_result_id: str,
-    db_session: Session = Depends(get_session)
+    test_result_id: str
 ):
     """删除测试结果"""
     try:
-        success = await test_result_service.delete_test_result(db_session, test_result_id)
+        success = await test_result_service.delete_test_result(test_result_id)
         if not success:
             return APIResponse.error(code=404, msg="测试结果不存在")
         return APIResponse.success(msg="测试结果删除成功")
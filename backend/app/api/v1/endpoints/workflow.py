@@ -0,0 +1,100 @@
+"""
+Workflow API Endpoints
+测试计划与后端工作流API端点
+"""
+
+import logging
+from typing import List
+from fastapi import APIRouter, Depends, status
+
+from app.core.response import APIResponse
+from app.core.dependencies import validate_session_dependency
+from app.services.workflow_service import workflow_service
+from app.schemas.workflow_schemas import (
+    TestPlanCreateRequest,
+    TestPlanResponse,
+    WorkflowRunRequest,
+    WorkflowRunStatus,
+    WorkflowConfirmRequest
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/plans", response_model=APIResponse[TestPlanResponse], status_code=status.HTTP_201_CREATED)
+async def create_plan(
+    request: TestPlanCreateRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """创建测试计划（需要有效会话）"""
+    plan = await workflow_service.create_plan(request)
+    logger.info(f"Test plan {plan.id} created by session: {session_id}")
+    return APIResponse.success(data=plan, msg="测试计划创建成功")
+
+
+@router.get("/plans", response_model=APIResponse[List[TestPlanResponse]])
+async def get_plans():
+    """获取所有测试计划"""
+    plans = await workflow_service.get_plans()
+    return APIResponse.success(data=plans, msg=f"获取到 {len(plans)} 个测试计划")
+
+
+@router.get("/plans/{plan_id}", response_model=APIResponse[TestPlanResponse])
+async def get_plan(plan_id: str):
+    """根据ID获取测试计划"""
+    plan = await workflow_service.get_plan(plan_id)
+    if plan is None:
+        return APIResponse.error(code=404, msg="测试计划不存在")
+    return APIResponse.success(data=plan, msg="获取测试计划成功")
+
+
+@router.post("/runs", response_model=APIResponse[WorkflowRunStatus], status_code=status.HTTP_201_CREATED)
+async def start_run(
+    request: WorkflowRunRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """启动工作流（需要有效会话），进度通过 WebSocket workflow 消息推送"""
+    run = await workflow_service.start_run(request)
+    logger.info(f"Workflow run {run.run_id} started by session: {session_id}")
+    return APIResponse.success(data=run, msg="工作流已启动")
+
+
+@router.get("/runs", response_model=APIResponse[List[WorkflowRunStatus]])
+async def get_runs():
+    """获取最近的工作流运行"""
+    runs = workflow_service.get_runs()
+    return APIResponse.success(data=runs, msg=f"获取到 {len(runs)} 个工作流运行")
+
+
+@router.get("/runs/{run_id}", response_model=APIResponse[WorkflowRunStatus])
+async def get_run(run_id: str):
+    """获取工作流运行状态"""
+    run = workflow_service.get_run(run_id)
+    if run is None:
+        return APIResponse.error(code=404, msg="工作流运行不存在")
+    return APIResponse.success(data=run, msg="获取工作流状态成功")
+
+
+@router.post("/runs/{run_id}/confirm", response_model=APIResponse)
+async def confirm_step(
+    run_id: str,
+    request: WorkflowConfirmRequest,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """提交人工确认结果（需要有效会话）"""
+    if not workflow_service.confirm_step(run_id, request.choice):
+        return APIResponse.error(code=409, msg="当前没有等待确认的步骤")
+    return APIResponse.success(msg="确认结果已提交")
+
+
+@router.post("/runs/{run_id}/cancel", response_model=APIResponse)
+async def cancel_run(
+    run_id: str,
+    session_id: str = Depends(validate_session_dependency)
+):
+    """取消工作流运行（需要有效会话）"""
+    if not workflow_service.cancel_run(run_id):
+        return APIResponse.error(code=409, msg="工作流不存在或已结束")
+    logger.info(f"Workflow run {run_id} cancelled by session: {session_id}")
+    return APIResponse.success(msg="工作流取消请求已提交")
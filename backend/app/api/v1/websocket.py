@@ -19,10 +19,11 @@ from app.schemas.websocket import (
     SendMessageRequest,
     SendMessageResponse
 )
-from app.services.serial_service import serial_service
+from app.services.serial_service import serial_service, TransactionPriority
 from app.services.session_service import session_service
 from app.core.dependencies import get_session_id_from_header, validate_session_dependency
 from app.core.response import APIResponse
+from app.core.events import event_bus
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -118,7 +119,10 @@ class ConnectionManager:
             # 执行AT指令通过串口服务
             try:
                 # 发送完整的指令字符串到指定串口
-                result = await serial_service.send_at_command(command_text, serial_id)
+                result = await serial_service.send_at_command(
+                    command_text, serial_id, idle_gap=data.get("idle_gap"),
+                    priority=TransactionPriority.INTERACTIVE
+                )
                 
                 # 构造成功响应
                 response_msg = WSResponseMessage(
@@ -129,7 +133,10 @@ class ConnectionManager:
                         "sent_data": result.sent_data,
                         "received_data": result.received_data,
                         "timestamp": result.timestamp,
-                        "serial_id": result.serial_id
+                        "serial_id": result.serial_id,
+                        "matched": result.matched,
+                        "first_byte_ms": result.first_byte_ms,
+                        "elapsed_ms": result.elapsed_ms
                     },
                     timestamp=datetime.now().isoformat(),
                     success=True
@@ -160,6 +167,9 @@ class ConnectionManager:
 # 全局连接管理器
 manager = ConnectionManager()
 
+# 服务层事件（如工作流进度）广播给所有终端
+event_bus.subscribe(manager.broadcast)
+
 
 @router.websocket("/terminal/{client_id}")
 async def websocket_terminal(websocket: WebSocket, client_id: str):
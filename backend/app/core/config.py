@@ -43,14 +43,71 @@ class Settings(BaseSettings):
     SERIAL_BYTESIZE: int = 8
     SERIAL_PARITY: str = "N"  # None
     SERIAL_STOPBITS: int = 1
+    SERIAL_DRIVER_BACKEND: str = Field(default="executor", description="串口驱动后端 (executor/asyncio)")
+    SERIAL_RX_BUFFER_SIZE: int = 65536  # 每个串口后台接收环形缓冲区大小（字节）
+    SERIAL_READER_POLL_INTERVAL: float = 0.05  # 后台读取线程的阻塞读取超时（秒）
+    SERIAL_QUEUE_TIMEOUT: float = 10.0  # 事务在串口队列中的默认最长等待时间（秒）
+    SERIAL_IDLE_GAP: float = 0.02  # 无终止符响应：收到数据后空闲多久视为响应结束（秒）
+    SERIAL_READ_TIMEOUT: float = 2.0  # 指令默认响应超时（秒），无历史数据时使用
+    SERIAL_ADAPTIVE_TIMEOUT: bool = True  # 是否按历史响应耗时自动调整每条指令的超时
+    SERIAL_LATENCY_WINDOW: int = 200  # 每个串口每条指令保留的耗时样本数
+    SERIAL_LATENCY_MIN_SAMPLES: int = 20  # 样本数达到该值后才使用学习到的超时
+    SERIAL_TIMEOUT_SAFETY_FACTOR: float = 3.0  # 学习超时 = p99 × 安全系数
+    SERIAL_TIMEOUT_MIN: float = 0.2  # 学习超时下限（秒）
+    SERIAL_TIMEOUT_MAX: float = 10.0  # 学习超时上限（秒）
+    SERIAL_PORT_WATCH_DIR: str = "/dev"  # 监听串口设备节点插拔的目录（Linux inotify）
+    SERIAL_PORT_RESCAN_INTERVAL: float = 10.0  # 串口清单定期重新扫描间隔（秒），插拔事件不可用时的兜底
+    SERIAL_URC_PREFIXES: List[str] = [
+        "RING", "+CRING:", "+CLIP:", "+CREG:", "+CGREG:", "+CEREG:",
+        "+CMTI:", "+CMT:", "+CDS:", "+CBM:", "+CUSD:", "+CGEV:",
+    ]  # 主动上报（URC）行前缀，这些行不进入指令响应，为空则关闭分离
+    SERIAL_URC_HOLD_TIME: float = 0.05  # 行首数据可能是 URC 时最多暂存多久（秒），超时按普通数据处理
+    SERIAL_URC_HISTORY_SIZE: int = 100  # 每个串口保留的最近 URC 条数
+    SERIAL_AUTO_RECONNECT: bool = True  # 串口 I/O 故障或设备消失后自动按硬件ID重新打开，保留串口ID
+    SERIAL_SUPERVISOR_INTERVAL: float = 1.0  # 检查已连接串口健康状态的间隔（秒）
+    SERIAL_RECONNECT_INITIAL_DELAY: float = 0.2  # 重连首次重试间隔（秒），之后指数退避
+    SERIAL_RECONNECT_MAX_DELAY: float = 5.0  # 重连重试间隔上限（秒）
+    
+    @field_validator('SERIAL_DRIVER_BACKEND')
+    @classmethod
+    def validate_serial_driver_backend(cls, v: str) -> str:
+        allowed_backends = ["executor", "asyncio"]
+        if v not in allowed_backends:
+            raise ValueError(f"SERIAL_DRIVER_BACKEND must be one of {allowed_backends}")
+        return v
     
     # 串口自动检测配置
     AUTO_BAUDRATE_LIST: List[int] = [115200, 57600, 38400, 19200, 9600, 4800]  # 按优先级排序
+    AUTO_BAUDRATE_PROBE_TIMEOUT: float = 0.2  # 每个波特率等待测试指令响应的时间（秒）
+    
+    # 工装配置
+    FIXTURE_AUTO_CONNECT: bool = True  # 启动时并行连接所有启用的工装配置
+
+    # 工作流配置
+    WORKFLOW_MAC_PLACEHOLDER: str = "026501123456"  # 指令中被替换为实际MAC的占位符
+    WORKFLOW_CONFIRM_TIMEOUT: float = 300.0  # 人工确认步骤的最长等待时间（秒）
+    WORKFLOW_FAILURE_HISTORY_DAYS: int = 30  # 失败优先排序使用最近多少天的测试项记录
+    WORKFLOW_HISTORY_SIZE: int = 100  # 内存中保留的已结束运行记录数
+    WORKFLOW_EVENT_QUEUE_SIZE: int = 1000  # 待推送的工作流进度事件上限，推送跟不上时丢弃最旧的事件
     
     # Session settings - 基于心跳的会话管理
     HEARTBEAT_TIMEOUT_SECONDS: int = 60  # 心跳超时时间（秒）- 1分钟无心跳则清理会话
     HEARTBEAT_INTERVAL_SECONDS: int = 25  # 建议心跳间隔（秒）
     
+    # Database settings
+    DATABASE_PRODUCTION_PROFILE: bool = True  # 启用 WAL 等生产存储配置；关闭时为 SQLite 默认的回滚日志模式
+    DATABASE_SYNCHRONOUS: str = "NORMAL"  # WAL 下 NORMAL 不会损坏数据库，掉电时可能丢失最近提交的事务
+    DATABASE_MMAP_SIZE: int = 256 * 1024 * 1024  # 内存映射读取的最大字节数
+    DATABASE_CACHE_SIZE_KB: int = 64 * 1024  # 每个连接的页缓存大小（KiB）
+    DATABASE_BUSY_TIMEOUT_MS: int = 5000  # 遇到锁时的等待时间（毫秒）
+    DATABASE_READ_POOL_SIZE: int = 2  # 只读连接池与只读线程池大小；列表/统计查询并发执行，查询多为 CPU 密集的 ORM 转换，线程过多会与事件循环争用 GIL
+    
+    # 测试结果后写队列：保存时追加到本地 spool 文件并落盘后立即返回，后台分批写入数据库（列表与详情稍后可见）
+    TEST_RESULT_SPOOL_ENABLED: bool = False
+    TEST_RESULT_SPOOL_BATCH_SIZE: int = 200  # 每个数据库事务写入的测试结果数
+    TEST_RESULT_SPOOL_INTERVAL: float = 1.0  # 写入失败后的重试间隔与空闲时的检查间隔（秒）
+    TEST_RESULT_SPOOL_FSYNC: bool = True  # 确认前 fsync spool 文件；并发到达的结果合并为一次 fsync
+    
     # Logging settings
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -69,6 +126,11 @@ class Settings(BaseSettings):
         """SQLite数据库文件路径"""
         return self.DATA_DIR / "commands.db"
 
+    @property
+    def TEST_RESULT_SPOOL_FILE(self) -> Path:
+        """测试结果后写队列文件路径（JSON Lines，只追加）"""
+        return self.DATA_DIR / "test_results.spool"
+
     @property
     def DATABASE_URL(self) -> str:
         """数据库连接URL"""
@@ -4,34 +4,109 @@ Database Configuration and Models
 """
 
 from sqlmodel import SQLModel, Field, Column, create_engine, Session, Relationship
-from sqlalchemy import DateTime, Text, ForeignKey
+from sqlalchemy import DateTime, Text, ForeignKey, event, inspect, text
 from sqlalchemy.sql import func
-from typing import Optional, List
+from typing import Callable, Optional, List, TypeVar
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
-# 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,  # 在开发模式下显示SQL语句
-    connect_args={"check_same_thread": False},  # SQLite需要这个参数
-)
+T = TypeVar("T")
+
+def _apply_sqlite_pragmas(dbapi_connection, readonly: bool):
+    """生产存储配置：WAL 下读写互不阻塞，synchronous=NORMAL 只在检查点时同步落盘"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.DATABASE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={settings.DATABASE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.DATABASE_CACHE_SIZE_KB}")  # 负数表示 KiB
+        cursor.execute(f"PRAGMA busy_timeout={settings.DATABASE_BUSY_TIMEOUT_MS}")
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str, readonly: bool = False, pool_size: int = 1, production: Optional[bool] = None):
+    """创建 SQLite 引擎；production 为 None 时按 DATABASE_PRODUCTION_PROFILE 决定是否启用生产存储配置
+
+    readonly 引擎的连接设置 query_only，只用于列表、详情与统计查询
+    """
+    db_engine = create_engine(
+        url,
+        echo=settings.DEBUG,  # 在开发模式下显示SQL语句
+        connect_args={"check_same_thread": False},  # SQLite需要这个参数
+        pool_size=pool_size,
+        max_overflow=0,  # 连接数固定：写引擎只有一个连接，只读引擎每个只读线程一个连接
+    )
+    if settings.DATABASE_PRODUCTION_PROFILE if production is None else production:
+        event.listen(db_engine, "connect", lambda connection, _record: _apply_sqlite_pragmas(connection, readonly))
+    return db_engine
+
+
+# 写引擎：所有写入在单个写线程中串行执行，只使用一个连接
+engine = create_db_engine(settings.DATABASE_URL)
+# 只读引擎：列表、详情与统计查询使用的只读连接池，WAL 下与写入并发执行
+read_engine = create_db_engine(settings.DATABASE_URL, readonly=True, pool_size=settings.DATABASE_READ_POOL_SIZE)
+
+# 数据库专用线程池：同步查询在其中执行，不阻塞事件循环（串口事务、WebSocket），也不占用串口线程池
+db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+db_read_executor = ThreadPoolExecutor(max_workers=settings.DATABASE_READ_POOL_SIZE, thread_name_prefix="db-read")
+
+
+async def run_in_db(
+    session_factory: Callable[[], Session],
+    work: Callable[[Session], T],
+    readonly: bool = False
+) -> T:
+    """在数据库线程池中打开会话执行 work(session)，返回其结果
+
+    work 中应完成查询及模型到 schema 的转换，返回值不再依赖会话；
+    readonly 的查询在只读线程池中执行（session_factory 应使用 read_engine），不排在写入之后
+    """
+    def call() -> T:
+        with session_factory() as session:
+            return work(session)
+
+    executor = db_read_executor if readonly else db_executor
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
 
 
 def create_db_and_tables():
     """创建数据库表"""
     try:
         SQLModel.metadata.create_all(engine)
+        add_missing_columns()
+        run_migrations(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         raise
 
 
+def add_missing_columns():
+    """为已存在的表补充模型中新增的可空列（create_all 不会修改已有表）"""
+    with engine.begin() as connection:
+        inspector = inspect(connection)  # 写引擎只有一个连接，检查表结构也使用该连接
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
 def get_session():
     """获取数据库会话"""
     with Session(engine) as session:
@@ -51,6 +126,7 @@ class Command(SQLModel, table=True):
     send_as_hex: bool = Field(default=False, description="是否以原始16进制发送")
     show_notification: bool = Field(default=False, description="是否弹出通知")
     target_serial_id: Optional[int] = Field(default=None, description="目标串口ID，null表示使用当前选择的串口")
+    read_timeout: Optional[float] = Field(default=None, description="响应超时(秒)，null表示按历史耗时自适应")
     created_at: datetime = Field(
         default_factory=datetime.now,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -119,3 +195,72 @@ class TestItemResult(SQLModel, table=True):
 
     class Config:
         from_attributes = True
+
+
+class TestPlan(SQLModel, table=True):
+    """测试计划：按顺序执行的一组常用指令"""
+    __tablename__ = "test_plans"
+
+    id: Optional[str] = Field(default=None, primary_key=True, description="测试计划ID")
+    name: str = Field(description="计划名称", max_length=100)
+    description: str = Field(default="", description="计划描述", max_length=500)
+    command_ids: str = Field(default="[]", sa_column=Column(Text), description="指令ID列表(JSON)")
+    pinned_command_ids: Optional[str] = Field(
+        default="[]", sa_column=Column(Text), description="优化排序时保持原位置的指令ID列表(JSON)"
+    )
+    dependencies: Optional[str] = Field(
+        default=None, sa_column=Column(Text), description="步骤依赖(JSON)，为空表示顺序执行"
+    )
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+        description="创建时间"
+    )
+
+    class Config:
+        from_attributes = True
+
+
+class PortBaudrate(SQLModel, table=True):
+    """波特率检测记录：按硬件ID记录检测成功的波特率，重连时直接使用"""
+    __tablename__ = "port_baudrates"
+
+    hwid: str = Field(primary_key=True, max_length=255, description="硬件ID（无硬件ID时为 port:设备路径）")
+    baudrate: int = Field(primary_key=True, description="波特率")
+    port: str = Field(default="", max_length=255, description="最近一次检测的设备路径")
+    success_count: int = Field(default=0, description="检测成功次数")
+    last_success: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+        description="最近一次检测成功时间"
+    )
+
+    class Config:
+        from_attributes = True
+
+
+class FixtureProfile(SQLModel, table=True):
+    """工装配置：启动时自动连接的串口、线路参数及固定的串口ID"""
+    __tablename__ = "fixture_profiles"
+
+    id: Optional[str] = Field(default=None, primary_key=True, description="工装配置ID")
+    station: str = Field(description="工位名称", max_length=100)
+    serial_id: int = Field(unique=True, description="固定的串口ID")
+    port: str = Field(default="", description="设备路径", max_length=255)
+    hwid: str = Field(default="", description="硬件ID，指定时按硬件ID查找设备（设备路径可能变化）", max_length=255)
+    baudrate: int = Field(default=115200, description="波特率")
+    bytesize: int = Field(default=8, description="数据位")
+    parity: str = Field(default="N", description="校验位", max_length=1)
+    stopbits: int = Field(default=1, description="停止位")
+    timeout: float = Field(default=0.5, description="超时时间(秒)")
+    idle_gap: Optional[float] = Field(default=None, description="字节间空闲间隔(秒)")
+    auto_baudrate: bool = Field(default=False, description="是否自动检测波特率")
+    enabled: bool = Field(default=True, description="启动时是否自动连接")
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+        description="创建时间"
+    )
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,40 @@
+"""
+In-process Event Bus
+进程内事件总线：服务层发布事件，WebSocket 等订阅者负责推送
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class EventBus:
+    """简单的异步发布/订阅"""
+
+    def __init__(self):
+        self._subscribers: List[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler):
+        """注册订阅者"""
+        if handler not in self._subscribers:
+            self._subscribers.append(handler)
+
+    def unsubscribe(self, handler: EventHandler):
+        """注销订阅者"""
+        if handler in self._subscribers:
+            self._subscribers.remove(handler)
+
+    async def publish(self, message: Dict[str, Any]):
+        """发布事件，单个订阅者失败不影响其他订阅者"""
+        for handler in list(self._subscribers):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"Event handler {handler} failed: {e}")
+
+
+# 全局事件总线
+event_bus = EventBus()
@@ -0,0 +1,84 @@
+"""
+Schema Migrations
+轻量数据库迁移：create_all 只创建缺失的表，add_missing_columns 只补充可空列，
+索引等对已有数据库的结构变更按版本号顺序执行，已执行的版本记录在 schema_migrations 表中
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import Connection, Engine, text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """一次迁移：upgrade 成功后记录版本号；SQLite 驱动下 DDL 不在事务中，语句应可重复执行（IF NOT EXISTS）"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _execute_all(*statements: str) -> Callable[[Connection], None]:
+    def upgrade(connection: Connection):
+        for statement in statements:
+            connection.execute(text(statement))
+    return upgrade
+
+
+# 索引与查询形状对应：
+# - 历史列表按 mac_address / operator / workstation / device_id 等值过滤，按 created_at 范围过滤并倒序分页，
+#   (过滤列, created_at) 组合索引同时满足过滤、范围与排序，不需要临时排序
+# - 详情与删除按 test_result_id 查找测试项
+# - 失败率统计按 command_id IN (...) 与 timestamp 范围过滤，聚合 reason / is_ok，覆盖索引不回表
+MIGRATIONS: List[Migration] = [
+    Migration(1, "test result query indexes", _execute_all(
+        "CREATE INDEX IF NOT EXISTS ix_test_results_created_at ON test_results (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_test_results_mac_address_created_at "
+        "ON test_results (mac_address, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_test_results_operator_created_at ON test_results (operator, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_test_results_workstation_created_at "
+        "ON test_results (workstation, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_test_results_device_id_created_at ON test_results (device_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_test_item_results_test_result_id ON test_item_results (test_result_id)",
+        "CREATE INDEX IF NOT EXISTS ix_test_item_results_command_id_timestamp "
+        "ON test_item_results (command_id, timestamp, reason, is_ok)",
+        # 采样统计索引分布，供查询规划器在多个候选索引间选择
+        "PRAGMA analysis_limit=1000",
+        "ANALYZE",
+    )),
+]
+
+
+def get_schema_version(connection: Connection) -> int:
+    """当前已执行的最大迁移版本号"""
+    return connection.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def run_migrations(engine: Engine, migrations: List[Migration] = MIGRATIONS) -> int:
+    """按版本号执行尚未执行的迁移，返回执行后的版本号"""
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        version = get_schema_version(connection)
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, CURRENT_TIMESTAMP)"),
+                {"version": migration.version, "description": migration.description}
+            )
+        version = migration.version
+        logger.info(f"Applied migration {migration.version}: {migration.description} "
+                    f"({time.perf_counter() - start:.1f}s)")
+    return version
@@ -0,0 +1,324 @@
+"""
+Per-port Background Reader
+每个串口一个后台读取线程，持续把数据搬运到有界环形缓冲区，
+协程通过 asyncio 事件等待数据，不再占用线程池
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from app.drivers.response_reader import ResponseMatcher
+from app.drivers.urc_router import UrcRouter
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """有界环形缓冲区（写满时覆盖最旧数据）"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._head = 0  # 下一个读取位置
+        self._size = 0
+        self.dropped = 0  # 因溢出被覆盖的字节数
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes):
+        """写入数据，溢出时丢弃最旧的字节"""
+        if len(data) >= self.capacity:
+            self.dropped += self._size + len(data) - self.capacity
+            self._buffer[:] = data[-self.capacity:]
+            self._head = 0
+            self._size = self.capacity
+            return
+
+        overflow = self._size + len(data) - self.capacity
+        if overflow > 0:
+            self.dropped += overflow
+            self._head = (self._head + overflow) % self.capacity
+            self._size -= overflow
+
+        tail = (self._head + self._size) % self.capacity
+        first = min(len(data), self.capacity - tail)
+        self._buffer[tail:tail + first] = data[:first]
+        if first < len(data):
+            self._buffer[:len(data) - first] = data[first:]
+        self._size += len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        """读取并移除最多 size 字节（-1 表示全部）"""
+        if size < 0 or size > self._size:
+            size = self._size
+        end = self._head + size
+        if end <= self.capacity:
+            data = bytes(self._buffer[self._head:end])
+        else:
+            data = bytes(self._buffer[self._head:]) + bytes(self._buffer[:end - self.capacity])
+        self._head = end % self.capacity
+        self._size -= size
+        return data
+
+    def unread(self, data: bytes):
+        """把数据放回缓冲区头部（用于事务读取多出的字节）"""
+        if not data:
+            return
+        pending = self.read()
+        self.write(data)
+        self.write(pending)
+
+
+class PortReader:
+    """串口后台读取器"""
+
+    def __init__(self, serial_id: int, connection, loop: asyncio.AbstractEventLoop,
+                 capacity: int = 65536, poll_interval: float = 0.05,
+                 on_error: Optional[Callable[["PortReader", Exception], None]] = None,
+                 urc_router: Optional[UrcRouter] = None,
+                 on_urc: Optional[Callable[[int, str], None]] = None):
+        self.serial_id = serial_id
+        self.connection = connection
+        self.loop = loop
+        self.poll_interval = poll_interval
+        self.on_error = on_error  # 读取出错时在事件循环中回调（用于自动重连）
+        self.urc_router = urc_router  # 分离主动上报行，不进入接收缓冲区
+        self.on_urc = on_urc  # 收到 URC 时在事件循环中回调
+        self.buffer = RingBuffer(capacity)
+        self.error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._data_event = asyncio.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动后台读取线程"""
+        # 读取线程独占 connection.read，使用短超时以便及时响应停止请求
+        self.connection.timeout = self.poll_interval
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"serial-reader-{self.serial_id}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """停止后台读取线程（阻塞直到线程退出）"""
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        """后台线程：持续读取数据写入环形缓冲区"""
+        while self._running:
+            try:
+                data = self.connection.read(max(1, self.connection.in_waiting))
+            except Exception as e:
+                if self._running:
+                    logger.error(f"Serial {self.serial_id}: Background reader stopped: {e}")
+                    self.error = e
+                    self._running = False
+                    self._wakeup()
+                    self._notify_error(e)
+                return
+
+            if (data and self._ingest(data)) or self._release_held():
+                self._wakeup()
+
+    def _ingest(self, data: bytes) -> bool:
+        """写入收到的数据（URC 行取出后回调），返回是否有数据进入缓冲区"""
+        if self.urc_router is not None:
+            data, urcs = self.urc_router.feed(data)
+            for line in urcs:
+                self._notify_urc(line)
+        if not data:
+            return False
+        with self._lock:
+            self.buffer.write(data)
+        return True
+
+    def _release_held(self) -> bool:
+        """暂存超时的行首数据放回缓冲区"""
+        if self.urc_router is None:
+            return False
+        data = self.urc_router.flush()
+        if not data:
+            return False
+        with self._lock:
+            self.buffer.write(data)
+        return True
+
+    def _notify_urc(self, line: str):
+        if self.on_urc is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.on_urc, self.serial_id, line)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _wakeup(self):
+        """通知事件循环中等待数据的协程"""
+        try:
+            self.loop.call_soon_threadsafe(self._data_event.set)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _notify_error(self, error: Exception):
+        """在事件循环中通知读取错误"""
+        if self.on_error is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.on_error, self, error)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _take(self, size: int = -1) -> bytes:
+        with self._lock:
+            data = self.buffer.read(size)
+            if not len(self.buffer):
+                self._data_event.clear()
+            return data
+
+    def discard(self) -> bytes:
+        """清空并返回缓冲区中尚未被读取的数据（两次事务之间的主动上报）"""
+        return self._take()
+
+    def unread(self, data: bytes):
+        """把多读的数据放回缓冲区"""
+        if data:
+            with self._lock:
+                self.buffer.unread(data)
+            self._data_event.set()
+
+    async def _wait_data(self, timeout: float) -> bool:
+        """等待新数据到达，超时返回 False"""
+        if timeout <= 0:
+            return False
+        try:
+            await asyncio.wait_for(self._data_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @staticmethod
+    def _wait_time(remaining: float, idle_gap: Optional[float], received: int) -> float:
+        """计算本次等待时长：已收到数据后最多再等一个字节间空闲间隔"""
+        if idle_gap and received:
+            return min(remaining, idle_gap)
+        return remaining
+
+    async def read(self, size: int, timeout: float, idle_gap: Optional[float] = None) -> bytes:
+        """读取 size 字节、收到数据后空闲 idle_gap 秒或直到超时，返回已收到的数据"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            with self._lock:
+                available = len(self.buffer)
+            if available >= size or self.error is not None:
+                break
+            if not await self._wait_data(self._wait_time(deadline - time.perf_counter(), idle_gap, available)):
+                break
+            self._data_event.clear()
+        return self._take(size)
+
+    async def read_response(self, matcher: ResponseMatcher, timeout: float,
+                            start_time: Optional[float] = None,
+                            idle_gap: Optional[float] = None) -> Optional[float]:
+        """读取响应直到命中匹配器、缓冲区满、收到数据后空闲 idle_gap 秒或截止时间到达，返回首字节耗时（秒）"""
+        if start_time is None:
+            start_time = time.perf_counter()
+        deadline = start_time + timeout
+        first_byte_time = None
+
+        while not matcher.done:
+            chunk = self._take(matcher.free)
+            if chunk:
+                if first_byte_time is None:
+                    first_byte_time = time.perf_counter() - start_time
+                matcher.feed(chunk)
+                continue
+            if self.error is not None:
+                break
+            remaining = deadline - time.perf_counter()
+            wait = self._wait_time(remaining, idle_gap, matcher.length)
+            if not await self._wait_data(wait):
+                # 等待时长短于等待前的剩余时间说明是空闲间隔到达，而不是截止时间到达
+                matcher.idle_end = wait < remaining
+                break
+
+        # 命中后多读的数据留给下一次读取
+        self.unread(matcher.remainder)
+        return first_byte_time
+
+
+class FdPortReader(PortReader):
+    """基于事件循环 add_reader 的读取器：直接在事件循环中非阻塞读取 tty fd，无后台线程（仅 POSIX）"""
+
+    READ_CHUNK_SIZE = 4096
+
+    def __init__(self, serial_id: int, connection, loop: asyncio.AbstractEventLoop,
+                 capacity: int = 65536, poll_interval: float = 0.05,
+                 on_error: Optional[Callable[[PortReader, Exception], None]] = None,
+                 urc_router: Optional[UrcRouter] = None,
+                 on_urc: Optional[Callable[[int, str], None]] = None):
+        super().__init__(serial_id, connection, loop, capacity, poll_interval, on_error, urc_router, on_urc)
+        self.fd: Optional[int] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """把串口 fd 注册到事件循环（必须在事件循环线程中调用）"""
+        self.fd = self.connection.fileno()
+        os.set_blocking(self.fd, False)
+        self.loop.add_reader(self.fd, self._on_readable)
+        self._running = True
+
+    def stop(self, timeout: float = 1.0):
+        """从事件循环注销 fd（必须在事件循环线程中调用）"""
+        if self._running and self.fd is not None:
+            self.loop.remove_reader(self.fd)
+        self._running = False
+
+    def _on_readable(self):
+        """fd 可读回调"""
+        try:
+            data = os.read(self.fd, self.READ_CHUNK_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._fail(e)
+            return
+
+        if not data:
+            # 可读但读到 0 字节：设备已挂断
+            self._fail(OSError(f"Serial port {self.serial_id} hung up"))
+            return
+
+        if self._ingest(data):
+            self._data_event.set()
+        if self.urc_router is not None and self.urc_router.holding:
+            self.loop.call_later(self.urc_router.hold_time, self._on_hold_timeout)
+
+    def _on_hold_timeout(self):
+        """行首数据暂存超时：不是 URC，放回缓冲区"""
+        if self._running and self._release_held():
+            self._data_event.set()
+
+    def _fail(self, error: Exception):
+        logger.error(f"Serial {self.serial_id}: Event loop reader stopped: {error}")
+        self.error = error
+        self.stop()
+        self._data_event.set()
+        self._notify_error(error)
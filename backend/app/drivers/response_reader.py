@@ -0,0 +1,85 @@
+"""
+Chunked Response Reader for Serial Transactions
+分块响应匹配：数据按批到达（见 PortReader.read_response），只在新数据尾部搜索终止符
+"""
+
+from typing import Optional, Pattern, Sequence
+
+
+class ResponseMatcher:
+    """增量响应匹配器
+
+    数据写入预分配的 bytearray，每次 feed 只在新到达的尾部（加上终止符长度-1
+    的重叠区）搜索终止符；正则从新数据所在行的行首开始搜索，避免重复扫描整个缓冲区。
+    """
+
+    def __init__(self, terminators: Sequence[bytes] = (b'\r\n',),
+                 patterns: Sequence[Pattern[bytes]] = (), max_size: int = 1024):
+        self.terminators = tuple(t for t in terminators if t)
+        self.patterns = tuple(patterns)
+        self.max_size = max_size
+        self.buffer = bytearray(max_size)
+        self.length = 0
+        self.matched: Optional[str] = None
+        self.match_end: Optional[int] = None
+        self.remainder = b""  # 命中后同一批次中多余的数据
+        self.idle_end = False  # 收到数据后空闲超过字节间间隔而结束（无终止符响应的正常结束）
+        self._overlap = max((len(t) for t in self.terminators), default=1) - 1
+
+    @property
+    def done(self) -> bool:
+        """是否已命中匹配器或缓冲区已满"""
+        return self.matched is not None or self.length >= self.max_size
+
+    @property
+    def free(self) -> int:
+        """缓冲区剩余空间"""
+        return self.max_size - self.length
+
+    @property
+    def data(self) -> bytes:
+        """已接收的响应数据（命中时截止到匹配结束位置）"""
+        end = self.match_end if self.match_end is not None else self.length
+        return bytes(self.buffer[:end])
+
+    def feed(self, chunk: bytes) -> bool:
+        """追加一批数据并在新尾部搜索匹配，返回是否已完成"""
+        if not chunk or self.done:
+            return self.done
+
+        count = min(len(chunk), self.free)
+        old_length = self.length
+        self.buffer[old_length:old_length + count] = chunk[:count]
+        self.length = old_length + count
+        if count < len(chunk):
+            self.remainder = bytes(chunk[count:])
+
+        self._search(old_length)
+        return self.done
+
+    def _search(self, old_length: int):
+        """在 [old_length - overlap, length) 范围内查找最早结束的匹配"""
+        best_end = None
+        best_label = None
+
+        start = max(0, old_length - self._overlap)
+        for terminator in self.terminators:
+            index = self.buffer.find(terminator, start, self.length)
+            if index >= 0:
+                end = index + len(terminator)
+                if best_end is None or end < best_end:
+                    best_end, best_label = end, repr(terminator)
+
+        if self.patterns:
+            # 正则从新数据所在行的行首开始搜索
+            line_start = self.buffer.rfind(b'\n', 0, old_length) + 1
+            for pattern in self.patterns:
+                match = pattern.search(self.buffer, line_start, self.length)
+                if match and (best_end is None or match.end() < best_end):
+                    best_end, best_label = match.end(), pattern.pattern.decode('latin-1')
+
+        if best_end is not None:
+            self.matched = best_label
+            self.match_end = best_end
+            self.remainder = bytes(self.buffer[best_end:self.length]) + self.remainder
+
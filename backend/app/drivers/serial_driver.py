@@ -4,25 +4,53 @@ Serial Communication Driver for AT Commands
 
 import asyncio
 import logging
+import os
 import time
-from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Dict, Any, Sequence, Set, Pattern
 import serial
 import serial.tools.list_ports
 from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+from app.drivers.port_reader import PortReader, FdPortReader
+from app.drivers.response_reader import ResponseMatcher
+from app.drivers.transaction_queue import PortTransactionQueue, TransactionPriority
+from app.drivers.urc_router import UrcRouter
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TransactionResult:
+    """一次写入+读取事务的结果"""
+    data: bytes  # 收到的全部数据
+    matched: Optional[str] = None  # 命中的终止符或正则，超时则为None
+    first_byte_time: Optional[float] = None  # 写入完成到收到首字节的耗时（秒）
+    elapsed_time: float = 0.0  # 写入完成到读取结束的耗时（秒）
+    complete: bool = False  # 响应正常结束（命中匹配器、缓冲区满或收到数据后空闲）；超时或读取出错为False
+
+
 class SerialDriver:
     """Serial Communication Driver for AT Commands - Multi-port support"""
     
+    reader_class = PortReader  # 每个串口的读取器实现
+    
     def __init__(self):
         # 多串口连接管理
         self.connections: Dict[int, serial.Serial] = {}  # serial_id -> connection
         self.port_configs: Dict[int, Dict[str, Any]] = {}  # serial_id -> config
         self.connected_ports: Dict[int, str] = {}  # serial_id -> port_path
-        self.executor = ThreadPoolExecutor(max_workers=4)  # 支持多个串口并发
+        self.idle_gaps: Dict[int, float] = {}  # serial_id -> 响应字节间空闲间隔（秒）
+        self.readers: Dict[int, PortReader] = {}  # serial_id -> background reader
+        self.queues: Dict[int, PortTransactionQueue] = {}  # serial_id -> transaction queue
+        self.reserved_ids: Set[int] = set()  # 工装配置固定使用的ID，不分配给临时连接
+        self.recovering: Dict[int, asyncio.Event] = {}  # serial_id -> 故障串口恢复事件
+        self.failure_listeners: List[Callable[[int], None]] = []  # 串口故障回调
+        self.connect_listeners: List[Callable[[int, str], None]] = []  # 串口打开（连接或重连）回调，参数为ID与路径
+        self.auto_reconnect = False  # 有自动重连时，事务等待故障串口恢复而不是立即失败
+        self.urc_listeners: List[Callable[[int, str], None]] = []  # 主动上报（URC）回调
+        self.executor = ThreadPoolExecutor(max_workers=4)  # 连接/写入/关闭等短操作，读取由各串口后台线程完成
         
         # 默认配置模板
         self.default_config = {
@@ -34,13 +62,13 @@ class SerialDriver:
         }
     
     def get_next_serial_id(self) -> int:
-        """获取下一个可用的串口ID（从1开始，复用断开的ID）"""
+        """获取下一个可用的串口ID（从1开始，复用断开的ID，跳过工装配置保留的ID）"""
+        used_ids = set(self.connections.keys()) | self.reserved_ids
         # 如果没有连接，从1开始
-        if not self.connections:
+        if not used_ids:
             return 1
             
         # 寻找最小的未使用ID，从1开始
-        used_ids = set(self.connections.keys())
         for serial_id in range(1, max(used_ids) + 2):
             if serial_id not in used_ids:
                 return serial_id
@@ -62,6 +90,7 @@ class SerialDriver:
                     "parity": config.get("parity", "N"),
                     "stopbits": config.get("stopbits", 1),
                     "timeout": config.get("timeout", 0.5),
+                    "idle_gap": self.idle_gaps.get(serial_id, settings.SERIAL_IDLE_GAP),
                     "is_connected": True
                 })
         return connected
@@ -95,61 +124,55 @@ class SerialDriver:
             logger.error(f"Error getting available ports: {e}")
             return []
     
-    async def auto_detect_baudrate(self, port: str, test_command: bytes = b'AT\r\n') -> Optional[int]:
-        """自动检测最佳波特率"""
-        from app.core.config import settings
-        
-        for baudrate in settings.AUTO_BAUDRATE_LIST:
-            try:
-                logger.info(f"Testing baudrate {baudrate} on port {port}")
-                
-                # 临时连接测试
-                test_config = self.port_config.copy()
-                test_config.update({
-                    "port": port,
-                    "baudrate": baudrate,
-                    "timeout": 0.3  # 短超时用于快速测试
-                })
-                
-                temp_connection = None
-                try:
-                    # 创建临时连接
-                    loop = asyncio.get_event_loop()
-                    temp_connection = await loop.run_in_executor(
-                        self.executor, lambda: serial.Serial(**test_config)
-                    )
-                    
-                    # 发送测试命令
-                    temp_connection.write(test_command)
-                    await asyncio.sleep(0.02)  # 短暂延迟
-                    
-                    # 尝试读取响应
-                    response = temp_connection.read(100)
-                    
-                    if response and len(response) > 0:
-                        logger.info(f"Found working baudrate: {baudrate}")
-                        return baudrate
-                        
-                except Exception as e:
-                    logger.debug(f"Baudrate {baudrate} failed: {e}")
-                finally:
-                    if temp_connection and temp_connection.is_open:
-                        temp_connection.close()
-                        await asyncio.sleep(0.1)  # 给端口一点时间关闭
-                        
-            except Exception as e:
-                logger.debug(f"Error testing baudrate {baudrate}: {e}")
-                continue
+    async def auto_detect_baudrate(self, port: str, test_command: bytes = b'AT\r\n',
+                                   candidates: Optional[Sequence[int]] = None,
+                                   expect: bytes = b'OK') -> Optional[int]:
+        """按候选顺序逐个测试波特率（同一串口只能依次测试），返回第一个得到期望响应的波特率"""
+        for baudrate in settings.AUTO_BAUDRATE_LIST if candidates is None else candidates:
+            logger.info(f"Testing baudrate {baudrate} on port {port}")
+            if await self.probe_baudrate(port, baudrate, test_command, expect):
+                logger.info(f"Found working baudrate: {baudrate}")
+                return baudrate
         
         logger.warning("No working baudrate found, using default")
         return None
 
+    async def probe_baudrate(self, port: str, baudrate: int, test_command: bytes = b'AT\r\n',
+                             expect: bytes = b'OK', timeout: Optional[float] = None) -> bool:
+        """以指定波特率临时打开串口发送测试指令，收到期望响应返回 True"""
+        config = self.default_config.copy()
+        config.update({"port": port, "baudrate": baudrate, "timeout": 0.01})
+        timeout = settings.AUTO_BAUDRATE_PROBE_TIMEOUT if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        try:
+            # 使用默认线程池，多个串口可同时检测
+            return await loop.run_in_executor(None, self._probe_sync, config, test_command, expect, timeout)
+        except (serial.SerialException, OSError, ValueError) as e:
+            logger.debug(f"Baudrate {baudrate} failed on {port}: {e}")
+            return False
+
+    def _probe_sync(self, config: Dict[str, Any], test_command: bytes, expect: bytes, timeout: float) -> bool:
+        """同步测试：收到期望响应立即返回，无需等满超时"""
+        with serial.Serial(**config) as connection:
+            connection.reset_input_buffer()
+            connection.write(test_command)
+            response = b''
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                response += connection.read(max(1, connection.in_waiting))
+                if expect in response:
+                    return True
+            return False
+
     @staticmethod
     def auto_detect_port() -> Optional[str]:
         """自动检测可用的串口设备"""
+        return SerialDriver.select_preferred_port(SerialDriver.get_available_ports())
+
+    @staticmethod
+    def select_preferred_port(ports: List[Dict[str, str]]) -> Optional[str]:
+        """从串口列表中选择首选设备：优先USB转串口，否则第一个"""
         try:
-            ports = SerialDriver.get_available_ports()
-            
             # 优先选择USB转串口设备
             for port in ports:
                 description = port["description"].lower()
@@ -176,17 +199,26 @@ class SerialDriver:
             logger.error(f"Error auto-detecting port: {e}")
             return None
     
-    async def connect(self, port: str, auto_baudrate: bool = False, **kwargs) -> int:
-        """连接串口，返回串口ID"""
+    async def connect(self, port: str, auto_baudrate: bool = False, idle_gap: Optional[float] = None,
+                      serial_id: Optional[int] = None, **kwargs) -> int:
+        """连接串口，返回串口ID；idle_gap 为该串口无终止符响应的字节间空闲间隔（秒）
+
+        指定 serial_id 时使用该ID（工装配置的固定ID），否则分配下一个可用ID
+        """
         try:
             # 检查端口是否已经被连接
-            for serial_id, connected_port in self.connected_ports.items():
+            for connected_id, connected_port in self.connected_ports.items():
                 if connected_port == port:
-                    logger.warning(f"Port {port} already connected with serial_id {serial_id}")
-                    return serial_id
+                    if serial_id is not None and serial_id != connected_id:
+                        raise RuntimeError(f"Port {port} already connected with serial_id {connected_id}")
+                    logger.warning(f"Port {port} already connected with serial_id {connected_id}")
+                    return connected_id
             
-            # 获取新的串口ID
-            serial_id = self.get_next_serial_id()
+            if serial_id is None:
+                # 获取新的串口ID
+                serial_id = self.get_next_serial_id()
+            elif serial_id in self.connections:
+                raise RuntimeError(f"Serial ID {serial_id} already used by {self.connected_ports.get(serial_id)}")
             
             # 自动检测波特率
             if auto_baudrate and "baudrate" not in kwargs:
@@ -206,12 +238,10 @@ class SerialDriver:
                 self.executor, lambda: self._connect_sync(config)
             )
             
-            # 保存连接信息
-            self.connections[serial_id] = connection
-            self.port_configs[serial_id] = config
-            self.connected_ports[serial_id] = port
+            self._register_connection(serial_id, connection, config, idle_gap)
             
             logger.info(f"Connected to serial port: {port} at {config['baudrate']} baud with serial_id {serial_id}")
+            self._notify_connected(serial_id, port)
             return serial_id
             
         except Exception as e:
@@ -222,6 +252,121 @@ class SerialDriver:
         """同步连接串口"""
         return serial.Serial(**config)
     
+    def _register_connection(self, serial_id: int, connection: serial.Serial, config: Dict[str, Any],
+                             idle_gap: Optional[float] = None):
+        """保存连接信息并启动该串口的后台读取器"""
+        self.connections[serial_id] = connection
+        self.port_configs[serial_id] = config
+        self.connected_ports[serial_id] = config["port"]
+        self.idle_gaps[serial_id] = settings.SERIAL_IDLE_GAP if idle_gap is None else idle_gap
+        self._start_reader(serial_id, connection)
+        self.queues[serial_id] = PortTransactionQueue(serial_id)
+    
+    def _start_reader(self, serial_id: int, connection: serial.Serial):
+        """启动串口的后台读取器"""
+        reader = self.reader_class(
+            serial_id, connection, asyncio.get_running_loop(),
+            capacity=settings.SERIAL_RX_BUFFER_SIZE,
+            poll_interval=settings.SERIAL_READER_POLL_INTERVAL,
+            on_error=self._on_reader_error,
+            urc_router=UrcRouter(settings.SERIAL_URC_PREFIXES, settings.SERIAL_URC_HOLD_TIME)
+            if settings.SERIAL_URC_PREFIXES else None,
+            on_urc=self._on_urc
+        )
+        reader.start()
+        self.readers[serial_id] = reader
+    
+    def _on_reader_error(self, reader: PortReader, error: Exception):
+        """读取器出错回调（忽略已被替换的旧读取器）"""
+        if self.readers.get(reader.serial_id) is reader:
+            self.mark_failed(reader.serial_id, error)
+    
+    def _on_urc(self, serial_id: int, line: str):
+        """分发主动上报行，单个回调失败不影响其他回调"""
+        logger.debug(f"Serial {serial_id}: URC {line!r}")
+        for listener in list(self.urc_listeners):
+            try:
+                listener(serial_id, line)
+            except Exception as e:
+                logger.error(f"URC listener {listener} failed: {e}")
+    
+    def _notify_connected(self, serial_id: int, port: str):
+        """通知串口已打开，单个回调失败不影响连接"""
+        for listener in list(self.connect_listeners):
+            try:
+                listener(serial_id, port)
+            except Exception as e:
+                logger.error(f"Connect listener {listener} failed: {e}")
+    
+    def mark_failed(self, serial_id: int, error: Exception):
+        """记录串口 I/O 故障并通知监听者（单个回调失败不影响其他监听者），串口ID与事务队列保留到恢复或断开"""
+        if serial_id not in self.connections or serial_id in self.recovering:
+            return
+        self.recovering[serial_id] = asyncio.Event()
+        logger.warning(f"Serial {serial_id}: Port failed: {error}")
+        for listener in list(self.failure_listeners):
+            try:
+                listener(serial_id)
+            except Exception as e:
+                logger.error(f"Failure listener {listener} failed: {e}")
+    
+    def is_port_healthy(self, serial_id: int) -> bool:
+        """串口已连接、读取器正常且设备节点仍存在"""
+        connection = self.connections.get(serial_id)
+        reader = self.readers.get(serial_id)
+        if serial_id in self.recovering or connection is None or reader is None:
+            return False
+        if not connection.is_open or reader.error is not None or not reader.is_running:
+            return False
+        port = self.connected_ports.get(serial_id, "")
+        return not port.startswith("/dev/") or os.path.exists(port)
+    
+    async def reopen(self, serial_id: int, port: Optional[str] = None):
+        """重新打开故障串口（可使用新的设备路径），保留串口ID、线路参数与事务队列"""
+        config = dict(self.port_configs[serial_id])
+        if port:
+            config["port"] = port
+        
+        reader = self.readers.pop(serial_id, None)
+        if reader is not None:
+            await self._stop_reader(reader)
+        loop = asyncio.get_event_loop()
+        old_connection = self.connections.get(serial_id)
+        if old_connection is not None:
+            try:
+                await loop.run_in_executor(self.executor, old_connection.close)
+            except Exception as e:
+                logger.debug(f"Serial {serial_id}: Error closing failed port: {e}")
+        
+        connection = await loop.run_in_executor(self.executor, lambda: self._connect_sync(config))
+        if serial_id not in self.port_configs:
+            # 重连期间已被断开
+            await loop.run_in_executor(self.executor, connection.close)
+            raise RuntimeError(f"Serial port {serial_id} disconnected during reconnect")
+        self.connections[serial_id] = connection
+        self.port_configs[serial_id] = config
+        self.connected_ports[serial_id] = config["port"]
+        self._start_reader(serial_id, connection)
+        
+        recovered = self.recovering.pop(serial_id, None)
+        if recovered is not None:
+            recovered.set()
+        logger.info(f"Serial {serial_id}: Reopened {config['port']}")
+        self._notify_connected(serial_id, config["port"])
+    
+    async def _stop_reader(self, reader: PortReader):
+        """停止后台读取器"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self.executor, reader.stop)
+    
+    def _get_reader(self, serial_id: int) -> PortReader:
+        """获取已连接串口的后台读取器"""
+        connection = self.connections.get(serial_id)
+        reader = self.readers.get(serial_id)
+        if not connection or not connection.is_open or reader is None:
+            raise RuntimeError(f"Serial port {serial_id} not connected")
+        return reader
+    
     async def disconnect(self, serial_id: int = None):
         """断开串口连接"""
         try:
@@ -231,6 +376,16 @@ class SerialDriver:
                     await self.disconnect(sid)
                 return
             
+            self.queues.pop(serial_id, None)
+            recovered = self.recovering.pop(serial_id, None)
+            if recovered is not None:
+                # 唤醒等待恢复的事务，它们随后报告串口未连接
+                recovered.set()
+            reader = self.readers.pop(serial_id, None)
+            if reader is not None:
+                # 先停止读取器，再关闭串口
+                await self._stop_reader(reader)
+            
             connection = self.connections.get(serial_id)
             if connection and connection.is_open:
                 loop = asyncio.get_event_loop()
@@ -241,6 +396,7 @@ class SerialDriver:
                 del self.connections[serial_id]
             if serial_id in self.port_configs:
                 del self.port_configs[serial_id]
+            self.idle_gaps.pop(serial_id, None)
             if serial_id in self.connected_ports:
                 port = self.connected_ports.pop(serial_id)
                 logger.info(f"Serial port {port} (ID: {serial_id}) disconnected")
@@ -265,28 +421,21 @@ class SerialDriver:
             
         except Exception as e:
             logger.error(f"Error writing data to serial {serial_id}: {e}")
+            self.mark_failed(serial_id, e)
             return False
     
-    async def read_data(self, serial_id: int, size: int = 1024, timeout: Optional[float] = None) -> bytes:
-        """从指定串口读取数据"""
-        connection = self.connections.get(serial_id)
-        if not connection or not connection.is_open:
-            raise RuntimeError(f"Serial port {serial_id} not connected")
+    async def read_data(self, serial_id: int, size: int = 1024, timeout: Optional[float] = None,
+                        idle_gap: Optional[float] = None) -> bytes:
+        """从指定串口读取数据（从后台读取器的缓冲区中获取，不占用线程池）
+
+        读满 size 字节、收到数据后空闲 idle_gap 秒或超时即返回；idle_gap 为 None 时只按大小和超时结束
+        """
+        reader = self._get_reader(serial_id)
+        if timeout is None:
+            timeout = self.port_configs[serial_id].get("timeout") or 1.0
         
         try:
-            # 设置临时超时
-            original_timeout = connection.timeout
-            if timeout is not None:
-                connection.timeout = timeout
-            
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                self.executor, lambda: self._read_sync(connection, size)
-            )
-            
-            # 恢复原始超时
-            connection.timeout = original_timeout
-            
+            data = await reader.read(size, timeout, idle_gap)
             logger.debug(f"Serial {serial_id}: Read {len(data)} bytes: {data.hex()}")
             return data
             
@@ -294,82 +443,142 @@ class SerialDriver:
             logger.error(f"Error reading data from serial {serial_id}: {e}")
             return b""
     
-    def _read_sync(self, connection: serial.Serial, size: int) -> bytes:
-        """同步读取数据"""
-        return connection.read(size)
-    
-    def _read_until_sync(self, connection: serial.Serial, terminator: bytes, max_size: int = 1024) -> bytes:
-        """同步读取数据直到遇到终止符"""
-        data = b""
-        start_time = time.time()
-        timeout = connection.timeout or 1.0
-        
-        while len(data) < max_size:
-            # 检查超时
-            if time.time() - start_time > timeout:
-                break
-                
-            # 读取一个字节
-            char = connection.read(1)
-            if not char:
-                break
-                
-            data += char
-            
-            # 检查是否遇到终止符
-            if terminator in data:
-                break
-                
-        return data
-    
     async def read_until(self, serial_id: int, terminator: bytes = b'\r\n', max_size: int = 1024, 
-                        timeout: Optional[float] = None) -> bytes:
-        """从指定串口读取数据直到遇到指定的终止符"""
-        connection = self.connections.get(serial_id)
-        if not connection or not connection.is_open:
-            raise RuntimeError(f"Serial port {serial_id} not connected")
+                        timeout: Optional[float] = None, idle_gap: Optional[float] = None) -> bytes:
+        """从指定串口读取数据直到遇到指定的终止符（或收到数据后空闲 idle_gap 秒）"""
+        reader = self._get_reader(serial_id)
+        if timeout is None:
+            timeout = self.port_configs[serial_id].get("timeout") or 1.0
         
         try:
-            # 设置临时超时
-            original_timeout = connection.timeout
-            if timeout is not None:
-                connection.timeout = timeout
+            matcher = ResponseMatcher((terminator,), max_size=max_size)
+            await reader.read_response(matcher, timeout, idle_gap=idle_gap)
             
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                self.executor, lambda: self._read_until_sync(connection, terminator, max_size)
-            )
-            
-            # 恢复原始超时
-            connection.timeout = original_timeout
-            
-            logger.debug(f"Serial {serial_id}: Read until terminator {terminator}: {len(data)} bytes")
-            return data
+            logger.debug(f"Serial {serial_id}: Read until terminator {terminator}: {matcher.length} bytes")
+            return matcher.data
             
         except Exception as e:
             logger.error(f"Error reading until terminator from serial {serial_id}: {e}")
             return b""
     
+    def _discard_unsolicited(self, serial_id: int):
+        """事务开始前清除上一次事务之后收到的主动上报数据，避免污染本次响应"""
+        stale = self._get_reader(serial_id).discard()
+        if stale:
+            logger.info(f"Serial {serial_id}: Discarded {len(stale)} unsolicited bytes: {stale!r}")
+    
+    def get_idle_gap(self, serial_id: int) -> float:
+        """串口的字节间空闲间隔：不小于当前波特率下 3.5 个字符时间（Modbus RTU 帧间隔）"""
+        config = self.port_configs.get(serial_id, {})
+        char_time = 11.0 / (config.get("baudrate") or settings.SERIAL_BAUDRATE)
+        return max(self.idle_gaps.get(serial_id, settings.SERIAL_IDLE_GAP), 3.5 * char_time)
+    
+    def set_idle_gap(self, serial_id: int, idle_gap: float):
+        """修改串口的字节间空闲间隔"""
+        self._get_reader(serial_id)
+        self.idle_gaps[serial_id] = idle_gap
+        logger.info(f"Serial {serial_id}: Idle gap set to {idle_gap * 1000:.1f}ms")
+    
+    def _resolve_deadline(self, read_timeout: float, deadline: Optional[float]) -> float:
+        """计算事务截止时间（time.monotonic 绝对时间），默认允许排队 SERIAL_QUEUE_TIMEOUT 秒"""
+        if deadline is None:
+            deadline = time.monotonic() + settings.SERIAL_QUEUE_TIMEOUT + read_timeout
+        return deadline
+    
+    @asynccontextmanager
+    async def transaction(self, serial_id: int, priority: int = TransactionPriority.NORMAL,
+                          deadline: Optional[float] = None, command: Optional[bytes] = None):
+        """独占指定串口执行一次写+读事务，同一串口上的事务按优先级逐个执行
+
+        串口正在自动重连时，事务排队等待恢复（不超过截止时间），而不是立即失败；
+        command 为本次发送的指令，与其同名的 URC 前缀行（如 AT+CREG? 的 +CREG:）作为响应保留
+        """
+        if serial_id not in self.recovering:
+            self._get_reader(serial_id)
+        queue = self.queues.get(serial_id)
+        if queue is None:
+            raise RuntimeError(f"Serial port {serial_id} not connected")
+        async with queue.transaction(priority, deadline):
+            await self._wait_recovered(serial_id, deadline)
+            self._discard_unsolicited(serial_id)
+            router = self.readers[serial_id].urc_router
+            if router is not None and command:
+                router.solicit(command)
+            try:
+                yield
+            finally:
+                if router is not None:
+                    router.release()
+    
+    async def _wait_recovered(self, serial_id: int, deadline: Optional[float]):
+        """等待故障串口重连成功"""
+        recovered = self.recovering.get(serial_id)
+        if recovered is None or not self.auto_reconnect:
+            return
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            await asyncio.wait_for(recovered.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Serial port {serial_id} is reconnecting")
+    
     async def write_read(self, serial_id: int, data: bytes, read_size: int = 1024, 
-                        read_timeout: float = 1.0, write_delay: float = 0.01) -> bytes:
-        """写入数据并读取响应（固定大小）"""
-        await self.write_data(serial_id, data)
-        
-        # 给设备一点时间处理命令
-        await asyncio.sleep(write_delay)
-        
-        return await self.read_data(serial_id, read_size, read_timeout)
+                        read_timeout: float = 1.0, idle_gap: Optional[float] = None,
+                        priority: int = TransactionPriority.NORMAL, deadline: Optional[float] = None) -> bytes:
+        """写入数据并读取响应（无终止符）：读满 read_size、收到数据后空闲 idle_gap 秒或超时即结束
+
+        idle_gap 为 None 时使用串口配置的空闲间隔
+        """
+        deadline = self._resolve_deadline(read_timeout, deadline)
+        if idle_gap is None:
+            idle_gap = self.get_idle_gap(serial_id)
+        async with self.transaction(serial_id, priority, deadline, command=data):
+            if not await self.write_data(serial_id, data):
+                raise serial.SerialException(f"Failed to write to serial port {serial_id}")
+            read_timeout = min(read_timeout, max(0.0, deadline - time.monotonic()))
+            return await self.read_data(serial_id, read_size, read_timeout, idle_gap)
     
     async def write_read_until(self, serial_id: int, data: bytes, terminator: bytes = b'\r\n', 
                               max_size: int = 1024, read_timeout: float = 1.0, 
-                              write_delay: float = 0.01) -> bytes:
-        """写入数据并读取响应直到遇到终止符（推荐用于AT命令）"""
-        await self.write_data(serial_id, data)
-        
-        # 给设备一点时间处理命令
-        await asyncio.sleep(write_delay)
+                              idle_gap: Optional[float] = None, priority: int = TransactionPriority.NORMAL,
+                              deadline: Optional[float] = None) -> bytes:
+        """写入数据并读取响应直到遇到终止符（推荐用于AT命令）；指定 idle_gap 时收到数据后空闲也结束"""
+        deadline = self._resolve_deadline(read_timeout, deadline)
+        async with self.transaction(serial_id, priority, deadline, command=data):
+            if not await self.write_data(serial_id, data):
+                raise serial.SerialException(f"Failed to write to serial port {serial_id}")
+            read_timeout = min(read_timeout, max(0.0, deadline - time.monotonic()))
+            return await self.read_until(serial_id, terminator, max_size, read_timeout, idle_gap)
+    
+    async def write_read_match(self, serial_id: int, data: bytes, terminators: Sequence[bytes] = (b'\r\n',),
+                               patterns: Sequence[Pattern[bytes]] = (), max_size: int = 1024,
+                               read_timeout: float = 1.0, idle_gap: Optional[float] = None,
+                               priority: int = TransactionPriority.NORMAL,
+                               deadline: Optional[float] = None) -> TransactionResult:
+        """写入一次并同时按多个终止符和正则读取响应（单次事务，不会重复发送）
+
+        指定 idle_gap 时，收到数据后空闲 idle_gap 秒也视为响应结束（用于无固定结束符的设备）
+        """
+        deadline = self._resolve_deadline(read_timeout, deadline)
+        async with self.transaction(serial_id, priority, deadline, command=data):
+            reader = self._get_reader(serial_id)
+            if not await self.write_data(serial_id, data):
+                raise serial.SerialException(f"Failed to write to serial port {serial_id}")
+            start_time = time.perf_counter()
+            
+            read_timeout = min(read_timeout, max(0.0, deadline - time.monotonic()))
+            matcher = ResponseMatcher(terminators, patterns, max_size)
+            first_byte_time = await reader.read_response(matcher, read_timeout, start_time, idle_gap)
+            result = TransactionResult(
+                data=matcher.data,
+                matched=matcher.matched,
+                first_byte_time=first_byte_time,
+                elapsed_time=time.perf_counter() - start_time,
+                complete=matcher.done or matcher.idle_end
+            )
         
-        return await self.read_until(serial_id, terminator, max_size, read_timeout)
+        logger.debug(f"Serial {serial_id}: Transaction matched {result.matched}, "
+                     f"{len(result.data)} bytes in {result.elapsed_time * 1000:.1f}ms")
+        return result
     
     def get_connection_info(self, serial_id: int = None) -> Dict[str, Any]:
         """获取连接信息"""
@@ -392,9 +601,68 @@ class SerialDriver:
             "bytesize": connection.bytesize,
             "parity": connection.parity,
             "stopbits": connection.stopbits,
-            "timeout": connection.timeout,
+            "timeout": self.port_configs.get(serial_id, {}).get("timeout", connection.timeout),
         }
 
 
+
+class AsyncioSerialDriver(SerialDriver):
+    """基于事件循环非阻塞 I/O 的串口驱动（仅 POSIX）
+    
+    串口 fd 直接注册到事件循环：读取由 add_reader 回调完成，写入使用 os.write，
+    内核缓冲区满时通过 add_writer 等待可写，单条指令的读写不再经过线程池。
+    """
+    
+    reader_class = FdPortReader
+    
+    async def _stop_reader(self, reader: PortReader):
+        """注销 fd（在事件循环线程中执行）"""
+        reader.stop()
+    
+    async def _wait_writable(self, fd: int):
+        """等待 fd 可写"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        loop.add_writer(fd, lambda: future.done() or future.set_result(None))
+        try:
+            await future
+        finally:
+            loop.remove_writer(fd)
+    
+    async def write_data(self, serial_id: int, data: bytes) -> bool:
+        """非阻塞写入数据到指定串口"""
+        connection = self.connections.get(serial_id)
+        if not connection or not connection.is_open:
+            raise RuntimeError(f"Serial port {serial_id} not connected")
+        
+        try:
+            fd = connection.fileno()
+            view = memoryview(data)
+            while view:
+                try:
+                    written = os.write(fd, view)
+                    view = view[written:]
+                except (BlockingIOError, InterruptedError):
+                    await self._wait_writable(fd)
+            
+            logger.debug(f"Serial {serial_id}: Written {len(data)} bytes: {data.hex()}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error writing data to serial {serial_id}: {e}")
+            self.mark_failed(serial_id, e)
+            return False
+
+
+def create_serial_driver(backend: Optional[str] = None) -> SerialDriver:
+    """根据配置创建串口驱动实例"""
+    backend = backend or settings.SERIAL_DRIVER_BACKEND
+    if backend == "asyncio":
+        if os.name == "posix":
+            return AsyncioSerialDriver()
+        logger.warning("Asyncio serial backend requires POSIX, falling back to executor backend")
+    return SerialDriver()
+
+
 # Global serial driver instance
-serial_driver = SerialDriver()
\ No newline at end of file
+serial_driver = create_serial_driver()
\ No newline at end of file
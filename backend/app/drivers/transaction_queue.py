@@ -0,0 +1,84 @@
+"""
+Per-port Transaction Queue
+每个串口一个事务队列：同一串口上的写+读事务逐个执行，按优先级出队；不同串口互不影响
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import List, Optional, Tuple
+
+
+class TransactionPriority(IntEnum):
+    """事务优先级（数值越小越先执行）"""
+    INTERACTIVE = 0  # 终端交互指令
+    NORMAL = 10  # 普通 REST 指令
+    BATCH = 20  # 批量/工作流步骤
+
+
+class TransactionTimeoutError(asyncio.TimeoutError):
+    """事务在截止时间前未能获得串口"""
+    pass
+
+
+class PortTransactionQueue:
+    """单个串口的事务队列"""
+
+    def __init__(self, serial_id: int):
+        self.serial_id = serial_id
+        self._busy = False
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    @property
+    def pending(self) -> int:
+        """排队等待中的事务数"""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = TransactionPriority.NORMAL, deadline: Optional[float] = None):
+        """获取串口使用权；deadline 为 time.monotonic() 绝对时间"""
+        if not self._busy and not self.pending:
+            self._busy = True
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 超时的同时已被授予使用权，必须交还
+                self.release()
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                raise TransactionTimeoutError(
+                    f"Serial port {self.serial_id} busy, transaction queue deadline exceeded"
+                )
+            raise
+
+    def release(self):
+        """释放串口使用权，交给优先级最高的等待者"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    @asynccontextmanager
+    async def transaction(self, priority: int = TransactionPriority.NORMAL, deadline: Optional[float] = None):
+        """以事务方式独占串口"""
+        await self.acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,99 @@
+"""
+Unsolicited Result Code Router
+按行前缀从串口接收数据中分离主动上报（URC，如 +CREG:、RING），其余字节原样交给事务读取
+"""
+
+import time
+from typing import List, Sequence, Tuple
+
+
+class UrcRouter:
+    """URC 行路由器（每个串口一个，由后台读取器在写入接收缓冲区前调用）
+
+    - 只在行首判断：完整的一行以 URC 前缀开头时整行取出，不进入接收缓冲区
+    - 行首的不完整数据可能是 URC 时暂存，等到行结束或超过 hold_time 后原样放回数据流
+    - 进行中指令与前缀同名时（如 AT+CREG? 的 +CREG: 行），该前缀的行属于指令响应，不作为 URC
+    """
+
+    def __init__(self, prefixes: Sequence[str], hold_time: float = 0.05):
+        self.prefixes: Tuple[bytes, ...] = tuple(prefix.encode() for prefix in prefixes if prefix)
+        self.hold_time = hold_time
+        self.solicited: Tuple[bytes, ...] = ()
+        self._line = b""  # 暂存的行首数据
+        self._held_since = 0.0
+        self._at_line_start = True
+
+    @property
+    def holding(self) -> bool:
+        return bool(self._line)
+
+    def solicit(self, command: bytes):
+        """登记进行中的指令，与指令同名的前缀行作为响应交给事务"""
+        name = command.strip().upper()
+        if name.startswith(b"AT"):
+            name = name[2:]
+        self.solicited = tuple(
+            prefix for prefix in self.prefixes
+            if name and name.startswith(prefix.rstrip(b": ").upper())
+        )
+
+    def release(self):
+        """指令事务结束"""
+        self.solicited = ()
+
+    def _urc_prefixes(self) -> Tuple[bytes, ...]:
+        return tuple(prefix for prefix in self.prefixes if prefix not in self.solicited)
+
+    def _is_urc(self, content: bytes) -> bool:
+        return content.startswith(self._urc_prefixes())
+
+    def _may_be_urc(self, partial: bytes) -> bool:
+        content = partial.lstrip(b"\r")
+        return bool(content) and any(
+            prefix.startswith(content) or content.startswith(prefix) for prefix in self._urc_prefixes()
+        )
+
+    def feed(self, data: bytes) -> Tuple[bytes, List[str]]:
+        """处理新收到的数据，返回 (交给事务的字节, URC 行列表)"""
+        passthrough = bytearray()
+        urcs: List[str] = []
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start)
+            segment = data[start:] if end < 0 else data[start:end + 1]
+            start = len(data) if end < 0 else end + 1
+
+            if not self._at_line_start and not self._line:
+                # 行中间的数据直接透传
+                passthrough += segment
+                self._at_line_start = end >= 0
+                continue
+
+            held = self._line
+            line = held + segment
+            self._line = b""
+            if end < 0:
+                if self._may_be_urc(line):
+                    if not held:
+                        self._held_since = time.monotonic()
+                    self._line = line
+                else:
+                    passthrough += line
+                    self._at_line_start = False
+                continue
+
+            content = line.strip(b"\r\n")
+            if content and self._is_urc(content):
+                urcs.append(content.decode("utf-8", errors="replace"))
+            else:
+                passthrough += line
+            self._at_line_start = True
+        return bytes(passthrough), urcs
+
+    def flush(self, force: bool = False) -> bytes:
+        """暂存超过 hold_time 仍未结束的行首数据不是 URC，原样放回数据流"""
+        if not self._line or (not force and time.monotonic() - self._held_since < self.hold_time):
+            return b""
+        line, self._line = self._line, b""
+        self._at_line_start = False
+        return line
@@ -38,10 +38,45 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to create database tables: {e}")
         raise
 
+    # 测试结果后写队列：回放上次未写入数据库的结果
+    if settings.TEST_RESULT_SPOOL_ENABLED:
+        from app.services.result_spool_service import result_spool_service
+        await result_spool_service.start()
+
+    from app.services.port_inventory_service import port_inventory_service
+    await port_inventory_service.start()
+
+    # 串口断线自动重连
+    if settings.SERIAL_AUTO_RECONNECT:
+        from app.services.port_supervisor_service import port_supervisor_service
+        await port_supervisor_service.start()
+
+    # 并行连接工装，串口连接独立于浏览器会话保持
+    if settings.FIXTURE_AUTO_CONNECT:
+        from app.services.fixture_service import fixture_service
+        try:
+            await fixture_service.connect_all()
+        except Exception as e:
+            logger.error(f"Failed to auto-connect fixtures: {e}")
+
     yield
     # Shutdown
     logger.info("Shutting down Industrial HMI")
 
+    if settings.SERIAL_AUTO_RECONNECT:
+        from app.services.port_supervisor_service import port_supervisor_service
+        await port_supervisor_service.stop()
+    await port_inventory_service.stop()
+
+    from app.services.dispatcher_service import dispatcher_service
+    from app.services.workflow_service import workflow_service
+    await dispatcher_service.stop()
+    await workflow_service.shutdown()
+
+    if settings.TEST_RESULT_SPOOL_ENABLED:
+        from app.services.result_spool_service import result_spool_service
+        await result_spool_service.stop()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -93,6 +128,18 @@ app = FastAPI(
             "name": "指令管理",
             "description": "常用指令的保存和管理",
         },
+        {
+            "name": "工作流",
+            "description": "测试计划管理与后端测试执行",
+        },
+        {
+            "name": "多工装调度",
+            "description": "待测单元排队并分配到各串口并行测试",
+        },
+        {
+            "name": "工装配置",
+            "description": "工位串口配置与固定串口ID，启动时自动连接",
+        },
         {
             "name": "WebSocket",
             "description": "实时通信和数据推送",
@@ -18,6 +18,7 @@ class SavedCommand(BaseModel):
     send_as_hex: bool = Field(default=False, description="是否以原始16进制发送")
     show_notification: bool = Field(default=False, description="是否弹出通知")
     target_serial_id: Optional[int] = Field(None, description="目标串口ID，null表示使用当前选择的串口")
+    read_timeout: Optional[float] = Field(None, description="响应超时(秒)，null表示按历史耗时自适应")
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
     
     @field_serializer('created_at')
@@ -39,6 +40,7 @@ class CreateCommandRequest(BaseModel):
     send_as_hex: bool = Field(default=False, description="是否以原始16进制发送")
     show_notification: bool = Field(default=False, description="是否弹出通知")
     target_serial_id: Optional[int] = Field(None, description="目标串口ID，null表示使用当前选择的串口")
+    read_timeout: Optional[float] = Field(None, gt=0, le=60, description="响应超时(秒)，不指定则按历史耗时自适应")
 
 
 class UpdateCommandRequest(BaseModel):
@@ -50,9 +52,31 @@ class UpdateCommandRequest(BaseModel):
     send_as_hex: Optional[bool] = Field(None, description="是否以原始16进制发送")
     show_notification: Optional[bool] = Field(None, description="是否弹出通知")
     target_serial_id: Optional[int] = Field(None, description="目标串口ID，null表示使用当前选择的串口")
+    read_timeout: Optional[float] = Field(None, ge=0, le=60, description="响应超时(秒)，0 表示恢复自适应")
 
 
 class CommandsListResponse(BaseModel):
     """指令列表响应模型"""
     commands: List[SavedCommand] = Field(default=[], description="指令列表")
     total: int = Field(default=0, description="指令总数")
+
+
+class CommandLatencyStats(BaseModel):
+    """单个串口上某条指令的响应耗时统计"""
+    serial_id: int = Field(..., description="串口ID")
+    command: str = Field(..., description="指令内容")
+    samples: int = Field(..., description="样本数")
+    p50_ms: float = Field(..., description="耗时中位数(毫秒)")
+    p99_ms: float = Field(..., description="耗时p99(毫秒)")
+    max_ms: float = Field(..., description="最大耗时(毫秒)")
+    learned_timeout: Optional[float] = Field(None, description="学习到的超时(秒)，样本不足时为空")
+
+
+class CommandTimeoutInfo(BaseModel):
+    """指令超时信息"""
+    command_id: str = Field(..., description="指令ID")
+    name: str = Field(..., description="指令名称")
+    command: str = Field(..., description="指令内容")
+    read_timeout: Optional[float] = Field(None, description="人工设置的超时(秒)")
+    default_timeout: float = Field(..., description="无历史数据时的默认超时(秒)")
+    ports: List[CommandLatencyStats] = Field(default=[], description="各串口耗时统计")
@@ -0,0 +1,64 @@
+"""
+Dispatcher Schemas
+多工装调度相关的数据模型
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class DispatchUnit(BaseModel):
+    """待测单元"""
+    mac_address: str = Field(..., min_length=1, max_length=17, description="MAC地址或条码")
+    plan_id: Optional[str] = Field(None, description="测试计划ID，不指定则执行全部常用指令；计划中的指令不能指定目标串口，由调度分配")
+    operator: Optional[str] = Field(None, max_length=100, description="操作员")
+    workstation: Optional[str] = Field(None, max_length=100, description="工位")
+    device_id: Optional[str] = Field(None, max_length=100, description="设备ID")
+    stop_on_failure: bool = Field(default=False, description="步骤失败时是否停止后续步骤")
+    optimize_order: bool = Field(default=False, description="按历史失败率与耗时重排步骤，最可能失败的先执行")
+    abort_on_hard_failure: bool = Field(default=False, description="自动判定的步骤失败时立即结束")
+
+
+class DispatchEnqueueRequest(BaseModel):
+    """加入待测队列请求"""
+    units: List[DispatchUnit] = Field(..., min_length=1, description="待测单元列表")
+
+
+class DispatcherStartRequest(BaseModel):
+    """启动调度请求"""
+    serial_ids: Optional[List[int]] = Field(None, description="参与调度的串口ID，不指定则使用全部已连接串口")
+
+
+class DispatchUnitResult(BaseModel):
+    """单元测试结果"""
+    mac_address: str = Field(..., description="MAC地址或条码")
+    serial_id: int = Field(..., description="执行测试的串口ID")
+    run_id: Optional[str] = Field(None, description="工作流运行ID")
+    passed: bool = Field(..., description="是否全部通过")
+    test_result_id: Optional[str] = Field(None, description="测试结果ID")
+    error: Optional[str] = Field(None, description="错误信息")
+    cycle_time: float = Field(..., description="测试耗时(秒)")
+    finished_at: int = Field(..., description="完成时间（毫秒时间戳）")
+
+
+class PortThroughput(BaseModel):
+    """单个串口的产能统计"""
+    serial_id: int = Field(..., description="串口ID")
+    port: str = Field(default="", description="串口路径")
+    busy: bool = Field(..., description="是否正在测试")
+    current_unit: Optional[str] = Field(None, description="正在测试的单元")
+    completed: int = Field(default=0, description="完成数")
+    passed: int = Field(default=0, description="通过数")
+    failed: int = Field(default=0, description="失败数")
+    avg_cycle_time: float = Field(default=0.0, description="平均测试耗时(秒)")
+    units_per_hour: float = Field(default=0.0, description="每小时完成单元数")
+
+
+class DispatcherStatus(BaseModel):
+    """调度器状态"""
+    running: bool = Field(..., description="是否正在调度")
+    queued: int = Field(..., description="排队中的单元数")
+    total_completed: int = Field(default=0, description="总完成数")
+    units_per_hour: float = Field(default=0.0, description="所有串口合计每小时完成单元数")
+    ports: List[PortThroughput] = Field(default_factory=list, description="各串口产能")
+    recent: List[DispatchUnitResult] = Field(default_factory=list, description="最近完成的单元（最新在前）")
@@ -0,0 +1,68 @@
+"""
+Fixture Schemas
+工装配置相关的数据模型
+"""
+
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, field_serializer, model_validator
+
+
+class FixtureProfileCreateRequest(BaseModel):
+    """创建工装配置请求"""
+    station: str = Field(..., min_length=1, max_length=100, description="工位名称")
+    serial_id: int = Field(..., ge=1, description="固定的串口ID")
+    port: str = Field(default="", max_length=255, description="设备路径")
+    hwid: str = Field(default="", max_length=255, description="硬件ID，指定时按硬件ID查找设备")
+    baudrate: int = Field(default=115200, description="波特率")
+    bytesize: int = Field(default=8, description="数据位")
+    parity: str = Field(default="N", description="校验位 (N/E/O)")
+    stopbits: int = Field(default=1, description="停止位")
+    timeout: float = Field(default=0.5, description="超时时间(秒)")
+    idle_gap: Optional[float] = Field(None, ge=0, le=5, description="字节间空闲间隔(秒)")
+    auto_baudrate: bool = Field(default=False, description="自动检测波特率（使用已保存的检测结果）")
+    enabled: bool = Field(default=True, description="启动时是否自动连接")
+
+    @model_validator(mode='after')
+    def validate_device(self) -> 'FixtureProfileCreateRequest':
+        """设备路径与硬件ID至少指定一个"""
+        if not self.port.strip() and not self.hwid.strip():
+            raise ValueError('设备路径与硬件ID至少指定一个')
+        return self
+
+
+class FixtureProfileResponse(BaseModel):
+    """工装配置响应"""
+    id: str = Field(..., description="工装配置ID")
+    station: str = Field(..., description="工位名称")
+    serial_id: int = Field(..., description="固定的串口ID")
+    port: str = Field(default="", description="设备路径")
+    hwid: str = Field(default="", description="硬件ID")
+    baudrate: int = Field(..., description="波特率")
+    bytesize: int = Field(..., description="数据位")
+    parity: str = Field(..., description="校验位")
+    stopbits: int = Field(..., description="停止位")
+    timeout: float = Field(..., description="超时时间(秒)")
+    idle_gap: Optional[float] = Field(None, description="字节间空闲间隔(秒)")
+    auto_baudrate: bool = Field(..., description="是否自动检测波特率")
+    enabled: bool = Field(..., description="启动时是否自动连接")
+    connected: bool = Field(default=False, description="当前是否已连接")
+    connected_port: Optional[str] = Field(None, description="当前连接的设备路径")
+    created_at: datetime = Field(..., description="创建时间")
+
+    @field_serializer('created_at')
+    def serialize_created_at(self, dt: datetime) -> int:
+        """将datetime序列化为毫秒时间戳"""
+        return int(dt.timestamp() * 1000)
+
+
+class FixtureConnectResult(BaseModel):
+    """工装连接结果"""
+    profile_id: str = Field(..., description="工装配置ID")
+    station: str = Field(..., description="工位名称")
+    serial_id: int = Field(..., description="串口ID")
+    port: Optional[str] = Field(None, description="连接的设备路径")
+    baudrate: Optional[int] = Field(None, description="使用的波特率")
+    connected: bool = Field(..., description="是否连接成功")
+    error: Optional[str] = Field(None, description="失败原因")
+    elapsed_ms: float = Field(..., description="连接耗时(毫秒)")
@@ -23,6 +23,8 @@ class SerialConfig(BaseModel):
     parity: str = Field(default="N", description="校验位 (N/E/O)")
     stopbits: int = Field(default=1, description="停止位")
     timeout: float = Field(default=0.5, description="超时时间(秒)")  # 优化后的默认值
+    idle_gap: Optional[float] = Field(None, ge=0, le=5, description="无终止符响应的字节间空闲间隔(秒)，不指定使用系统默认值")
+    auto_baudrate: bool = Field(default=False, description="自动检测波特率（优先使用该设备上次检测到的波特率）")
 
 
 class SerialConnectionInfo(BaseModel):
@@ -34,6 +36,7 @@ class SerialConnectionInfo(BaseModel):
     parity: str = Field(..., description="校验位")
     stopbits: int = Field(..., description="停止位")
     timeout: float = Field(..., description="超时时间")
+    idle_gap: Optional[float] = Field(None, description="字节间空闲间隔(秒)")
     is_connected: bool = Field(..., description="是否连接")
 
 
@@ -47,6 +50,7 @@ class RawDataRequest(BaseModel):
     """原始数据请求"""
     data: str = Field(..., min_length=1, max_length=1000, description="数据字符串(AT指令或十六进制)")
     serial_id: Optional[int] = Field(None, description="串口ID，如果不指定则使用第一个连接的串口")
+    idle_gap: Optional[float] = Field(None, ge=0, le=5, description="字节间空闲间隔(秒)，收到数据后空闲即结束响应")
     
     @field_validator('data')
     @classmethod
@@ -87,4 +91,101 @@ class RawDataResponse(BaseModel):
     serial_id: int = Field(..., description="使用的串口ID")
     sent_data: str = Field(..., description="发送的数据")
     received_data: str = Field(..., description="接收的数据")
-    timestamp: float = Field(..., description="时间戳")
\ No newline at end of file
+    timestamp: float = Field(..., description="时间戳")
+    matched: Optional[str] = Field(None, description="命中的终止符或正则，超时为空")
+    first_byte_ms: Optional[float] = Field(None, description="首字节耗时(毫秒)")
+    elapsed_ms: Optional[float] = Field(None, description="完整响应耗时(毫秒)")
+
+
+class BatchStep(BaseModel):
+    """批量执行的单个步骤"""
+    id: Optional[str] = Field(None, description="步骤/指令ID")
+    name: Optional[str] = Field(None, description="步骤名称")
+    data: str = Field(..., min_length=1, max_length=1000, description="指令内容(AT指令或十六进制)")
+    send_as_hex: bool = Field(default=False, description="是否以原始16进制发送")
+    target_serial_id: Optional[int] = Field(None, description="目标串口ID，不指定则使用批量请求的默认串口")
+    expected_response: str = Field(default="", max_length=1000, description="期望返回值")
+    read_timeout: Optional[float] = Field(None, gt=0, le=60, description="响应超时时间(秒)，不指定则按历史耗时自适应")
+    idle_gap: Optional[float] = Field(None, ge=0, le=5, description="字节间空闲间隔(秒)，收到数据后空闲即结束响应")
+
+
+class BatchRequest(BaseModel):
+    """批量执行请求"""
+    steps: List[BatchStep] = Field(..., min_length=1, max_length=500, description="按顺序执行的步骤")
+    serial_id: Optional[int] = Field(None, description="默认串口ID")
+    stop_on_failure: bool = Field(default=False, description="步骤失败时是否停止后续步骤")
+
+
+class BatchStepResult(BaseModel):
+    """批量执行单步结果"""
+    index: int = Field(..., description="步骤序号(从0开始)")
+    id: Optional[str] = Field(None, description="步骤/指令ID")
+    name: Optional[str] = Field(None, description="步骤名称")
+    serial_id: Optional[int] = Field(None, description="使用的串口ID")
+    sent_data: str = Field(..., description="发送的数据")
+    received_data: str = Field(default="", description="接收的数据")
+    expected_response: str = Field(default="", description="期望返回值")
+    is_ok: bool = Field(..., description="是否通过")
+    reason: str = Field(..., description="结果原因")
+    error: Optional[str] = Field(None, description="错误信息")
+    elapsed_ms: float = Field(..., description="步骤耗时(毫秒)")
+    timestamp: float = Field(..., description="时间戳")
+
+
+class BaudrateDetectRequest(BaseModel):
+    """波特率检测请求"""
+    ports: List[str] = Field(..., min_length=1, max_length=64, description="要检测的串口设备路径，并行检测")
+    test_command: str = Field(default="AT", min_length=1, max_length=100, description="测试指令")
+    force: bool = Field(default=False, description="忽略已保存的检测结果重新检测")
+
+
+class BaudrateDetectResult(BaseModel):
+    """单个串口的波特率检测结果"""
+    port: str = Field(..., description="设备路径")
+    hwid: str = Field(..., description="硬件ID（检测记录的键）")
+    baudrate: Optional[int] = Field(None, description="检测到的波特率，未检测到为空")
+    cached: bool = Field(..., description="是否直接使用已保存的检测结果（未实际检测）")
+    probes: int = Field(..., description="实际测试的波特率个数")
+    elapsed_ms: float = Field(..., description="检测耗时(毫秒)")
+
+
+class BatchSummary(BaseModel):
+    """批量执行汇总"""
+    total_steps: int = Field(..., description="请求的步骤数")
+    executed_steps: int = Field(..., description="实际执行的步骤数")
+    passed_steps: int = Field(..., description="通过的步骤数")
+    failed_steps: int = Field(..., description="失败的步骤数")
+    elapsed_ms: float = Field(..., description="总耗时(毫秒)")
+
+
+class UrcEvent(BaseModel):
+    """主动上报（URC）"""
+    serial_id: int = Field(..., description="串口ID")
+    line: str = Field(..., description="上报内容（不含行结束符）")
+    timestamp: float = Field(..., description="时间戳")
+
+
+class BroadcastRequest(BaseModel):
+    """广播指令请求：同一指令并行发送到多个串口"""
+    data: str = Field(..., min_length=1, max_length=1000, description="指令内容(AT指令或十六进制)")
+    serial_ids: Optional[List[int]] = Field(None, min_length=1, description="目标串口ID，不指定则发送到所有已连接串口")
+    send_as_hex: bool = Field(default=False, description="是否以原始16进制发送")
+    expected_response: str = Field(default="", max_length=1000, description="期望返回值")
+    port_timeout: float = Field(default=5.0, gt=0, le=60, description="每个串口的最长耗时(秒)，包括排队等待，超时不影响其他串口")
+    read_timeout: Optional[float] = Field(None, gt=0, le=60, description="响应超时时间(秒)，不指定则按历史耗时自适应")
+    idle_gap: Optional[float] = Field(None, ge=0, le=5, description="字节间空闲间隔(秒)，收到数据后空闲即结束响应")
+
+    @field_validator('serial_ids')
+    @classmethod
+    def validate_serial_ids(cls, v: Optional[List[int]]) -> Optional[List[int]]:
+        """去除重复的串口ID，保持顺序"""
+        return list(dict.fromkeys(v)) if v is not None else v
+
+
+class BroadcastResponse(BaseModel):
+    """广播指令结果"""
+    results: List[BatchStepResult] = Field(..., description="各串口结果（按请求的串口顺序）")
+    total_ports: int = Field(..., description="目标串口数")
+    passed_ports: int = Field(..., description="通过的串口数")
+    failed_ports: int = Field(..., description="失败的串口数")
+    elapsed_ms: float = Field(..., description="总耗时(毫秒)")
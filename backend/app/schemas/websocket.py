@@ -25,6 +25,9 @@ class WSMessageType(str, Enum):
     CONNECT = "connect"
     DISCONNECT = "disconnect"
     AUTO_AT = "auto_at"
+    WORKFLOW = "workflow"
+    PORTS = "ports"
+    URC = "urc"
 
 
 class WSCommandMessage(BaseModel):
@@ -32,6 +35,7 @@ class WSCommandMessage(BaseModel):
     type: WSMessageType = WSMessageType.COMMAND
     command: str
     serial_id: Optional[int] = None  # 目标串口ID，不指定则使用默认串口
+    idle_gap: Optional[float] = None  # 字节间空闲间隔(秒)，收到数据后空闲即结束响应
     args: Optional[list] = []
     timestamp: Optional[str] = None
 
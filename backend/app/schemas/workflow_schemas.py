@@ -0,0 +1,118 @@
+"""
+Workflow Schemas
+测试计划与后端工作流相关的数据模型
+"""
+
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_serializer, model_validator
+from datetime import datetime
+
+from app.schemas.serial_schemas import UrcEvent
+
+
+class TestPlanCreateRequest(BaseModel):
+    """创建测试计划请求"""
+    name: str = Field(..., min_length=1, max_length=100, description="计划名称")
+    description: str = Field(default="", max_length=500, description="计划描述")
+    command_ids: List[str] = Field(..., min_length=1, description="按执行顺序排列的指令ID")
+    pinned_command_ids: List[str] = Field(default=[], description="优化排序时保持原位置的指令ID（如写MAC等前置步骤）")
+    dependencies: Optional[Dict[str, List[str]]] = Field(
+        None, description="步骤依赖 {指令ID: [前置指令ID]}；指定后无依赖关系的步骤并发执行，不指定则逐步顺序执行"
+    )
+
+    @model_validator(mode='after')
+    def validate_pinned(self) -> 'TestPlanCreateRequest':
+        """固定步骤必须属于计划"""
+        unknown = set(self.pinned_command_ids) - set(self.command_ids)
+        if unknown:
+            raise ValueError(f'固定步骤不在计划中: {sorted(unknown)}')
+        return self
+
+    @model_validator(mode='after')
+    def validate_dependencies(self) -> 'TestPlanCreateRequest':
+        """依赖只能引用计划内的指令且不能成环"""
+        if self.dependencies is None:
+            return self
+        if len(set(self.command_ids)) != len(self.command_ids):
+            raise ValueError('声明依赖的计划中指令不能重复')
+
+        unknown = {
+            command_id for step, requires in self.dependencies.items() for command_id in [step, *requires]
+        } - set(self.command_ids)
+        if unknown:
+            raise ValueError(f'依赖引用的指令不在计划中: {sorted(unknown)}')
+
+        # 逐个移除没有未完成依赖的步骤，剩下的即为环
+        remaining = {step: set(self.dependencies.get(step, [])) for step in self.command_ids}
+        while remaining:
+            ready = [step for step, requires in remaining.items() if not requires & remaining.keys()]
+            if not ready:
+                raise ValueError(f'步骤依赖存在循环: {sorted(remaining)}')
+            for step in ready:
+                del remaining[step]
+        return self
+
+
+class TestPlanResponse(BaseModel):
+    """测试计划响应"""
+    id: str = Field(..., description="测试计划ID")
+    name: str = Field(..., description="计划名称")
+    description: str = Field(default="", description="计划描述")
+    command_ids: List[str] = Field(..., description="按执行顺序排列的指令ID")
+    pinned_command_ids: List[str] = Field(default=[], description="优化排序时保持原位置的指令ID")
+    dependencies: Optional[Dict[str, List[str]]] = Field(None, description="步骤依赖，为空表示顺序执行")
+    created_at: datetime = Field(..., description="创建时间")
+
+    @field_serializer('created_at')
+    def serialize_created_at(self, dt: datetime) -> int:
+        """将datetime序列化为毫秒时间戳"""
+        return int(dt.timestamp() * 1000)
+
+
+class WorkflowRunRequest(BaseModel):
+    """启动工作流请求"""
+    plan_id: Optional[str] = Field(None, description="测试计划ID，不指定则按指令列表顺序执行全部常用指令")
+    mac_address: str = Field(..., min_length=1, max_length=17, description="MAC地址")
+    serial_id: Optional[int] = Field(None, description="默认串口ID，指令未指定目标串口时使用")
+    operator: Optional[str] = Field(None, max_length=100, description="操作员")
+    workstation: Optional[str] = Field(None, max_length=100, description="工位")
+    device_id: Optional[str] = Field(None, max_length=100, description="设备ID")
+    stop_on_failure: bool = Field(default=False, description="步骤失败时是否停止后续步骤")
+    optimize_order: bool = Field(default=False, description="按历史失败率与耗时重排非固定步骤，最可能失败的先执行")
+    abort_on_hard_failure: bool = Field(default=False, description="自动判定的步骤失败（无响应/响应不符/串口错误）时立即结束")
+
+
+class WorkflowRunState(str, Enum):
+    """工作流运行状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    WAITING_CONFIRMATION = "waiting_confirmation"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class WorkflowConfirmRequest(BaseModel):
+    """人工确认请求"""
+    choice: bool = Field(..., description="测试是否成功")
+
+
+class WorkflowRunStatus(BaseModel):
+    """工作流运行状态"""
+    run_id: str = Field(..., description="运行ID")
+    plan_id: Optional[str] = Field(None, description="测试计划ID")
+    mac_address: str = Field(..., description="MAC地址")
+    state: WorkflowRunState = Field(..., description="运行状态")
+    current_step: int = Field(default=-1, description="当前步骤序号（并发执行时为最近开始的步骤）")
+    running_steps: List[int] = Field(default=[], description="正在执行的步骤序号")
+    total_steps: int = Field(..., description="总步骤数")
+    command_ids: List[str] = Field(default=[], description="实际执行顺序的指令ID")
+    passed_tests: int = Field(default=0, description="通过数")
+    failed_tests: int = Field(default=0, description="失败数")
+    skipped_tests: int = Field(default=0, description="跳过数")
+    test_result_id: Optional[str] = Field(None, description="保存后的测试结果ID")
+    error: Optional[str] = Field(None, description="错误信息")
+    urcs: List[UrcEvent] = Field(default=[], description="运行期间测试串口上收到的主动上报")
+    start_time: int = Field(..., description="开始时间（毫秒时间戳）")
+    end_time: Optional[int] = Field(None, description="结束时间（毫秒时间戳）")
@@ -0,0 +1,130 @@
+"""
+Baudrate Service
+波特率检测：多个串口并行检测，按该硬件ID历史上检测成功的波特率排序候选，检测结果持久化供重连直接使用
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine, read_engine, run_in_db, PortBaudrate
+from app.drivers.serial_driver import serial_driver
+from app.schemas.serial_schemas import BaudrateDetectResult
+from app.services.port_inventory_service import port_inventory_service
+
+logger = logging.getLogger(__name__)
+
+# 没有可用硬件ID的设备（如虚拟串口），按设备路径记录
+UNKNOWN_HWIDS = ("", "n/a", "Unknown")
+
+
+class BaudrateService:
+    """波特率检测服务"""
+
+    def _get_session(self):
+        """获取数据库会话"""
+        return Session(engine)
+
+    def _get_read_session(self):
+        """获取只读数据库会话（列表、详情与统计查询）"""
+        return Session(read_engine)
+
+    async def get_hwid(self, port: str) -> str:
+        """获取设备的硬件ID作为检测记录的键"""
+        await port_inventory_service.ensure_scanned()
+        info = next((info for info in port_inventory_service.get_ports() if info.device == port), None)
+        if info is None or info.hwid in UNKNOWN_HWIDS:
+            return f"port:{port}"
+        return info.hwid
+
+    async def get_history(self, hwid: str) -> List[PortBaudrate]:
+        """获取该硬件ID的检测记录，最近成功的在前"""
+        statement = select(PortBaudrate).where(PortBaudrate.hwid == hwid).order_by(PortBaudrate.last_success.desc())
+        return await run_in_db(
+            self._get_read_session, lambda session: list(session.exec(statement).all()), readonly=True
+        )
+
+    @staticmethod
+    def order_candidates(history: List[PortBaudrate]) -> List[int]:
+        """候选顺序：最近一次成功的波特率，其余成功过的按次数，最后是配置列表中的其他波特率"""
+        ordered = []
+        if history:
+            ordered.append(history[0].baudrate)
+            ordered.extend(record.baudrate for record in sorted(history[1:], key=lambda r: -r.success_count))
+        ordered.extend(baudrate for baudrate in settings.AUTO_BAUDRATE_LIST if baudrate not in ordered)
+        return ordered
+
+    async def record_success(self, hwid: str, port: str, baudrate: int):
+        """保存检测成功的波特率"""
+        await run_in_db(self._get_session, lambda session: self._record_success(session, hwid, port, baudrate))
+
+    @staticmethod
+    def _record_success(session: Session, hwid: str, port: str, baudrate: int):
+        record = session.get(PortBaudrate, (hwid, baudrate))
+        if record is None:
+            record = PortBaudrate(hwid=hwid, baudrate=baudrate)
+        record.port = port
+        record.success_count += 1
+        record.last_success = datetime.now()
+        session.add(record)
+        session.commit()
+
+    async def detect(self, port: str, test_command: str = "AT", force: bool = False) -> BaudrateDetectResult:
+        """检测单个串口的波特率；已有检测记录且不强制时直接返回，不打开串口"""
+        start = time.perf_counter()
+        hwid = await self.get_hwid(port)
+        history = await self.get_history(hwid)
+
+        # 已连接的串口不能再打开测试，返回当前使用的波特率
+        connected = next(
+            (serial_id for serial_id, path in serial_driver.connected_ports.items() if path == port), None
+        )
+        if connected is not None:
+            known_baudrate = serial_driver.port_configs[connected]["baudrate"]
+        elif history and not force:
+            known_baudrate = history[0].baudrate
+        else:
+            known_baudrate = None
+        if known_baudrate is not None:
+            return BaudrateDetectResult(
+                port=port, hwid=hwid, baudrate=known_baudrate, cached=True, probes=0,
+                elapsed_ms=(time.perf_counter() - start) * 1000
+            )
+
+        command = test_command.encode() + b"\r\n"
+        baudrate = None
+        probes = 0
+        for candidate in self.order_candidates(history):
+            probes += 1
+            if await serial_driver.probe_baudrate(port, candidate, command):
+                baudrate = candidate
+                break
+
+        if baudrate is not None:
+            await self.record_success(hwid, port, baudrate)
+            logger.info(f"Detected baudrate {baudrate} on {port} ({hwid}) after {probes} probes")
+        else:
+            logger.warning(f"No working baudrate found on {port} ({hwid})")
+
+        return BaudrateDetectResult(
+            port=port, hwid=hwid, baudrate=baudrate, cached=False, probes=probes,
+            elapsed_ms=(time.perf_counter() - start) * 1000
+        )
+
+    async def detect_many(self, ports: List[str], test_command: str = "AT",
+                          force: bool = False) -> List[BaudrateDetectResult]:
+        """并行检测多个串口"""
+        return list(await asyncio.gather(*(self.detect(port, test_command, force) for port in ports)))
+
+    async def resolve(self, port: str) -> Optional[int]:
+        """连接时使用的波特率：优先已保存的检测结果，否则检测"""
+        return (await self.detect(port)).baudrate
+
+
+# 创建服务实例
+baudrate_service = BaudrateService()
@@ -9,9 +9,12 @@ from typing import List, Optional
 from datetime import datetime
 from sqlmodel import Session, select, and_, or_
 
-from app.core.database import engine, Command
+from app.core.database import engine, read_engine, run_in_db, Command
 from app.core.config import settings
-from app.schemas.command_schemas import SavedCommand, CreateCommandRequest, UpdateCommandRequest
+from app.schemas.command_schemas import (
+    SavedCommand, CreateCommandRequest, UpdateCommandRequest, CommandTimeoutInfo
+)
+from app.services.latency_service import latency_service
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,10 @@ class CommandService:
         """获取数据库会话"""
         return Session(engine)
 
+    def _get_read_session(self):
+        """获取只读数据库会话（列表、详情与统计查询）"""
+        return Session(read_engine)
+
     def _command_to_schema(self, db_command: Command) -> SavedCommand:
         """将数据库模型转换为API schema"""
         return SavedCommand(
@@ -37,167 +44,199 @@ class CommandService:
             send_as_hex=db_command.send_as_hex,
             show_notification=db_command.show_notification,
             target_serial_id=db_command.target_serial_id,
+            read_timeout=db_command.read_timeout,
             created_at=db_command.created_at
         )
     
     async def get_all_commands(self) -> List[SavedCommand]:
         """获取所有常用指令"""
+        def query(session: Session) -> List[SavedCommand]:
+            # 查询所有指令，按创建时间降序排序
+            db_commands = session.exec(
+                select(Command).order_by(Command.created_at.desc())
+            ).all()
+            return [self._command_to_schema(cmd) for cmd in db_commands]
+
         try:
-            with self._get_session() as session:
-                # 查询所有指令，按创建时间降序排序
-                db_commands = session.exec(
-                    select(Command).order_by(Command.created_at.desc())
-                ).all()
-
-                commands = [self._command_to_schema(cmd) for cmd in db_commands]
-                logger.debug(f"Loaded {len(commands)} commands from database")
-                return commands
+            commands = await run_in_db(self._get_read_session, query, readonly=True)
+            logger.debug(f"Loaded {len(commands)} commands from database")
+            return commands
         except Exception as e:
             logger.error(f"Error getting all commands: {e}")
             return []
     
     async def get_command_by_id(self, command_id: str) -> Optional[SavedCommand]:
         """根据ID获取指令"""
-        try:
-            with self._get_session() as session:
-                db_command = session.exec(
-                    select(Command).where(Command.id == command_id)
-                ).first()
+        def query(session: Session) -> Optional[SavedCommand]:
+            db_command = session.exec(
+                select(Command).where(Command.id == command_id)
+            ).first()
 
-                if db_command:
-                    return self._command_to_schema(db_command)
-                return None
+            if db_command:
+                return self._command_to_schema(db_command)
+            return None
+
+        try:
+            return await run_in_db(self._get_read_session, query, readonly=True)
         except Exception as e:
             logger.error(f"Error getting command by id {command_id}: {e}")
             return None
     
     async def create_command(self, request: CreateCommandRequest) -> Optional[SavedCommand]:
         """创建新的常用指令"""
-        try:
-            with self._get_session() as session:
-                # 检查是否已存在相同名称的指令
-                existing = session.exec(
-                    select(Command).where(
-                        and_(
-                            Command.name.ilike(request.name.strip()),
-                            Command.command == request.command.strip()
-                        )
+        def create(session: Session) -> Optional[SavedCommand]:
+            # 检查是否已存在相同名称的指令
+            existing = session.exec(
+                select(Command).where(
+                    and_(
+                        Command.name.ilike(request.name.strip()),
+                        Command.command == request.command.strip()
                     )
-                ).first()
-
-                if existing:
-                    logger.warning(f"Similar command already exists: {request.name}")
-                    return None
-
-                # 创建新指令
-                new_command = Command(
-                    id=str(uuid.uuid4()),
-                    name=request.name.strip(),
-                    command=request.command.strip(),
-                    description=request.description.strip(),
-                    expected_response=request.expected_response.strip(),
-                    send_as_hex=request.send_as_hex,
-                    show_notification=request.show_notification,
-                    target_serial_id=request.target_serial_id
                 )
+            ).first()
 
-                session.add(new_command)
-                session.commit()
-                session.refresh(new_command)
+            if existing:
+                logger.warning(f"Similar command already exists: {request.name}")
+                return None
 
-                logger.info(f"Created new command: {new_command.name}")
-                return self._command_to_schema(new_command)
+            # 创建新指令
+            new_command = Command(
+                id=str(uuid.uuid4()),
+                name=request.name.strip(),
+                command=request.command.strip(),
+                description=request.description.strip(),
+                expected_response=request.expected_response.strip(),
+                send_as_hex=request.send_as_hex,
+                show_notification=request.show_notification,
+                target_serial_id=request.target_serial_id,
+                read_timeout=request.read_timeout
+            )
+
+            session.add(new_command)
+            session.commit()
+            session.refresh(new_command)
+
+            logger.info(f"Created new command: {new_command.name}")
+            return self._command_to_schema(new_command)
 
+        try:
+            return await run_in_db(self._get_session, create)
         except Exception as e:
             logger.error(f"Error creating command: {e}")
             return None
     
     async def update_command(self, command_id: str, request: UpdateCommandRequest) -> Optional[SavedCommand]:
         """更新指令"""
-        try:
-            with self._get_session() as session:
-                # 查找要更新的指令
-                db_command = session.exec(
-                    select(Command).where(Command.id == command_id)
+        def update(session: Session) -> Optional[SavedCommand]:
+            # 查找要更新的指令
+            db_command = session.exec(
+                select(Command).where(Command.id == command_id)
+            ).first()
+
+            if not db_command:
+                logger.warning(f"Command with id {command_id} not found")
+                return None
+
+            # 检查名称冲突（如果要更新名称的话）
+            if request.name and request.name.strip().lower() != db_command.name.lower():
+                existing = session.exec(
+                    select(Command).where(
+                        and_(
+                            Command.name.ilike(request.name.strip()),
+                            Command.id != command_id
+                        )
+                    )
                 ).first()
 
-                if not db_command:
-                    logger.warning(f"Command with id {command_id} not found")
+                if existing:
+                    logger.warning(f"Command with name '{request.name}' already exists")
                     return None
 
-                # 检查名称冲突（如果要更新名称的话）
-                if request.name and request.name.strip().lower() != db_command.name.lower():
-                    existing = session.exec(
-                        select(Command).where(
-                            and_(
-                                Command.name.ilike(request.name.strip()),
-                                Command.id != command_id
-                            )
-                        )
-                    ).first()
-
-                    if existing:
-                        logger.warning(f"Command with name '{request.name}' already exists")
-                        return None
-
-                # 更新字段
-                if request.name is not None:
-                    db_command.name = request.name.strip()
-                if request.command is not None:
-                    db_command.command = request.command.strip()
-                if request.description is not None:
-                    db_command.description = request.description.strip()
-                if request.expected_response is not None:
-                    db_command.expected_response = request.expected_response.strip()
-                if request.send_as_hex is not None:
-                    db_command.send_as_hex = request.send_as_hex
-                if request.show_notification is not None:
-                    db_command.show_notification = request.show_notification
-                if request.target_serial_id is not None:
-                    db_command.target_serial_id = request.target_serial_id
-
-                session.add(db_command)
-                session.commit()
-                session.refresh(db_command)
-
-                logger.info(f"Updated command: {db_command.name}")
-                return self._command_to_schema(db_command)
+            # 更新字段
+            if request.name is not None:
+                db_command.name = request.name.strip()
+            if request.command is not None:
+                db_command.command = request.command.strip()
+            if request.description is not None:
+                db_command.description = request.description.strip()
+            if request.expected_response is not None:
+                db_command.expected_response = request.expected_response.strip()
+            if request.send_as_hex is not None:
+                db_command.send_as_hex = request.send_as_hex
+            if request.show_notification is not None:
+                db_command.show_notification = request.show_notification
+            if request.target_serial_id is not None:
+                db_command.target_serial_id = request.target_serial_id
+            if request.read_timeout is not None:
+                db_command.read_timeout = request.read_timeout or None
+
+            session.add(db_command)
+            session.commit()
+            session.refresh(db_command)
+
+            logger.info(f"Updated command: {db_command.name}")
+            return self._command_to_schema(db_command)
 
+        try:
+            return await run_in_db(self._get_session, update)
         except Exception as e:
             logger.error(f"Error updating command {command_id}: {e}")
             return None
     
     async def delete_command(self, command_id: str) -> bool:
         """删除指令"""
-        try:
-            with self._get_session() as session:
-                # 查找要删除的指令
-                db_command = session.exec(
-                    select(Command).where(Command.id == command_id)
-                ).first()
+        def delete(session: Session) -> bool:
+            # 查找要删除的指令
+            db_command = session.exec(
+                select(Command).where(Command.id == command_id)
+            ).first()
 
-                if not db_command:
-                    logger.warning(f"Command with id {command_id} not found")
-                    return False
+            if not db_command:
+                logger.warning(f"Command with id {command_id} not found")
+                return False
 
-                session.delete(db_command)
-                session.commit()
+            session.delete(db_command)
+            session.commit()
 
-                logger.info(f"Deleted command with id: {command_id}")
-                return True
+            logger.info(f"Deleted command with id: {command_id}")
+            return True
 
+        try:
+            return await run_in_db(self._get_session, delete)
         except Exception as e:
             logger.error(f"Error deleting command {command_id}: {e}")
             return False
     
+    async def get_command_timeouts(self) -> List[CommandTimeoutInfo]:
+        """获取每条指令的人工超时设置与各串口学习到的超时"""
+        commands = await self.get_all_commands()
+        return [
+            CommandTimeoutInfo(
+                command_id=cmd.id,
+                name=cmd.name,
+                command=cmd.command,
+                read_timeout=cmd.read_timeout,
+                default_timeout=settings.SERIAL_READ_TIMEOUT,
+                ports=latency_service.get_stats(cmd.command)
+            )
+            for cmd in commands
+        ]
+    
+    async def reset_command_latency(self, command_id: str) -> bool:
+        """清除指令的历史耗时统计，重新学习超时"""
+        command = await self.get_command_by_id(command_id)
+        if command is None:
+            return False
+        latency_service.reset(command.command)
+        logger.info(f"Reset latency stats of command: {command.name}")
+        return True
+    
     async def get_commands_count(self) -> int:
         """获取指令总数"""
         try:
-            with self._get_session() as session:
-                count = session.exec(
-                    select(Command)
-                ).all()
-                return len(count)
+            return await run_in_db(
+                self._get_read_session, lambda session: len(session.exec(select(Command)).all()), readonly=True
+            )
         except Exception as e:
             logger.error(f"Error getting commands count: {e}")
             return 0
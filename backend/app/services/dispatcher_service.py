@@ -0,0 +1,216 @@
+"""
+Dispatcher Service
+多工装调度：待测单元排队，分配给空闲的已连接串口，各串口并行执行工作流并统计产能
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.exceptions import HMIException, SerialException, ErrorCode
+from app.drivers.serial_driver import serial_driver
+from app.schemas.dispatcher_schemas import (
+    DispatchUnit, DispatchUnitResult, DispatcherStatus, PortThroughput
+)
+from app.schemas.workflow_schemas import WorkflowRunRequest, WorkflowRunState
+from app.services.workflow_service import WorkflowException, workflow_service
+
+logger = logging.getLogger(__name__)
+
+
+class PortWorker:
+    """单个串口的调度工作者及其产能统计"""
+
+    def __init__(self, serial_id: int):
+        self.serial_id = serial_id
+        self.started_at = time.monotonic()
+        self.current_unit: Optional[str] = None
+        self.completed = 0
+        self.passed = 0
+        self.busy_time = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def to_throughput(self) -> PortThroughput:
+        elapsed = time.monotonic() - self.started_at
+        return PortThroughput(
+            serial_id=self.serial_id,
+            port=serial_driver.connected_ports.get(self.serial_id, ""),
+            busy=self.current_unit is not None,
+            current_unit=self.current_unit,
+            completed=self.completed,
+            passed=self.passed,
+            failed=self.completed - self.passed,
+            avg_cycle_time=self.busy_time / self.completed if self.completed else 0.0,
+            units_per_hour=self.completed * 3600 / elapsed if elapsed > 0 else 0.0
+        )
+
+
+class DispatcherService:
+    """多工装调度服务"""
+
+    def __init__(self):
+        # 队列在事件循环中首次使用时创建：Python 3.9 的 asyncio 原语在创建时绑定当前事件循环
+        self.queue: Optional["asyncio.Queue[DispatchUnit]"] = None
+        self.workers: Dict[int, PortWorker] = {}
+        self.recent: deque = deque(maxlen=settings.WORKFLOW_HISTORY_SIZE)
+
+    @property
+    def running(self) -> bool:
+        return any(worker.task is not None and not worker.task.done() for worker in self.workers.values())
+
+    def _get_queue(self) -> "asyncio.Queue[DispatchUnit]":
+        """获取待测队列，首次调用时在当前事件循环中创建"""
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        return self.queue
+
+    def enqueue(self, units: List[DispatchUnit]) -> int:
+        """加入待测队列，返回排队中的单元数"""
+        queue = self._get_queue()
+        for unit in units:
+            queue.put_nowait(unit)
+        logger.info(f"Dispatcher: {len(units)} units enqueued, {queue.qsize()} queued")
+        return queue.qsize()
+
+    def start(self, serial_ids: Optional[List[int]] = None) -> DispatcherStatus:
+        """为每个串口启动一个工作者；已在运行的串口保持不变"""
+        connected = list(serial_driver.connected_ports.keys())
+        if serial_ids is None:
+            serial_ids = connected
+        missing = [serial_id for serial_id in serial_ids if serial_id not in connected]
+        if missing:
+            raise SerialException(ErrorCode.SERIAL_NOT_CONNECTED, f"串口未连接: {missing}")
+        if not serial_ids:
+            raise SerialException(ErrorCode.SERIAL_NOT_CONNECTED, "没有已连接的串口")
+
+        queue = self._get_queue()
+        for serial_id in serial_ids:
+            worker = self.workers.get(serial_id)
+            if worker is not None and worker.task is not None and not worker.task.done():
+                continue
+            worker = PortWorker(serial_id)
+            worker.task = asyncio.create_task(self._work(worker, queue))
+            self.workers[serial_id] = worker
+
+        logger.info(f"Dispatcher started on ports {sorted(serial_ids)}")
+        return self.get_status()
+
+    async def stop(self):
+        """停止所有工作者：进行中的单元被取消并放回队列，排队中的单元保留"""
+        tasks = [worker.task for worker in self.workers.values() if worker.task and not worker.task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("Dispatcher stopped")
+
+    async def join(self):
+        """等待队列中的单元全部完成"""
+        await self._get_queue().join()
+
+    def clear(self) -> int:
+        """清空排队中的单元，返回清除数量"""
+        cleared = 0
+        while self.queue is not None and not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            cleared += 1
+        return cleared
+
+    def get_status(self) -> DispatcherStatus:
+        """获取调度状态与各串口产能"""
+        ports = [worker.to_throughput() for worker in self.workers.values()]
+        return DispatcherStatus(
+            running=self.running,
+            queued=self.queue.qsize() if self.queue is not None else 0,
+            total_completed=sum(port.completed for port in ports),
+            units_per_hour=sum(port.units_per_hour for port in ports),
+            ports=sorted(ports, key=lambda port: port.serial_id),
+            recent=list(reversed(self.recent))
+        )
+
+    async def _work(self, worker: PortWorker, queue: "asyncio.Queue[DispatchUnit]"):
+        """串口工作者：串口空闲时从队列取下一个单元执行"""
+        while True:
+            unit = await queue.get()
+            if worker.serial_id not in serial_driver.connected_ports:
+                # 串口已断开：单元放回队列交给其他串口
+                queue.put_nowait(unit)
+                queue.task_done()
+                logger.warning(f"Dispatcher: serial {worker.serial_id} disconnected, worker exits")
+                return
+
+            worker.current_unit = unit.mac_address
+            start = time.monotonic()
+            try:
+                result = await self._run_unit(worker.serial_id, unit)
+            except asyncio.CancelledError:
+                # 调度停止：进行中的单元放回队列，重新启动后重测
+                queue.put_nowait(unit)
+                logger.warning(f"Dispatcher: unit {unit.mac_address} on serial {worker.serial_id} "
+                               f"cancelled and requeued")
+                raise
+            finally:
+                worker.current_unit = None
+                queue.task_done()
+
+            result.cycle_time = time.monotonic() - start
+            worker.busy_time += result.cycle_time
+            worker.completed += 1
+            worker.passed += int(result.passed)
+            self.recent.append(result)
+
+    async def _check_plan_ports(self, plan_id: Optional[str]):
+        """调度按单元分配串口，计划中指定了目标串口的指令会绕开分配的串口，拒绝执行"""
+        commands = await workflow_service.load_plan_commands(plan_id)
+        pinned = sorted({command.target_serial_id for command in commands if command.target_serial_id is not None})
+        if pinned:
+            raise WorkflowException(
+                ErrorCode.PARAM_ERROR, f"调度执行的测试计划不能包含指定目标串口的指令（串口 {pinned}）"
+            )
+
+    async def _run_unit(self, serial_id: int, unit: DispatchUnit) -> DispatchUnitResult:
+        """在指定串口上执行一个单元的工作流"""
+        request = WorkflowRunRequest(
+            plan_id=unit.plan_id,
+            mac_address=unit.mac_address,
+            serial_id=serial_id,
+            operator=unit.operator,
+            workstation=unit.workstation,
+            device_id=unit.device_id,
+            stop_on_failure=unit.stop_on_failure,
+            optimize_order=unit.optimize_order,
+            abort_on_hard_failure=unit.abort_on_hard_failure
+        )
+        try:
+            await self._check_plan_ports(unit.plan_id)
+            status = await workflow_service.run(request)
+            passed = status.state == WorkflowRunState.COMPLETED and status.failed_tests == 0 \
+                and status.skipped_tests == 0
+            run_id, test_result_id, error = status.run_id, status.test_result_id, status.error
+        except HMIException as e:
+            logger.error(f"Dispatcher: unit {unit.mac_address} on serial {serial_id} failed to start: {e.message}")
+            passed, run_id, test_result_id, error = False, None, None, e.message
+        except Exception as e:
+            # 工作者不能因单个单元的意外错误退出，否则该串口不再取新单元
+            logger.exception(f"Dispatcher: unit {unit.mac_address} on serial {serial_id} failed: {e}")
+            passed, run_id, test_result_id, error = False, None, None, str(e)
+
+        logger.info(f"Dispatcher: unit {unit.mac_address} on serial {serial_id} {'PASS' if passed else 'FAIL'}")
+        return DispatchUnitResult(
+            mac_address=unit.mac_address,
+            serial_id=serial_id,
+            run_id=run_id,
+            passed=passed,
+            test_result_id=test_result_id,
+            error=error,
+            cycle_time=0.0,
+            finished_at=int(time.time() * 1000)
+        )
+
+
+# 创建服务实例
+dispatcher_service = DispatcherService()
@@ -0,0 +1,185 @@
+"""
+Fixture Service
+工装配置：保存每个工位串口的线路参数与固定串口ID，启动时并行自动连接，连接不依赖浏览器会话
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import List, Optional
+
+from sqlmodel import Session, select
+
+from app.core.database import engine, read_engine, run_in_db, FixtureProfile
+from app.core.exceptions import ConfigException, ErrorCode
+from app.drivers.serial_driver import serial_driver
+from app.schemas.fixture_schemas import FixtureConnectResult, FixtureProfileCreateRequest, FixtureProfileResponse
+from app.services.baudrate_service import baudrate_service
+from app.services.port_inventory_service import port_inventory_service
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureService:
+    """工装配置服务"""
+
+    def _get_session(self):
+        """获取数据库会话"""
+        return Session(engine)
+
+    def _get_read_session(self):
+        """获取只读数据库会话（列表、详情与统计查询）"""
+        return Session(read_engine)
+
+    def _profile_to_schema(self, profile: FixtureProfile) -> FixtureProfileResponse:
+        connected_port = serial_driver.connected_ports.get(profile.serial_id)
+        return FixtureProfileResponse(
+            **profile.model_dump(),
+            connected=connected_port is not None,
+            connected_port=connected_port
+        )
+
+    async def _load_profiles(self) -> List[FixtureProfile]:
+        statement = select(FixtureProfile).order_by(FixtureProfile.serial_id)
+        return await run_in_db(
+            self._get_read_session, lambda session: list(session.exec(statement).all()), readonly=True
+        )
+
+    async def refresh_reservations(self):
+        """工装配置的串口ID不分配给临时连接，设备暂时不在时ID也保持不变"""
+        serial_driver.reserved_ids = {profile.serial_id for profile in await self._load_profiles() if profile.enabled}
+
+    # ------------------------------------------------------------------
+    # 配置管理
+    # ------------------------------------------------------------------
+
+    async def create_profile(self, request: FixtureProfileCreateRequest) -> FixtureProfileResponse:
+        """创建工装配置"""
+        def create(session: Session) -> FixtureProfile:
+            existing = session.exec(
+                select(FixtureProfile).where(FixtureProfile.serial_id == request.serial_id)
+            ).first()
+            if existing is not None:
+                raise ConfigException(
+                    ErrorCode.CONFIG_INVALID_PARAMS, f"串口ID {request.serial_id} 已被工位 {existing.station} 使用"
+                )
+
+            profile = FixtureProfile(id=str(uuid.uuid4()), **request.model_dump())
+            profile.station = profile.station.strip()
+            profile.port = profile.port.strip()
+            profile.hwid = profile.hwid.strip()
+            session.add(profile)
+            session.commit()
+            session.refresh(profile)
+            return profile
+
+        profile = await run_in_db(self._get_session, create)
+        await self.refresh_reservations()
+        logger.info(f"Created fixture profile: {profile.station} -> serial_id {profile.serial_id}")
+        return self._profile_to_schema(profile)
+
+    async def get_profiles(self) -> List[FixtureProfileResponse]:
+        """获取所有工装配置（按串口ID排序）"""
+        return [self._profile_to_schema(profile) for profile in await self._load_profiles()]
+
+    async def get_profile(self, profile_id: str) -> Optional[FixtureProfileResponse]:
+        """根据ID获取工装配置"""
+        profile = await run_in_db(
+            self._get_read_session, lambda session: session.get(FixtureProfile, profile_id), readonly=True
+        )
+        return self._profile_to_schema(profile) if profile else None
+
+    async def delete_profile(self, profile_id: str) -> bool:
+        """删除工装配置（已建立的连接保持不变）"""
+        def delete(session: Session) -> Optional[FixtureProfile]:
+            profile = session.get(FixtureProfile, profile_id)
+            if profile is not None:
+                session.delete(profile)
+                session.commit()
+            return profile
+
+        profile = await run_in_db(self._get_session, delete)
+        if profile is None:
+            return False
+        await self.refresh_reservations()
+        logger.info(f"Deleted fixture profile: {profile.station}")
+        return True
+
+    # ------------------------------------------------------------------
+    # 连接
+    # ------------------------------------------------------------------
+
+    async def resolve_port(self, profile: FixtureProfile) -> str:
+        """确定工装当前的设备路径：指定硬件ID时按硬件ID查找，否则使用设备路径"""
+        if profile.hwid:
+            await port_inventory_service.ensure_scanned()
+            for info in port_inventory_service.get_ports():
+                if info.hwid == profile.hwid:
+                    return info.device
+            raise ConfigException(ErrorCode.CONFIG_INVALID_PORT, f"未找到硬件ID为 {profile.hwid} 的设备")
+        return profile.port
+
+    async def connect_profile(self, profile: FixtureProfile) -> FixtureConnectResult:
+        """按工装配置连接串口，使用配置中的固定串口ID；失败记录在结果中而不抛出"""
+        start = time.perf_counter()
+        port = None
+        baudrate = None
+        error = None
+        try:
+            port = await self.resolve_port(profile)
+            if serial_driver.connected_ports.get(profile.serial_id) != port:
+                baudrate = profile.baudrate
+                if profile.auto_baudrate:
+                    baudrate = await baudrate_service.resolve(port) or profile.baudrate
+                await serial_driver.connect(
+                    port,
+                    serial_id=profile.serial_id,
+                    idle_gap=profile.idle_gap,
+                    baudrate=baudrate,
+                    bytesize=profile.bytesize,
+                    parity=profile.parity,
+                    stopbits=profile.stopbits,
+                    timeout=profile.timeout
+                )
+            baudrate = serial_driver.port_configs[profile.serial_id]["baudrate"]
+        except ConfigException as e:
+            error = e.message
+        except Exception as e:
+            error = str(e)
+
+        if error:
+            logger.error(f"Fixture {profile.station} (serial_id {profile.serial_id}) failed to connect: {error}")
+        return FixtureConnectResult(
+            profile_id=profile.id,
+            station=profile.station,
+            serial_id=profile.serial_id,
+            port=port,
+            baudrate=baudrate,
+            connected=error is None,
+            error=error,
+            elapsed_ms=(time.perf_counter() - start) * 1000
+        )
+
+    async def connect(self, profile_id: str) -> FixtureConnectResult:
+        """连接单个工装"""
+        profile = await run_in_db(
+            self._get_read_session, lambda session: session.get(FixtureProfile, profile_id), readonly=True
+        )
+        if profile is None:
+            raise ConfigException(ErrorCode.CONFIG_INVALID_PARAMS, f"工装配置不存在: {profile_id}")
+        return await self.connect_profile(profile)
+
+    async def connect_all(self) -> List[FixtureConnectResult]:
+        """并行连接所有启用的工装"""
+        start = time.perf_counter()
+        profiles = [profile for profile in await self._load_profiles() if profile.enabled]
+        serial_driver.reserved_ids = {profile.serial_id for profile in profiles}
+        results = list(await asyncio.gather(*(self.connect_profile(profile) for profile in profiles)))
+        connected = sum(1 for result in results if result.connected)
+        logger.info(f"Fixtures connected: {connected}/{len(results)} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return results
+
+
+# 创建服务实例
+fixture_service = FixtureService()
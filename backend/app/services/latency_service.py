@@ -0,0 +1,93 @@
+"""
+Latency Service
+按串口和指令记录响应耗时，用滚动 p99 乘以安全系数得出每条指令自己的超时时间
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.command_schemas import CommandLatencyStats
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """已排序样本的分位数（最近秩法）"""
+    index = max(0, min(len(sorted_samples) - 1, int(len(sorted_samples) * fraction + 0.5) - 1))
+    return sorted_samples[index]
+
+
+class LatencyService:
+    """指令响应耗时统计与自适应超时"""
+
+    def __init__(self):
+        self._samples: Dict[Tuple[int, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(serial_id: int, command: str) -> Tuple[int, str]:
+        return serial_id, command.strip()
+
+    def record(self, serial_id: int, command: str, elapsed: float):
+        """记录一次完整响应的耗时（秒）；超时未完成的事务不记录"""
+        key = self._key(serial_id, command)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=settings.SERIAL_LATENCY_WINDOW)
+            samples.append(elapsed)
+
+    def reset(self, command: Optional[str] = None):
+        """清除统计（不指定指令则清除全部）"""
+        with self._lock:
+            if command is None:
+                self._samples.clear()
+                return
+            for key in [key for key in self._samples if key[1] == command.strip()]:
+                del self._samples[key]
+
+    def learned_timeout(self, serial_id: int, command: str) -> Optional[float]:
+        """根据历史 p99 计算超时；样本不足时返回 None"""
+        with self._lock:
+            samples = sorted(self._samples.get(self._key(serial_id, command), ()))
+        if len(samples) < settings.SERIAL_LATENCY_MIN_SAMPLES:
+            return None
+        timeout = percentile(samples, 0.99) * settings.SERIAL_TIMEOUT_SAFETY_FACTOR
+        return min(max(timeout, settings.SERIAL_TIMEOUT_MIN), settings.SERIAL_TIMEOUT_MAX)
+
+    def resolve_timeout(self, serial_id: int, command: str, override: Optional[float] = None) -> float:
+        """确定本次指令的超时：显式指定 > 历史学习 > 默认值"""
+        if override:
+            return override
+        if settings.SERIAL_ADAPTIVE_TIMEOUT:
+            learned = self.learned_timeout(serial_id, command)
+            if learned is not None:
+                return learned
+        return settings.SERIAL_READ_TIMEOUT
+
+    def get_stats(self, command: Optional[str] = None) -> List[CommandLatencyStats]:
+        """获取各串口各指令的耗时统计（毫秒）"""
+        with self._lock:
+            items = [
+                (key, sorted(samples)) for key, samples in self._samples.items()
+                if samples and (command is None or key[1] == command.strip())
+            ]
+        stats = []
+        for (serial_id, text), samples in sorted(items):
+            stats.append(CommandLatencyStats(
+                serial_id=serial_id,
+                command=text,
+                samples=len(samples),
+                p50_ms=percentile(samples, 0.5) * 1000,
+                p99_ms=percentile(samples, 0.99) * 1000,
+                max_ms=samples[-1] * 1000,
+                learned_timeout=self.learned_timeout(serial_id, text)
+            ))
+        return stats
+
+
+# 创建服务实例
+latency_service = LatencyService()
@@ -0,0 +1,46 @@
+"""
+Plan Optimizer
+失败优先排序：按历史失败率与耗时重排相互独立的测试步骤，让最可能失败（按单位耗时计）的步骤先执行
+"""
+
+import statistics
+from typing import Collection, Dict, List, Tuple
+
+from app.schemas.command_schemas import SavedCommand
+
+# 没有耗时数据时假定的单步耗时（秒）
+DEFAULT_STEP_DURATION = 1.0
+# 失败率平滑强度：历史越少越接近整体失败率
+PRIOR_WEIGHT = 2.0
+
+
+def failure_probabilities(command_ids: List[str], failure_stats: Dict[str, Tuple[int, int]]) -> Dict[str, float]:
+    """根据历史 (执行次数, 失败次数) 估计每条指令的失败概率，以计划整体失败率为先验做平滑"""
+    total_runs = sum(runs for runs, _ in failure_stats.values())
+    total_failures = sum(failures for _, failures in failure_stats.values())
+    prior = (total_failures + 1) / (total_runs + 2)
+
+    probabilities = {}
+    for command_id in command_ids:
+        runs, failures = failure_stats.get(command_id, (0, 0))
+        probabilities[command_id] = (failures + PRIOR_WEIGHT * prior) / (runs + PRIOR_WEIGHT)
+    return probabilities
+
+
+def fail_fast_order(commands: List[SavedCommand], failure_stats: Dict[str, Tuple[int, int]],
+                    durations: Dict[str, float], pinned: Collection[str] = ()) -> List[SavedCommand]:
+    """重排步骤：固定步骤保持原位置，其余步骤按 失败概率/耗时 从高到低填入剩余位置
+
+    按 p/t 降序执行可使发现第一个失败前的期望耗时最短
+    """
+    known = [duration for duration in durations.values() if duration > 0]
+    fallback = statistics.median(known) if known else DEFAULT_STEP_DURATION
+    probabilities = failure_probabilities([cmd.id for cmd in commands], failure_stats)
+
+    def score(command: SavedCommand) -> float:
+        duration = durations.get(command.id) or fallback
+        return probabilities[command.id] / duration
+
+    free = [cmd for cmd in commands if cmd.id not in pinned]
+    ranked = iter(sorted(free, key=score, reverse=True))  # sorted 稳定：得分相同保持原顺序
+    return [cmd if cmd.id in pinned else next(ranked) for cmd in commands]
@@ -0,0 +1,197 @@
+"""
+Port Inventory Service
+串口清单缓存：后台扫描串口并缓存结果，监听设备插拔事件，变化时通过事件总线推送
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.drivers.serial_driver import serial_driver
+from app.schemas.serial_schemas import SerialPortInfo
+from app.schemas.websocket import WSMessageType, WSResponseMessage
+
+logger = logging.getLogger(__name__)
+
+# inotify 事件掩码
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+# 串口设备节点名前缀（ttyUSB/ttyACM/ttyS/ttyAMA 等）
+SERIAL_NODE_PREFIXES = ("tty", "rfcomm")
+# 插拔事件后等待 udev 完成设备初始化再扫描（秒）
+RESCAN_DEBOUNCE = 0.3
+
+
+class DeviceNodeWatcher:
+    """基于 inotify 监听目录下设备节点的创建与删除（仅 Linux）
+
+    sysfs 不产生 inotify 事件，设备属性变化依赖定期扫描兜底
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+
+    def open(self) -> bool:
+        """开始监听，不支持 inotify 时返回 False"""
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return False
+            mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+            if libc.inotify_add_watch(fd, self.path.encode(), mask) < 0:
+                os.close(fd)
+                return False
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify unavailable: {e}")
+            return False
+        self.fd = fd
+        return True
+
+    def read_names(self) -> List[str]:
+        """读取已就绪的事件，返回发生变化的文件名"""
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + INOTIFY_EVENT_HEADER.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            names.append(data[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+        return names
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class PortInventoryService:
+    """串口清单服务：接口读取缓存，扫描在线程池中进行，不阻塞事件循环"""
+
+    def __init__(self):
+        self.ports: List[SerialPortInfo] = []
+        self.scanned_at: Optional[float] = None
+        self.scan_count = 0
+        # asyncio 原语在事件循环中创建：Python 3.9 在创建时绑定当前事件循环
+        self._scan_lock: Optional[asyncio.Lock] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._watcher: Optional[DeviceNodeWatcher] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def get_ports(self) -> List[SerialPortInfo]:
+        """获取缓存的串口列表"""
+        return self.ports
+
+    async def ensure_scanned(self):
+        """尚未扫描过时立即扫描一次（例如后台任务未启动）"""
+        if self.scanned_at is None:
+            await self.rescan()
+
+    async def rescan(self) -> bool:
+        """重新扫描串口，清单有变化时推送并返回 True"""
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+        async with self._scan_lock:
+            loop = asyncio.get_running_loop()
+            ports_data = await loop.run_in_executor(None, serial_driver.get_available_ports)
+            ports = sorted((SerialPortInfo(**port) for port in ports_data), key=lambda port: port.device)
+            first_scan = self.scanned_at is None
+            old = {port.device: port for port in self.ports}
+            new = {port.device: port for port in ports}
+
+            self.ports = ports
+            self.scanned_at = time.time()
+            self.scan_count += 1
+
+            added = [port for device, port in new.items() if old.get(device) != port]
+            removed = [device for device in old if device not in new]
+            if first_scan or not (added or removed):
+                return False
+
+        logger.info(f"Serial ports changed: added={[port.device for port in added]}, removed={removed}")
+        await self._publish(added, removed)
+        return True
+
+    async def start(self):
+        """启动后台监听：inotify 事件触发扫描，并按固定间隔重新扫描兜底"""
+        if self._task is not None and not self._task.done():
+            return
+        self._changed = asyncio.Event()
+        self._watcher = DeviceNodeWatcher(settings.SERIAL_PORT_WATCH_DIR)
+        if self._watcher.open():
+            asyncio.get_running_loop().add_reader(self._watcher.fd, self._on_device_event)
+            logger.info(f"Watching {settings.SERIAL_PORT_WATCH_DIR} for serial port hot-plug events")
+        else:
+            self._watcher = None
+            logger.info(f"Hot-plug events unavailable, rescanning serial ports every "
+                        f"{settings.SERIAL_PORT_RESCAN_INTERVAL}s")
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """停止后台监听"""
+        if self._watcher is not None:
+            asyncio.get_running_loop().remove_reader(self._watcher.fd)
+            self._watcher.close()
+            self._watcher = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _on_device_event(self):
+        """inotify 可读回调：串口设备节点增删时唤醒扫描任务"""
+        if any(name.startswith(SERIAL_NODE_PREFIXES) for name in self._watcher.read_names()):
+            self._changed.set()
+
+    async def _watch(self):
+        while True:
+            try:
+                await self.rescan()
+            except Exception as e:
+                logger.error(f"Error scanning serial ports: {e}")
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), settings.SERIAL_PORT_RESCAN_INTERVAL)
+                await asyncio.sleep(RESCAN_DEBOUNCE)  # 合并同一次插拔产生的多个事件
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+
+    async def _publish(self, added: List[SerialPortInfo], removed: List[str]):
+        """推送串口清单变化"""
+        message = WSResponseMessage(
+            type=WSMessageType.PORTS,
+            message="串口列表已更新",
+            data={
+                "added": [port.model_dump() for port in added],
+                "removed": removed,
+                "ports": [port.model_dump() for port in self.ports],
+            },
+            timestamp=datetime.now().isoformat(),
+            success=True
+        )
+        await event_bus.publish(message.model_dump(mode="json"))
+
+
+# 创建服务实例
+port_inventory_service = PortInventoryService()
@@ -0,0 +1,145 @@
+"""
+Port Supervisor Service
+串口断线重连：检测 I/O 故障与设备节点消失，按硬件ID找回设备（USB 转串口复位后路径可能变化）并以指数退避重新打开，
+串口ID与排队中的事务保持不变
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.drivers.serial_driver import serial_driver
+from app.schemas.websocket import WSMessageType, WSResponseMessage
+from app.services.baudrate_service import UNKNOWN_HWIDS
+from app.services.port_inventory_service import port_inventory_service
+
+logger = logging.getLogger(__name__)
+
+
+class PortSupervisorService:
+    """串口连接监护服务"""
+
+    def __init__(self):
+        self.hwids: Dict[int, str] = {}  # serial_id -> 打开串口时记录的硬件ID
+        self.reconnect_counts: Dict[int, int] = {}  # serial_id -> 重连成功次数
+        self._recoveries: Dict[int, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """启动监护：驱动报告故障时立即重连，并定期检查设备节点是否消失"""
+        if self._task is not None and not self._task.done():
+            return
+        serial_driver.auto_reconnect = True
+        serial_driver.failure_listeners.append(self._on_failure)
+        serial_driver.connect_listeners.append(self._record_hwid)
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """停止监护，取消进行中的重连"""
+        serial_driver.auto_reconnect = False
+        if self._on_failure in serial_driver.failure_listeners:
+            serial_driver.failure_listeners.remove(self._on_failure)
+        if self._record_hwid in serial_driver.connect_listeners:
+            serial_driver.connect_listeners.remove(self._record_hwid)
+        tasks = list(self._recoveries.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._recoveries.clear()
+
+    def _record_hwid(self, serial_id: int, port: str):
+        """串口打开（连接或重连）时按当前路径记录硬件ID；查不到时清除旧记录，重连不会按旧设备查找"""
+        hwid = next((info.hwid for info in port_inventory_service.get_ports() if info.device == port), None)
+        if hwid and hwid not in UNKNOWN_HWIDS:
+            self.hwids[serial_id] = hwid
+        else:
+            self.hwids.pop(serial_id, None)
+
+    def _on_failure(self, serial_id: int):
+        """驱动故障回调"""
+        self._start_recovery(serial_id)
+
+    def _start_recovery(self, serial_id: int):
+        task = self._recoveries.get(serial_id)
+        if task is None or task.done():
+            self._recoveries[serial_id] = asyncio.create_task(self._recover(serial_id))
+
+    async def _watch(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking serial ports: {e}")
+            await asyncio.sleep(settings.SERIAL_SUPERVISOR_INTERVAL)
+
+    def check(self):
+        """补录打开时清单中尚未出现的硬件ID；发现故障（如设备节点已消失但尚未读写）时开始重连"""
+        hwids = {info.device: info.hwid for info in port_inventory_service.get_ports()}
+        for serial_id in list(serial_driver.connections):
+            if serial_driver.is_port_healthy(serial_id):
+                hwid = hwids.get(serial_driver.connected_ports.get(serial_id))
+                if serial_id not in self.hwids and hwid and hwid not in UNKNOWN_HWIDS:
+                    self.hwids[serial_id] = hwid
+            elif serial_id in serial_driver.recovering:
+                self._start_recovery(serial_id)
+            else:
+                serial_driver.mark_failed(serial_id, IOError("serial port unavailable"))
+
+        for serial_id in list(self.hwids):
+            if serial_id not in serial_driver.connections:
+                del self.hwids[serial_id]
+
+    async def _locate(self, serial_id: int, port: str) -> Optional[str]:
+        """查找设备当前路径：有硬件ID时按硬件ID查找，否则沿用原路径"""
+        hwid = self.hwids.get(serial_id)
+        if not hwid:
+            return port
+        await port_inventory_service.rescan()
+        return next((info.device for info in port_inventory_service.get_ports() if info.hwid == hwid), None)
+
+    async def _recover(self, serial_id: int):
+        """按指数退避重新打开故障串口，直到成功或用户断开该串口"""
+        port = serial_driver.connected_ports.get(serial_id)
+        if port is None:
+            return
+        await self._publish(WSMessageType.DISCONNECT, serial_id, port, f"串口 {port} 连接中断，正在重连")
+
+        delay = settings.SERIAL_RECONNECT_INITIAL_DELAY
+        attempts = 0
+        while serial_id in serial_driver.recovering:
+            attempts += 1
+            try:
+                new_port = await self._locate(serial_id, port)
+                if new_port is not None:
+                    await serial_driver.reopen(serial_id, new_port)
+                    self.reconnect_counts[serial_id] = self.reconnect_counts.get(serial_id, 0) + 1
+                    logger.info(f"Serial {serial_id}: Reconnected {port} -> {new_port} after {attempts} attempts")
+                    await self._publish(WSMessageType.CONNECT, serial_id, new_port, f"串口 {new_port} 已重新连接")
+                    return
+            except Exception as e:
+                logger.debug(f"Serial {serial_id}: Reconnect attempt {attempts} failed: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.SERIAL_RECONNECT_MAX_DELAY)
+
+        logger.info(f"Serial {serial_id}: Reconnect abandoned, port was disconnected")
+
+    async def _publish(self, message_type: WSMessageType, serial_id: int, port: str, text: str):
+        """推送串口断线/重连事件"""
+        message = WSResponseMessage(
+            type=message_type,
+            message=text,
+            data={"serial_id": serial_id, "port": port, "reconnecting": message_type == WSMessageType.DISCONNECT},
+            timestamp=datetime.now().isoformat(),
+            success=message_type == WSMessageType.CONNECT
+        )
+        await event_bus.publish(message.model_dump(mode="json"))
+
+
+# 创建服务实例
+port_supervisor_service = PortSupervisorService()
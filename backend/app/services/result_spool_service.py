@@ -0,0 +1,249 @@
+"""
+Result Spool Service
+测试结果后写队列：保存请求追加到本地只追加的 spool 文件并落盘后立即确认，后台分批写入数据库
+
+- spool 文件为 JSON Lines，每行一条测试结果，测试结果ID在确认前生成并写入该行
+- 同一时刻到达的多条结果合并为一次 write + fsync（组提交），多个工位同时完成时确认延迟不随之上升
+- 已写入数据库的位置记录在检查点文件中；检查点落后于数据库时（写入后、更新检查点前崩溃）
+  回放按测试结果ID跳过已存在的记录，因此回放是幂等的
+- 崩溃留下的不完整末行在启动时截掉（该结果尚未确认）
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.test_result_schemas import SaveTestResultRequest, TestResultResponse
+from app.services.test_result_service import test_result_service
+
+logger = logging.getLogger(__name__)
+
+SpoolRecord = Tuple[str, datetime, SaveTestResultRequest]
+
+
+class ResultSpoolService:
+    """测试结果后写队列服务（默认关闭，未启动时直接同步写入数据库）"""
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self.offset = 0  # 已写入数据库的 spool 字节位置
+        self.drained_count = 0
+        self._file: Optional[BinaryIO] = None
+        # 文件读写都在同一个线程中执行，追加、读取与压缩互不交错
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-spool")
+        self._pending: List[Tuple[bytes, asyncio.Future]] = []
+        self._append_task: Optional[asyncio.Task] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        # asyncio 原语在 start() 中创建：Python 3.9 在创建时绑定当前事件循环
+        self._wake: Optional[asyncio.Event] = None
+        self._drain_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.path.with_suffix(self.path.suffix + ".offset")
+
+    async def start(self, path: Optional[Path] = None):
+        """打开 spool 文件并启动后台写入；上次未写入数据库的结果随即回放"""
+        if self.enabled:
+            return
+        self.path = Path(path) if path else settings.TEST_RESULT_SPOOL_FILE
+        self._wake = asyncio.Event()
+        self._drain_lock = asyncio.Lock()
+        self.offset = await self._run(self._open_sync)
+        self._drain_task = asyncio.create_task(self._drain_loop())
+        self._wake.set()
+        logger.info(f"Test result spool enabled: {self.path} (replaying from offset {self.offset})")
+
+    async def stop(self):
+        """停止后台写入：等待未落盘的追加，尽量把 spool 中的结果写入数据库后关闭文件"""
+        if not self.enabled:
+            return
+        if self._append_task is not None:
+            await asyncio.gather(self._append_task, return_exceptions=True)
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+        try:
+            await self.drain()
+        except Exception as e:
+            logger.error(f"Failed to drain test result spool on shutdown, will replay on next start: {e}")
+        await self._run(self._close_sync)
+
+    async def submit(self, request: SaveTestResultRequest) -> TestResultResponse:
+        """保存测试结果：spool 启用时落盘后立即返回，否则同步写入数据库"""
+        if not self.enabled:
+            return await test_result_service.save_test_result(request)
+
+        test_result_id = str(uuid.uuid4())
+        created_at = datetime.now()
+        header = json.dumps({"id": test_result_id, "created_at": created_at.isoformat()})
+        line = f'{header[:-1]}, "request": {request.model_dump_json()}}}\n'.encode()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((line, future))
+        if self._append_task is None or self._append_task.done():
+            self._append_task = asyncio.create_task(self._append_pending())
+        await future
+        self._wake.set()
+
+        return TestResultResponse(
+            id=test_result_id,
+            mac_address=request.mac_address,
+            start_time=datetime.fromtimestamp(request.start_time / 1000),
+            end_time=datetime.fromtimestamp(request.end_time / 1000) if request.end_time else None,
+            total_tests=request.total_tests,
+            passed_tests=request.passed_tests,
+            failed_tests=request.failed_tests,
+            skipped_tests=request.skipped_tests,
+            operator=request.operator,
+            workstation=request.workstation,
+            device_id=request.device_id,
+            created_at=created_at
+        )
+
+    async def drain(self) -> int:
+        """把 spool 中尚未写入数据库的结果分批写入，返回写入的条数"""
+        async with self._drain_lock:
+            written = 0
+            while True:
+                records, end = await self._run(
+                    self._read_batch_sync, self.offset, settings.TEST_RESULT_SPOOL_BATCH_SIZE
+                )
+                if end == self.offset:
+                    break
+                if records:
+                    written += await test_result_service.save_test_results_batch(records)
+                await self._run(self._write_checkpoint_sync, end)
+                self.offset = end
+            self.drained_count += written
+            self.offset = await self._run(self._compact_sync, self.offset)
+            return written
+
+    async def _append_pending(self):
+        """组提交：一次写入并 fsync 当前排队的全部结果，期间到达的结果进入下一批"""
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await self._run(self._append_sync, b"".join(line for line, _ in batch))
+            except Exception as e:
+                logger.error(f"Failed to append {len(batch)} test results to spool: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+    async def _drain_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.TEST_RESULT_SPOOL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                written = await self.drain()
+                if written:
+                    logger.debug(f"Drained {written} test results from spool")
+            except Exception as e:
+                # 数据库暂时不可用时结果留在 spool 中，按间隔重试
+                logger.error(f"Failed to drain test result spool: {e}")
+                await asyncio.sleep(settings.TEST_RESULT_SPOOL_INTERVAL)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _open_sync(self) -> int:
+        """打开 spool 文件：截掉不完整的末行，读取检查点（超出文件长度时从头回放并重置检查点）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        size = self._size()
+        if size:
+            with open(self.path, "rb") as f:
+                f.seek(max(0, size - 1))
+                if f.read(1) != b"\n":
+                    f.seek(0)
+                    valid = f.read().rfind(b"\n") + 1
+                    logger.warning(f"Truncating incomplete record at end of {self.path} ({size - valid} bytes)")
+                    self._file.truncate(valid)
+                    size = valid
+        try:
+            offset = int(self.checkpoint_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            offset = 0
+        if not 0 <= offset <= size:
+            # 压缩截断文件后、写入检查点前崩溃：必须落盘重置，否则新追加的记录超过旧检查点后，
+            # 下次排空前再崩溃会从旧检查点回放，跳过已确认的结果
+            logger.warning(f"Spool checkpoint {offset} beyond {self.path} size {size}, replaying from start")
+            offset = 0
+            self._write_checkpoint_sync(0)
+        return offset
+
+    def _size(self) -> int:
+        return os.fstat(self._file.fileno()).st_size
+
+    def _close_sync(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append_sync(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        if settings.TEST_RESULT_SPOOL_FSYNC:
+            os.fsync(self._file.fileno())
+
+    def _read_batch_sync(self, offset: int, limit: int) -> Tuple[List[SpoolRecord], int]:
+        """从 offset 读取至多 limit 条完整记录，返回 (记录, 读取结束位置)；无法解析的行记录日志后跳过"""
+        records: List[SpoolRecord] = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            end = offset
+            while len(records) < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                end += len(line)
+                try:
+                    entry = json.loads(line)
+                    records.append((
+                        entry["id"],
+                        datetime.fromisoformat(entry["created_at"]),
+                        SaveTestResultRequest.model_validate(entry["request"])
+                    ))
+                except Exception as e:
+                    logger.error(f"Skipping unreadable test result spool record at offset {end - len(line)}: {e}")
+        return records, end
+
+    def _write_checkpoint_sync(self, offset: int):
+        """原子更新检查点"""
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            if settings.TEST_RESULT_SPOOL_FSYNC:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def _compact_sync(self, offset: int) -> int:
+        """spool 中的结果已全部写入数据库时清空文件，返回新的检查点位置"""
+        if self._file is None or offset == 0 or offset != self._size():
+            return offset
+        self._file.truncate(0)
+        self._write_checkpoint_sync(0)
+        return 0
+
+
+# 创建服务实例
+result_spool_service = ResultSpoolService()
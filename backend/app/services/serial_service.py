@@ -2,18 +2,42 @@
 Serial Communication Service for AT Commands
 """
 
+import asyncio
 import logging
 import time
 import re
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 from app.drivers.serial_driver import serial_driver
+from app.drivers.transaction_queue import TransactionPriority, TransactionTimeoutError
 from app.core.exceptions import SerialException, ErrorCode
+from app.services.baudrate_service import baudrate_service
+from app.services.latency_service import latency_service
+from app.services.port_inventory_service import port_inventory_service
 from app.schemas.serial_schemas import (
-    SerialPortInfo, SerialConfig, SerialConnectionStatus, SerialConnectionInfo, RawDataResponse
+    SerialPortInfo, SerialConfig, SerialConnectionStatus, SerialConnectionInfo, RawDataResponse,
+    BatchRequest, BatchStep, BatchStepResult, BatchSummary, BroadcastRequest, BroadcastResponse
 )
 
 logger = logging.getLogger(__name__)
 
+# AT指令最终结果码，任一命中即结束读取
+AT_FINAL_TERMINATORS = (b'\r\nOK\r\n', b'\r\nERROR\r\n', b'OK\r\n', b'ERROR\r\n')
+AT_FINAL_PATTERNS = (re.compile(rb'\+CM[ES] ERROR:[^\r\n]*\r\n'),)
+
+
+def is_at_command(command: str) -> bool:
+    """AT指令以 AT 开头（不区分大小写），响应必以最终结果码结束"""
+    return command.lstrip().upper().startswith("AT")
+
+
+def grade_response(expected_response: str, actual_response: str) -> Tuple[bool, str]:
+    """判定响应是否通过：有期望值时要求包含期望值，否则只要有响应即通过"""
+    if expected_response:
+        is_ok = expected_response.strip() in actual_response
+        return is_ok, "expected_match" if is_ok else "expected_mismatch"
+    is_ok = len(actual_response) > 0
+    return is_ok, "has_response" if is_ok else "no_response"
+
 
 class SerialService:
     """串口通信服务 - 专注于AT指令交互"""
@@ -21,11 +45,14 @@ class SerialService:
     def __init__(self):
         pass
     
-    async def get_available_ports(self) -> List[SerialPortInfo]:
-        """获取可用串口列表"""
+    async def get_available_ports(self, refresh: bool = False) -> List[SerialPortInfo]:
+        """获取可用串口列表（读取串口清单缓存，refresh 时先重新扫描）"""
         try:
-            ports_data = serial_driver.get_available_ports()
-            return [SerialPortInfo(**port) for port in ports_data]
+            if refresh:
+                await port_inventory_service.rescan()
+            else:
+                await port_inventory_service.ensure_scanned()
+            return port_inventory_service.get_ports()
         except Exception as e:
             logger.error(f"Error getting available ports: {e}")
             raise SerialException(ErrorCode.SYSTEM_ERROR, "获取串口列表失败")
@@ -33,7 +60,9 @@ class SerialService:
     async def auto_detect_port(self) -> str:
         """自动检测串口"""
         try:
-            port = serial_driver.auto_detect_port()
+            await port_inventory_service.ensure_scanned()
+            ports = [port.model_dump() for port in port_inventory_service.get_ports()]
+            port = serial_driver.select_preferred_port(ports)
             if port is None:
                 raise SerialException(ErrorCode.SERIAL_NO_PORTS, "未检测到可用串口")
             return port
@@ -49,18 +78,24 @@ class SerialService:
             # 记录前端传来的配置信息以便调试
             logger.info(f"Received serial config from frontend: port={config.port}, "
                        f"baudrate={config.baudrate}, bytesize={config.bytesize}, "
-                       f"parity={config.parity}, stopbits={config.stopbits}, timeout={config.timeout}")
+                       f"parity={config.parity}, stopbits={config.stopbits}, timeout={config.timeout}, "
+                       f"idle_gap={config.idle_gap}, auto_baudrate={config.auto_baudrate}")
+            
+            baudrate = config.baudrate
+            if config.auto_baudrate:
+                baudrate = await baudrate_service.resolve(config.port) or config.baudrate
             
             serial_id = await serial_driver.connect(
                 port=config.port,
-                baudrate=config.baudrate,
+                baudrate=baudrate,
                 bytesize=config.bytesize,
                 parity=config.parity,
                 stopbits=config.stopbits,
-                timeout=config.timeout
+                timeout=config.timeout,
+                idle_gap=config.idle_gap
             )
             
-            logger.info(f"Successfully connected to serial port: {config.port} at {config.baudrate} baud with serial_id {serial_id}")
+            logger.info(f"Successfully connected to serial port: {config.port} at {baudrate} baud with serial_id {serial_id}")
             return serial_id
             
         except Exception as e:
@@ -98,8 +133,19 @@ class SerialService:
             logger.error(f"Error getting connection status: {e}")
             raise SerialException(ErrorCode.SYSTEM_ERROR, "获取连接状态失败")
     
-    async def send_at_command(self, command: str, serial_id: int = None) -> RawDataResponse:
-        """发送指令（支持AT指令和其他自定义指令）- 由前端完全控制格式"""
+    async def send_at_command(self, command: str, serial_id: int = None, read_timeout: Optional[float] = None,
+                              idle_gap: Optional[float] = None,
+                              priority: int = TransactionPriority.NORMAL,
+                              deadline: Optional[float] = None,
+                              latency_key: Optional[str] = None) -> RawDataResponse:
+        """发送指令（支持AT指令和其他自定义指令）- 由前端完全控制格式
+
+        响应在命中AT最终结果码时结束；指定 idle_gap 时收到数据后空闲 idle_gap 秒也结束。
+        自定义指令的响应不一定带结果码，未指定 idle_gap 时使用串口的字节间空闲间隔；
+        AT指令可能先回显、处理较久后才返回结果码，默认只按结果码结束。
+        未指定 read_timeout 时按该指令在该串口上的历史耗时自适应，latency_key 为统计用的指令标识
+        （默认即指令内容，工作流传入替换MAC前的指令模板）
+        """
         try:
             # 如果没有指定串口ID，使用第一个可用的串口
             if serial_id is None:
@@ -112,27 +158,28 @@ class SerialService:
                 raise SerialException(ErrorCode.SERIAL_NOT_CONNECTED, f"串口 {serial_id} 未连接")
             
             timestamp = time.time()
+            latency_key = latency_key or command
+            read_timeout = latency_service.resolve_timeout(serial_id, latency_key, read_timeout)
+            if idle_gap is None and not is_at_command(command):
+                idle_gap = serial_driver.get_idle_gap(serial_id)
             
             if not command.endswith('\r\n'):
                 command = command + '\r\n'
             data = command.encode('utf-8')
-            # 使用智能读取方法，支持多种AT指令终止符
-            terminators = [b'\r\nOK\r\n', b'\r\nERROR\r\n', b'\r\n', b'OK\r\n', b'ERROR\r\n']
-            response = None
-            
-            for terminator in terminators:
-                try:
-                    response = await serial_driver.write_read_until(
-                        serial_id, data, terminator=terminator, read_timeout=2.0, write_delay=0.02
-                    )
-                    if response:
-                        break
-                except Exception:
-                    continue
-            
-            # 如果所有终止符都失败，使用默认方法
-            if not response:
-                response = await serial_driver.write_read(serial_id, data, read_timeout=3.0, write_delay=0.02)
+            # 单次事务：只写一次，同时匹配所有AT最终结果码
+            result = await serial_driver.write_read_match(
+                serial_id, data,
+                terminators=AT_FINAL_TERMINATORS,
+                patterns=AT_FINAL_PATTERNS,
+                read_timeout=read_timeout,
+                idle_gap=idle_gap,
+                priority=priority,
+                deadline=deadline
+            )
+            response = result.data
+            # 所有正常结束的响应都计入耗时统计（包括 ERROR 结果码与空闲间隔结束），只跳过超时
+            if result.complete:
+                latency_service.record(serial_id, latency_key, result.elapsed_time)
             
             # 解析响应
             response_text = response.decode('utf-8', errors='ignore')
@@ -141,17 +188,30 @@ class SerialService:
                 serial_id=serial_id,
                 sent_data=command,
                 received_data=response_text,
-                timestamp=timestamp
+                timestamp=timestamp,
+                matched=result.matched,
+                first_byte_ms=result.first_byte_time * 1000 if result.first_byte_time is not None else None,
+                elapsed_ms=result.elapsed_time * 1000
             )
             
         except SerialException:
             raise
+        except TransactionTimeoutError as e:
+            logger.warning(f"Command queue timeout: {e}")
+            raise SerialException(ErrorCode.SERIAL_TIMEOUT, f"串口忙，指令排队超时: {str(e)}")
         except Exception as e:
             logger.error(f"Error sending command: {e}")
             raise SerialException(ErrorCode.SERIAL_WRITE_FAILED, f"发送指令失败: {str(e)}")
     
-    async def send_raw_data(self, hex_data: str, serial_id: int = None) -> RawDataResponse:
-        """发送原始数据"""
+    async def send_raw_data(self, hex_data: str, serial_id: int = None, read_timeout: Optional[float] = None,
+                            idle_gap: Optional[float] = None,
+                            priority: int = TransactionPriority.NORMAL,
+                            deadline: Optional[float] = None,
+                            latency_key: Optional[str] = None) -> RawDataResponse:
+        """发送原始数据；收到数据后空闲 idle_gap 秒（默认使用串口配置）即结束响应
+
+        未指定 read_timeout 时按历史耗时自适应
+        """
         try:
             # 如果没有指定串口ID，使用第一个可用的串口
             if serial_id is None:
@@ -170,23 +230,146 @@ class SerialService:
                 raise SerialException(ErrorCode.SERIAL_INVALID_DATA, "无效的十六进制数据格式")
             
             timestamp = time.time()
+            latency_key = latency_key or hex_data
+            read_timeout = latency_service.resolve_timeout(serial_id, latency_key, read_timeout)
+            if idle_gap is None:
+                idle_gap = serial_driver.get_idle_gap(serial_id)
             
-            # 发送数据并读取响应，使用优化的延迟设置
-            response = await serial_driver.write_read(serial_id, data, read_timeout=2.0, write_delay=0.02)
+            # 发送数据并读取响应：数据到达后按字节间空闲间隔判定结束，不再固定等待
+            result = await serial_driver.write_read_match(
+                serial_id, data, terminators=(), read_timeout=read_timeout, idle_gap=idle_gap,
+                priority=priority, deadline=deadline
+            )
+            if result.complete:
+                latency_service.record(serial_id, latency_key, result.elapsed_time)
             
             return RawDataResponse(
                 serial_id=serial_id,
                 sent_data=data.hex().upper(),
-                received_data=response.hex().upper(),
-                timestamp=timestamp
+                received_data=result.data.hex().upper(),
+                timestamp=timestamp,
+                first_byte_ms=result.first_byte_time * 1000 if result.first_byte_time is not None else None,
+                elapsed_ms=result.elapsed_time * 1000
             )
             
         except SerialException:
             raise
+        except TransactionTimeoutError as e:
+            logger.warning(f"Raw data queue timeout: {e}")
+            raise SerialException(ErrorCode.SERIAL_TIMEOUT, f"串口忙，数据排队超时: {str(e)}")
         except Exception as e:
             logger.error(f"Error sending raw data: {e}")
             raise SerialException(ErrorCode.SERIAL_WRITE_FAILED, f"发送原始数据失败: {str(e)}")
 
+    
+    async def execute_step(self, index: int, step: BatchStep, default_serial_id: Optional[int] = None,
+                           priority: int = TransactionPriority.BATCH,
+                           latency_key: Optional[str] = None,
+                           deadline: Optional[float] = None) -> BatchStepResult:
+        """执行单个批量步骤并判定结果，串口异常记录在结果中而不抛出"""
+        serial_id = step.target_serial_id if step.target_serial_id is not None else default_serial_id
+        step_start = time.perf_counter()
+        timestamp = time.time()
+        error = None
+        received = ""
+        sent = step.data
+        
+        try:
+            if step.send_as_hex:
+                result = await self.send_raw_data(
+                    step.data, serial_id, read_timeout=step.read_timeout, idle_gap=step.idle_gap,
+                    priority=priority, deadline=deadline, latency_key=latency_key
+                )
+            else:
+                result = await self.send_at_command(
+                    step.data, serial_id, read_timeout=step.read_timeout, idle_gap=step.idle_gap,
+                    priority=priority, deadline=deadline, latency_key=latency_key
+                )
+            serial_id = result.serial_id
+            sent = result.sent_data
+            received = result.received_data
+            is_ok, reason = grade_response(step.expected_response, received)
+        except SerialException as e:
+            error = e.message
+            is_ok, reason = False, "error"
+        
+        return BatchStepResult(
+            index=index,
+            id=step.id,
+            name=step.name,
+            serial_id=serial_id,
+            sent_data=sent,
+            received_data=received,
+            expected_response=step.expected_response,
+            is_ok=is_ok,
+            reason=reason,
+            error=error,
+            elapsed_ms=(time.perf_counter() - step_start) * 1000,
+            timestamp=timestamp
+        )
+    
+    async def run_batch(self, request: BatchRequest) -> AsyncIterator[Union[BatchStepResult, BatchSummary]]:
+        """在后端按顺序执行批量指令，逐步产出结果，最后产出汇总"""
+        batch_start = time.perf_counter()
+        passed = failed = 0
+        
+        for index, step in enumerate(request.steps):
+            result = await self.execute_step(index, step, request.serial_id)
+            if result.is_ok:
+                passed += 1
+            else:
+                failed += 1
+            yield result
+            
+            if not result.is_ok and request.stop_on_failure:
+                logger.info(f"Batch stopped at step {index} ({step.name or step.data}): {result.reason}")
+                break
+        
+        yield BatchSummary(
+            total_steps=len(request.steps),
+            executed_steps=passed + failed,
+            passed_steps=passed,
+            failed_steps=failed,
+            elapsed_ms=(time.perf_counter() - batch_start) * 1000
+        )
+    
+    async def broadcast(self, request: BroadcastRequest) -> BroadcastResponse:
+        """同一指令并行发送到多个串口（不指定则所有已连接串口）
+
+        每个串口的排队与读取受 port_timeout 限制，慢串口或离线串口只影响自己的结果
+        """
+        if request.serial_ids is not None:
+            serial_ids = request.serial_ids
+        else:
+            serial_ids = [info["serial_id"] for info in serial_driver.get_connected_serials()]
+            if not serial_ids:
+                raise SerialException(ErrorCode.SERIAL_NOT_CONNECTED, "没有连接的串口")
+        
+        start = time.perf_counter()
+        deadline = time.monotonic() + request.port_timeout
+        step = BatchStep(
+            data=request.data,
+            send_as_hex=request.send_as_hex,
+            expected_response=request.expected_response,
+            read_timeout=request.read_timeout,
+            idle_gap=request.idle_gap
+        )
+        results = await asyncio.gather(*(
+            self.execute_step(index, step, serial_id, priority=TransactionPriority.NORMAL, deadline=deadline)
+            for index, serial_id in enumerate(serial_ids)
+        ))
+        
+        passed = sum(1 for result in results if result.is_ok)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Broadcast {request.data!r} to {len(results)} ports: {passed} passed in {elapsed_ms:.0f} ms")
+        return BroadcastResponse(
+            results=list(results),
+            total_ports=len(results),
+            passed_ports=passed,
+            failed_ports=len(results) - passed,
+            elapsed_ms=elapsed_ms
+        )
+
 
 # Global service instance
 serial_service = SerialService()
\ No newline at end of file
@@ -6,10 +6,11 @@ Test Result Service
 import logging
 import uuid
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case
 from sqlmodel import Session, select, func, desc
 
-from app.core.database import TestResult, TestItemResult
+from app.core.database import engine, read_engine, run_in_db, TestResult, TestItemResult
 from app.schemas.test_result_schemas import (
     SaveTestResultRequest, 
     TestResultResponse, 
@@ -26,137 +27,174 @@ class TestResultService:
     def __init__(self):
         self.logger = logger
 
-    async def save_test_result(
-        self, 
-        session: Session, 
-        request: SaveTestResultRequest
-    ) -> TestResultResponse:
+    def _get_session(self):
+        """获取数据库会话"""
+        return Session(engine)
+
+    def _get_read_session(self):
+        """获取只读数据库会话（列表、详情与统计查询）"""
+        return Session(read_engine)
+
+    async def save_test_result(self, request: SaveTestResultRequest) -> TestResultResponse:
         """保存测试结果"""
         try:
-            # 生成测试结果ID
-            test_result_id = str(uuid.uuid4())
-            
-            # 创建测试结果主记录
-            test_result = TestResult(
-                id=test_result_id,
-                mac_address=request.mac_address,
-                start_time=datetime.fromtimestamp(request.start_time / 1000),
-                end_time=datetime.fromtimestamp(request.end_time / 1000) if request.end_time else None,
-                total_tests=request.total_tests,
-                passed_tests=request.passed_tests,
-                failed_tests=request.failed_tests,
-                skipped_tests=request.skipped_tests,
-                operator=request.operator,
-                workstation=request.workstation,
-                device_id=request.device_id
-            )
-            
-            session.add(test_result)
-            session.commit()
-            session.refresh(test_result)
-            
-            # 创建测试项结果记录
-            test_items = []
-            for item in request.test_items:
-                item_id = str(uuid.uuid4())
-                test_item = TestItemResult(
-                    id=item_id,
-                    test_result_id=test_result_id,
-                    command_id=item.id,
-                    name=item.name,
-                    command=item.command,
-                    expected_response=item.expected_response,
-                    actual_response=item.actual_response,
-                    is_ok=item.is_ok,
-                    reason=item.reason,
-                    timestamp=datetime.fromtimestamp(item.timestamp / 1000),
-                    has_notification=item.has_notification,
-                    user_choice=item.user_choice
-                )
-                test_items.append(test_item)
-                session.add(test_item)
-            
+            return await run_in_db(self._get_session, lambda session: self._save_test_result(session, request))
+        except Exception as e:
+            self.logger.error(f"保存测试结果失败: {e}")
+            raise
+
+    async def save_test_results_batch(self, records: List[Tuple[str, datetime, SaveTestResultRequest]]) -> int:
+        """按调用方生成的ID批量保存测试结果（后写队列回放），已存在的ID跳过，返回实际写入的条数"""
+        try:
+            return await run_in_db(self._get_session, lambda session: self._save_test_results_batch(session, records))
+        except Exception as e:
+            self.logger.error(f"批量保存测试结果失败: {e}")
+            raise
+
+    @staticmethod
+    def _build_rows(
+        test_result_id: str,
+        created_at: datetime,
+        request: SaveTestResultRequest
+    ) -> Tuple[Dict, List[Dict]]:
+        """生成主记录与测试项的插入数据，ID 与时间在 Python 中生成"""
+        result_row = {
+            "id": test_result_id,
+            "mac_address": request.mac_address,
+            "start_time": datetime.fromtimestamp(request.start_time / 1000),
+            "end_time": datetime.fromtimestamp(request.end_time / 1000) if request.end_time else None,
+            "total_tests": request.total_tests,
+            "passed_tests": request.passed_tests,
+            "failed_tests": request.failed_tests,
+            "skipped_tests": request.skipped_tests,
+            "operator": request.operator,
+            "workstation": request.workstation,
+            "device_id": request.device_id,
+            "created_at": created_at,
+        }
+        item_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "test_result_id": test_result_id,
+                "command_id": item.id,
+                "name": item.name,
+                "command": item.command,
+                "expected_response": item.expected_response,
+                "actual_response": item.actual_response,
+                "is_ok": item.is_ok,
+                "reason": item.reason,
+                "timestamp": datetime.fromtimestamp(item.timestamp / 1000),
+                "has_notification": item.has_notification,
+                "user_choice": item.user_choice,
+            }
+            for item in request.test_items
+        ]
+        return result_row, item_rows
+
+    @staticmethod
+    def _insert_rows(session: Session, result_rows: List[Dict], item_rows: List[Dict]):
+        """Core 批量插入（executemany），不经过 ORM 工作单元"""
+        if result_rows:
+            session.exec(TestResult.__table__.insert(), params=result_rows)
+        if item_rows:
+            session.exec(TestItemResult.__table__.insert(), params=item_rows)
+
+    def _save_test_result(self, session: Session, request: SaveTestResultRequest) -> TestResultResponse:
+        """单个事务批量写入主记录与全部测试项，不回读"""
+        try:
+            result_row, item_rows = self._build_rows(str(uuid.uuid4()), datetime.now(), request)
+            self._insert_rows(session, [result_row], item_rows)
             session.commit()
             
             # 返回响应
-            return TestResultResponse(
-                id=test_result.id,
-                mac_address=test_result.mac_address,
-                start_time=test_result.start_time,
-                end_time=test_result.end_time,
-                total_tests=test_result.total_tests,
-                passed_tests=test_result.passed_tests,
-                failed_tests=test_result.failed_tests,
-                skipped_tests=test_result.skipped_tests,
-                operator=test_result.operator,
-                workstation=test_result.workstation,
-                device_id=test_result.device_id,
-                created_at=test_result.created_at
-            )
+            return TestResultResponse(**result_row)
             
-        except Exception as e:
+        except Exception:
             session.rollback()
-            self.logger.error(f"保存测试结果失败: {e}")
             raise
 
-    async def get_test_result_by_id(
-        self, 
-        session: Session, 
-        test_result_id: str
-    ) -> Optional[TestResultDetailResponse]:
+    def _save_test_results_batch(
+        self,
+        session: Session,
+        records: List[Tuple[str, datetime, SaveTestResultRequest]]
+    ) -> int:
+        try:
+            ids = [test_result_id for test_result_id, _, _ in records]
+            existing = set(session.exec(select(TestResult.id).where(TestResult.id.in_(ids))).all())
+            result_rows: List[Dict] = []
+            item_rows: List[Dict] = []
+            for test_result_id, created_at, request in records:
+                if test_result_id in existing:
+                    continue
+                existing.add(test_result_id)
+                result_row, rows = self._build_rows(test_result_id, created_at, request)
+                result_rows.append(result_row)
+                item_rows.extend(rows)
+            self._insert_rows(session, result_rows, item_rows)
+            session.commit()
+            return len(result_rows)
+        except Exception:
+            session.rollback()
+            raise
+
+    async def get_test_result_by_id(self, test_result_id: str) -> Optional[TestResultDetailResponse]:
         """根据ID获取测试结果详情"""
         try:
-            # 获取测试结果主记录
-            statement = select(TestResult).where(TestResult.id == test_result_id)
-            test_result = session.exec(statement).first()
-            
-            if not test_result:
-                return None
-            
-            # 获取测试项结果
-            statement = select(TestItemResult).where(TestItemResult.test_result_id == test_result_id)
-            test_items = session.exec(statement).all()
-            
-            # 转换为schema格式
-            test_item_schemas = [
-                TestItemResultSchema(
-                    id=item.command_id,
-                    name=item.name,
-                    command=item.command,
-                    expected_response=item.expected_response,
-                    actual_response=item.actual_response,
-                    is_ok=item.is_ok,
-                    reason=item.reason,
-                    timestamp=item.timestamp,
-                    has_notification=item.has_notification,
-                    user_choice=item.user_choice
-                )
-                for item in test_items
-            ]
-            
-            return TestResultDetailResponse(
-                id=test_result.id,
-                mac_address=test_result.mac_address,
-                start_time=test_result.start_time,
-                end_time=test_result.end_time,
-                total_tests=test_result.total_tests,
-                passed_tests=test_result.passed_tests,
-                failed_tests=test_result.failed_tests,
-                skipped_tests=test_result.skipped_tests,
-                operator=test_result.operator,
-                workstation=test_result.workstation,
-                device_id=test_result.device_id,
-                created_at=test_result.created_at,
-                test_items=test_item_schemas
+            return await run_in_db(
+                self._get_read_session, lambda session: self._get_test_result_by_id(session, test_result_id),
+                readonly=True
             )
-            
         except Exception as e:
             self.logger.error(f"获取测试结果失败: {e}")
             raise
 
+    def _get_test_result_by_id(self, session: Session, test_result_id: str) -> Optional[TestResultDetailResponse]:
+        # 获取测试结果主记录
+        statement = select(TestResult).where(TestResult.id == test_result_id)
+        test_result = session.exec(statement).first()
+        
+        if not test_result:
+            return None
+        
+        # 获取测试项结果
+        statement = select(TestItemResult).where(TestItemResult.test_result_id == test_result_id)
+        test_items = session.exec(statement).all()
+        
+        # 转换为schema格式
+        test_item_schemas = [
+            TestItemResultSchema(
+                id=item.command_id,
+                name=item.name,
+                command=item.command,
+                expected_response=item.expected_response,
+                actual_response=item.actual_response,
+                is_ok=item.is_ok,
+                reason=item.reason,
+                timestamp=int(item.timestamp.timestamp() * 1000),
+                has_notification=item.has_notification,
+                user_choice=item.user_choice
+            )
+            for item in test_items
+        ]
+        
+        return TestResultDetailResponse(
+            id=test_result.id,
+            mac_address=test_result.mac_address,
+            start_time=test_result.start_time,
+            end_time=test_result.end_time,
+            total_tests=test_result.total_tests,
+            passed_tests=test_result.passed_tests,
+            failed_tests=test_result.failed_tests,
+            skipped_tests=test_result.skipped_tests,
+            operator=test_result.operator,
+            workstation=test_result.workstation,
+            device_id=test_result.device_id,
+            created_at=test_result.created_at,
+            test_items=test_item_schemas
+        )
+
     async def get_test_results(
-        self, 
-        session: Session,
+        self,
         page: int = 1,
         page_size: int = 20,
         mac_address: Optional[str] = None,
@@ -168,63 +206,110 @@ class TestResultService:
     ) -> Tuple[List[TestResultResponse], int]:
         """获取测试结果列表"""
         try:
-            # 构建查询条件
-            statement = select(TestResult)
-            
-            if mac_address:
-                statement = statement.where(TestResult.mac_address == mac_address)
-            if operator:
-                statement = statement.where(TestResult.operator == operator)
-            if workstation:
-                statement = statement.where(TestResult.workstation == workstation)
-            if device_id:
-                statement = statement.where(TestResult.device_id == device_id)
-            if start_date:
-                statement = statement.where(TestResult.created_at >= start_date)
-            if end_date:
-                statement = statement.where(TestResult.created_at <= end_date)
-            
-            # 获取总数
-            count_statement = select(func.count()).select_from(statement.subquery())
-            total = session.exec(count_statement).first()
-            
-            # 分页和排序
-            statement = statement.order_by(desc(TestResult.created_at))
-            statement = statement.offset((page - 1) * page_size).limit(page_size)
-            
-            results = session.exec(statement).all()
-            
-            # 转换为响应格式
-            test_results = [
-                TestResultResponse(
-                    id=result.id,
-                    mac_address=result.mac_address,
-                    start_time=result.start_time,
-                    end_time=result.end_time,
-                    total_tests=result.total_tests,
-                    passed_tests=result.passed_tests,
-                    failed_tests=result.failed_tests,
-                    skipped_tests=result.skipped_tests,
-                    operator=result.operator,
-                    workstation=result.workstation,
-                    device_id=result.device_id,
-                    created_at=result.created_at
+            return await run_in_db(self._get_read_session, lambda session: self._get_test_results(
+                session, page, page_size, mac_address, operator, workstation, device_id, start_date, end_date
+            ), readonly=True)
+        except Exception as e:
+            self.logger.error(f"获取测试结果列表失败: {e}")
+            raise
+
+    def _get_test_results(
+        self,
+        session: Session,
+        page: int,
+        page_size: int,
+        mac_address: Optional[str],
+        operator: Optional[str],
+        workstation: Optional[str],
+        device_id: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Tuple[List[TestResultResponse], int]:
+        # 构建查询条件
+        statement = select(TestResult)
+        
+        if mac_address:
+            statement = statement.where(TestResult.mac_address == mac_address)
+        if operator:
+            statement = statement.where(TestResult.operator == operator)
+        if workstation:
+            statement = statement.where(TestResult.workstation == workstation)
+        if device_id:
+            statement = statement.where(TestResult.device_id == device_id)
+        if start_date:
+            statement = statement.where(TestResult.created_at >= start_date)
+        if end_date:
+            statement = statement.where(TestResult.created_at <= end_date)
+        
+        # 获取总数
+        count_statement = select(func.count()).select_from(statement.subquery())
+        total = session.exec(count_statement).first()
+        
+        # 分页和排序
+        statement = statement.order_by(desc(TestResult.created_at))
+        statement = statement.offset((page - 1) * page_size).limit(page_size)
+        
+        results = session.exec(statement).all()
+        
+        # 转换为响应格式
+        test_results = [
+            TestResultResponse(
+                id=result.id,
+                mac_address=result.mac_address,
+                start_time=result.start_time,
+                end_time=result.end_time,
+                total_tests=result.total_tests,
+                passed_tests=result.passed_tests,
+                failed_tests=result.failed_tests,
+                skipped_tests=result.skipped_tests,
+                operator=result.operator,
+                workstation=result.workstation,
+                device_id=result.device_id,
+                created_at=result.created_at
+            )
+            for result in results
+        ]
+        
+        return test_results, total
+
+    async def get_failure_stats(
+        self,
+        command_ids: List[str],
+        since: Optional[datetime] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """统计各指令的历史执行次数与失败次数（不含跳过的测试项），返回 {command_id: (runs, failures)}"""
+        try:
+            statement = (
+                select(
+                    TestItemResult.command_id,
+                    func.count(),
+                    func.sum(case((TestItemResult.is_ok == False, 1), else_=0))  # noqa: E712
                 )
-                for result in results
-            ]
+                .where(TestItemResult.command_id.in_(command_ids))
+                .where(TestItemResult.reason != "skipped")
+                .group_by(TestItemResult.command_id)
+            )
+            if since is not None:
+                statement = statement.where(TestItemResult.timestamp >= since)
             
-            return test_results, total
+            rows = await run_in_db(
+                self._get_read_session, lambda session: session.exec(statement).all(), readonly=True
+            )
+            return {command_id: (runs, failures or 0) for command_id, runs, failures in rows}
             
         except Exception as e:
-            self.logger.error(f"获取测试结果列表失败: {e}")
+            self.logger.error(f"统计指令失败率失败: {e}")
             raise
 
-    async def delete_test_result(
-        self, 
-        session: Session, 
-        test_result_id: str
-    ) -> bool:
+    async def delete_test_result(self, test_result_id: str) -> bool:
         """删除测试结果"""
+        try:
+            return await run_in_db(self._get_session, lambda session: self._delete_test_result(session, test_result_id))
+        except Exception as e:
+            self.logger.error(f"删除测试结果失败: {e}")
+            raise
+
+    def _delete_test_result(self, session: Session, test_result_id: str) -> bool:
         try:
             # 先删除测试项结果
             statement = select(TestItemResult).where(TestItemResult.test_result_id == test_result_id)
@@ -241,9 +326,8 @@ class TestResultService:
                 return True
             return False
             
-        except Exception as e:
+        except Exception:
             session.rollback()
-            self.logger.error(f"删除测试结果失败: {e}")
             raise
 
 
@@ -0,0 +1,77 @@
+"""
+URC Service
+主动上报（URC）分发：驱动分离出的 URC 行保存最近记录，通过事件总线推送给 WebSocket 客户端，并分发给进程内订阅者（如工作流运行）
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.drivers.serial_driver import serial_driver
+from app.schemas.serial_schemas import UrcEvent
+from app.schemas.websocket import WSMessageType, WSResponseMessage
+
+logger = logging.getLogger(__name__)
+
+UrcSubscriber = Callable[[UrcEvent], None]
+
+
+class UrcService:
+    """URC 分发服务"""
+
+    def __init__(self):
+        self.history: Dict[int, Deque[UrcEvent]] = {}  # serial_id -> 最近的 URC
+        self._subscribers: List[UrcSubscriber] = []
+        self._pending: Set[asyncio.Task] = set()
+        serial_driver.urc_listeners.append(self._on_urc)
+
+    def subscribe(self, subscriber: UrcSubscriber) -> Callable[[], None]:
+        """注册订阅者（在事件循环中同步调用），返回取消订阅函数"""
+        self._subscribers.append(subscriber)
+        return lambda: self.unsubscribe(subscriber)
+
+    def unsubscribe(self, subscriber: UrcSubscriber):
+        """注销订阅者"""
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    def get_recent(self, serial_id: Optional[int] = None) -> List[UrcEvent]:
+        """获取最近的 URC（按时间排序），可按串口过滤"""
+        if serial_id is not None:
+            return list(self.history.get(serial_id, ()))
+        return sorted((event for events in self.history.values() for event in events), key=lambda e: e.timestamp)
+
+    def _on_urc(self, serial_id: int, line: str):
+        """驱动回调：记录、分发并推送"""
+        event = UrcEvent(serial_id=serial_id, line=line, timestamp=time.time())
+        self.history.setdefault(serial_id, deque(maxlen=settings.SERIAL_URC_HISTORY_SIZE)).append(event)
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(event)
+            except Exception as e:
+                logger.error(f"URC subscriber {subscriber} failed: {e}")
+
+        task = asyncio.get_running_loop().create_task(self._publish(event))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, event: UrcEvent):
+        """推送 URC 给 WebSocket 客户端"""
+        message = WSResponseMessage(
+            type=WSMessageType.URC,
+            message=event.line,
+            serial_id=event.serial_id,
+            data=event.model_dump(),
+            timestamp=datetime.now().isoformat(),
+            success=True
+        )
+        await event_bus.publish(message.model_dump(mode="json"))
+
+
+# 创建服务实例
+urc_service = UrcService()
@@ -0,0 +1,507 @@
+"""
+Workflow Service
+后端测试工作流引擎：按测试计划执行指令、判定结果、保存测试记录并通过事件总线推送进度
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine, read_engine, run_in_db, TestPlan
+from app.core.events import event_bus
+from app.core.exceptions import HMIException, ErrorCode
+from app.schemas.command_schemas import SavedCommand
+from app.schemas.serial_schemas import BatchStep, BatchStepResult, UrcEvent
+from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+from app.schemas.websocket import WSMessageType, WSResponseMessage
+from app.schemas.workflow_schemas import (
+    TestPlanCreateRequest, TestPlanResponse, WorkflowRunRequest, WorkflowRunState, WorkflowRunStatus
+)
+from app.services.command_service import command_service
+from app.services.latency_service import latency_service
+from app.services.plan_optimizer import fail_fast_order
+from app.services.result_spool_service import result_spool_service
+from app.services.serial_service import serial_service
+from app.services.test_result_service import test_result_service
+from app.services.urc_service import urc_service
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = (WorkflowRunState.COMPLETED, WorkflowRunState.FAILED, WorkflowRunState.CANCELLED)
+# 自动判定的失败；人工确认相关的失败不算硬失败
+HARD_FAILURE_REASONS = ("error", "no_response", "expected_mismatch")
+
+
+class WorkflowException(HMIException):
+    """工作流相关异常"""
+    pass
+
+
+class WorkflowRun:
+    """一次工作流运行的内存状态"""
+
+    def __init__(self, request: WorkflowRunRequest, commands: List[SavedCommand],
+                 dependencies: Optional[Dict[str, List[str]]] = None):
+        self.run_id = str(uuid.uuid4())
+        self.request = request
+        self.commands = commands
+        self.dependencies = dependencies
+        self.state = WorkflowRunState.PENDING
+        self.current_step = -1
+        self.running_steps: Set[int] = set()
+        self.test_items: List[TestItemResultSchema] = []
+        self.urcs: List[UrcEvent] = []
+        self.stop_requested = False
+        self.test_result_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.start_time = int(time.time() * 1000)
+        self.end_time: Optional[int] = None
+        self.cancel_requested = False
+        self.confirmation: Optional[asyncio.Future] = None
+        self.confirmation_lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def on_urc(self, event: UrcEvent):
+        """记录测试串口上的主动上报；有步骤未指定串口时使用默认串口，记录所有串口"""
+        ports = {command.target_serial_id for command in self.commands} | {self.request.serial_id}
+        if None in ports or event.serial_id in ports:
+            self.urcs.append(event)
+            del self.urcs[:-settings.SERIAL_URC_HISTORY_SIZE]
+
+    @property
+    def passed_tests(self) -> int:
+        return sum(1 for item in self.test_items if item.is_ok)
+
+    @property
+    def failed_tests(self) -> int:
+        return sum(1 for item in self.test_items if not item.is_ok and item.reason != "skipped")
+
+    @property
+    def skipped_tests(self) -> int:
+        return sum(1 for item in self.test_items if item.reason == "skipped")
+
+    def to_status(self) -> WorkflowRunStatus:
+        return WorkflowRunStatus(
+            run_id=self.run_id,
+            plan_id=self.request.plan_id,
+            mac_address=self.request.mac_address,
+            state=self.state,
+            current_step=self.current_step,
+            running_steps=sorted(self.running_steps),
+            total_steps=len(self.commands),
+            command_ids=[command.id for command in self.commands],
+            passed_tests=self.passed_tests,
+            failed_tests=self.failed_tests,
+            skipped_tests=self.skipped_tests,
+            test_result_id=self.test_result_id,
+            error=self.error,
+            urcs=self.urcs,
+            start_time=self.start_time,
+            end_time=self.end_time
+        )
+
+
+class WorkflowService:
+    """工作流服务"""
+
+    def __init__(self):
+        self.runs: "OrderedDict[str, WorkflowRun]" = OrderedDict()
+        # 进度事件经有界队列由后台任务按顺序推送，慢客户端不拖慢测试执行；队列在事件循环中首次推送时创建
+        self._events: Optional["asyncio.Queue[Dict]"] = None
+        self._publisher: Optional[asyncio.Task] = None
+
+    def _get_session(self):
+        """获取数据库会话"""
+        return Session(engine)
+
+    def _get_read_session(self):
+        """获取只读数据库会话（列表、详情与统计查询）"""
+        return Session(read_engine)
+
+    def _plan_to_schema(self, plan: TestPlan) -> TestPlanResponse:
+        return TestPlanResponse(
+            id=plan.id,
+            name=plan.name,
+            description=plan.description,
+            command_ids=json.loads(plan.command_ids or "[]"),
+            pinned_command_ids=json.loads(plan.pinned_command_ids or "[]"),
+            dependencies=json.loads(plan.dependencies) if plan.dependencies else None,
+            created_at=plan.created_at
+        )
+
+    # ------------------------------------------------------------------
+    # 测试计划
+    # ------------------------------------------------------------------
+
+    async def create_plan(self, request: TestPlanCreateRequest) -> TestPlanResponse:
+        """创建测试计划"""
+        for command_id in request.command_ids:
+            if await command_service.get_command_by_id(command_id) is None:
+                raise WorkflowException(ErrorCode.PARAM_ERROR, f"指令不存在: {command_id}")
+
+        def create(session: Session) -> TestPlanResponse:
+            plan = TestPlan(
+                id=str(uuid.uuid4()),
+                name=request.name.strip(),
+                description=request.description.strip(),
+                command_ids=json.dumps(request.command_ids),
+                pinned_command_ids=json.dumps(request.pinned_command_ids),
+                dependencies=json.dumps(request.dependencies) if request.dependencies is not None else None
+            )
+            session.add(plan)
+            session.commit()
+            session.refresh(plan)
+            return self._plan_to_schema(plan)
+
+        plan = await run_in_db(self._get_session, create)
+        logger.info(f"Created test plan: {plan.name} ({len(request.command_ids)} steps)")
+        return plan
+
+    async def get_plans(self) -> List[TestPlanResponse]:
+        """获取所有测试计划"""
+        def query(session: Session) -> List[TestPlanResponse]:
+            plans = session.exec(select(TestPlan).order_by(TestPlan.created_at.desc())).all()
+            return [self._plan_to_schema(plan) for plan in plans]
+
+        return await run_in_db(self._get_read_session, query, readonly=True)
+
+    async def get_plan(self, plan_id: str) -> Optional[TestPlanResponse]:
+        """根据ID获取测试计划"""
+        def query(session: Session) -> Optional[TestPlanResponse]:
+            plan = session.exec(select(TestPlan).where(TestPlan.id == plan_id)).first()
+            return self._plan_to_schema(plan) if plan else None
+
+        return await run_in_db(self._get_read_session, query, readonly=True)
+
+    async def load_plan_commands(self, plan_id: Optional[str]) -> List[SavedCommand]:
+        """加载计划中的指令；未指定计划时与前端一致，按指令列表顺序执行全部指令"""
+        if plan_id is None:
+            return await command_service.get_all_commands()
+
+        plan = await self.get_plan(plan_id)
+        if plan is None:
+            raise WorkflowException(ErrorCode.PARAM_ERROR, f"测试计划不存在: {plan_id}")
+
+        commands = []
+        for command_id in plan.command_ids:
+            command = await command_service.get_command_by_id(command_id)
+            if command is None:
+                raise WorkflowException(ErrorCode.PARAM_ERROR, f"测试计划引用的指令不存在: {command_id}")
+            commands.append(command)
+        return commands
+
+    async def optimize_order(self, commands: List[SavedCommand], pinned: List[str]) -> List[SavedCommand]:
+        """按历史失败率与耗时重排步骤（失败优先），固定步骤保持原位置"""
+        since = datetime.now() - timedelta(days=settings.WORKFLOW_FAILURE_HISTORY_DAYS)
+        failure_stats = await test_result_service.get_failure_stats([command.id for command in commands], since)
+
+        # 单步耗时取各串口响应耗时中位数的平均值
+        durations = {}
+        for command in commands:
+            stats = latency_service.get_stats(command.command)
+            if stats:
+                durations[command.id] = sum(stat.p50_ms for stat in stats) / len(stats) / 1000
+        return fail_fast_order(commands, failure_stats, durations, pinned)
+
+    # ------------------------------------------------------------------
+    # 运行管理
+    # ------------------------------------------------------------------
+
+    async def start_run(self, request: WorkflowRunRequest) -> WorkflowRunStatus:
+        """启动一次工作流运行（后台执行，立即返回运行状态）"""
+        commands = await self.load_plan_commands(request.plan_id)
+        if not commands:
+            raise WorkflowException(ErrorCode.PARAM_ERROR, "测试计划中没有可执行的指令")
+        plan = await self.get_plan(request.plan_id) if request.plan_id else None
+        if request.optimize_order:
+            commands = await self.optimize_order(commands, plan.pinned_command_ids if plan else [])
+
+        run = WorkflowRun(request, commands, plan.dependencies if plan else None)
+        self.runs[run.run_id] = run
+        self._trim_history()
+        run.task = asyncio.create_task(self._execute(run))
+        logger.info(f"Workflow run {run.run_id} started: mac={request.mac_address}, "
+                    f"workstation={request.workstation}, operator={request.operator}, steps={len(commands)}")
+        return run.to_status()
+
+    async def run(self, request: WorkflowRunRequest) -> WorkflowRunStatus:
+        """启动工作流并等待其结束"""
+        status = await self.start_run(request)
+        run = self.runs[status.run_id]
+        await run.task
+        return run.to_status()
+
+    def get_run(self, run_id: str) -> Optional[WorkflowRunStatus]:
+        """获取运行状态"""
+        run = self.runs.get(run_id)
+        return run.to_status() if run else None
+
+    def get_runs(self) -> List[WorkflowRunStatus]:
+        """获取所有运行状态（最近的在前）"""
+        return [run.to_status() for run in reversed(self.runs.values())]
+
+    def confirm_step(self, run_id: str, choice: bool) -> bool:
+        """提交人工确认结果"""
+        run = self.runs.get(run_id)
+        if run is None or run.confirmation is None or run.confirmation.done():
+            return False
+        run.confirmation.set_result(choice)
+        return True
+
+    def cancel_run(self, run_id: str) -> bool:
+        """请求取消运行：当前步骤完成后停止，剩余步骤记为跳过"""
+        run = self.runs.get(run_id)
+        if run is None or run.state in FINISHED_STATES:
+            return False
+        run.cancel_requested = True
+        if run.confirmation is not None and not run.confirmation.done():
+            run.confirmation.cancel()
+        return True
+
+    async def shutdown(self):
+        """停止所有运行中的工作流与事件推送"""
+        tasks = [run.task for run in self.runs.values() if run.task and not run.task.done()]
+        if self._publisher is not None and not self._publisher.done():
+            tasks.append(self._publisher)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def flush_events(self):
+        """等待已产生的进度事件推送完成"""
+        if self._events is not None:
+            await self._events.join()
+
+    def _trim_history(self):
+        """只保留最近的已结束运行记录"""
+        finished = [run_id for run_id, run in self.runs.items() if run.state in FINISHED_STATES]
+        for run_id in finished[:max(0, len(finished) - settings.WORKFLOW_HISTORY_SIZE)]:
+            del self.runs[run_id]
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
+
+    def _build_step(self, command: SavedCommand, mac_address: str) -> BatchStep:
+        """把指令转换为执行步骤，替换MAC占位符"""
+        return BatchStep(
+            id=command.id,
+            name=command.name,
+            data=command.command.replace(settings.WORKFLOW_MAC_PLACEHOLDER, mac_address),
+            send_as_hex=command.send_as_hex,
+            target_serial_id=command.target_serial_id,
+            expected_response=command.expected_response,
+            read_timeout=command.read_timeout
+        )
+
+    def _build_item(self, command: SavedCommand, result: Optional[BatchStepResult], is_ok: bool,
+                    reason: str, user_choice: Optional[bool] = None) -> TestItemResultSchema:
+        """生成测试项结果"""
+        timestamp = result.timestamp if result else time.time()
+        return TestItemResultSchema(
+            id=command.id,
+            name=command.name,
+            command=command.command,
+            expected_response=command.expected_response,
+            actual_response=result.received_data if result else None,
+            is_ok=is_ok,
+            reason=reason,
+            timestamp=int(timestamp * 1000),
+            has_notification=command.show_notification,
+            user_choice=user_choice
+        )
+
+    async def _wait_confirmation(self, run: WorkflowRun, index: int, command: SavedCommand) -> Optional[bool]:
+        """等待操作员确认人工判定步骤，超时或取消返回 None；并发步骤的确认逐个进行"""
+        async with run.confirmation_lock:
+            if run.cancel_requested:
+                return None
+            run.confirmation = asyncio.get_running_loop().create_future()
+            run.state = WorkflowRunState.WAITING_CONFIRMATION
+            self._publish(run, "confirm_required", command.description, {"index": index, "name": command.name})
+            try:
+                return await asyncio.wait_for(run.confirmation, settings.WORKFLOW_CONFIRM_TIMEOUT)
+            except asyncio.TimeoutError:
+                return None
+            except asyncio.CancelledError:
+                # cancel_run 取消的是确认等待，服务关闭取消的是整个任务
+                if run.cancel_requested:
+                    return None
+                raise
+            finally:
+                run.confirmation = None
+                run.state = WorkflowRunState.RUNNING
+
+    async def _run_step(self, run: WorkflowRun, index: int, command: SavedCommand) -> TestItemResultSchema:
+        """执行单个步骤并按前端规则判定"""
+        step = self._build_step(command, run.request.mac_address)
+        result = await serial_service.execute_step(index, step, run.request.serial_id, latency_key=command.command)
+
+        if result.error is not None:
+            return self._build_item(command, result, False, "error")
+
+        if command.show_notification and command.description:
+            user_choice = await self._wait_confirmation(run, index, command)
+            if user_choice is None:
+                return self._build_item(command, result, False, "user_choice_missing")
+            reason = "user_confirmed_success" if user_choice else "user_confirmed_failure"
+            return self._build_item(command, result, user_choice, reason, user_choice)
+
+        return self._build_item(command, result, result.is_ok, result.reason)
+
+    async def _execute_step(self, run: WorkflowRun, index: int, command: SavedCommand) -> TestItemResultSchema:
+        """执行一个步骤、记录结果并推送进度；失败且需要停止时标记后续步骤不再开始"""
+        run.current_step = index
+        run.running_steps.add(index)
+        try:
+            item = await self._run_step(run, index, command)
+        finally:
+            run.running_steps.discard(index)
+        run.test_items.append(item)
+        self._publish(run, "step", f"{command.name}: {'通过' if item.is_ok else '失败'}",
+                            {"index": index, "item": item.model_dump()})
+
+        hard_failure = item.reason in HARD_FAILURE_REASONS and run.request.abort_on_hard_failure
+        if not item.is_ok and (run.request.stop_on_failure or hard_failure):
+            logger.info(f"Workflow run {run.run_id} stopped at step {index}: {item.reason}")
+            run.stop_requested = True
+        return item
+
+    async def _execute_sequential(self, run: WorkflowRun):
+        """按计划顺序逐步执行"""
+        for index, command in enumerate(run.commands):
+            if run.cancel_requested or run.stop_requested:
+                break
+            await self._execute_step(run, index, command)
+
+        # 未执行的步骤记为跳过
+        for command in run.commands[len(run.test_items):]:
+            run.test_items.append(self._build_item(command, None, False, "skipped"))
+
+    async def _execute_graph(self, run: WorkflowRun):
+        """按依赖关系调度：前置步骤全部通过后立即开始，相互独立的步骤（如不同串口上的步骤）并发执行
+
+        同一串口上的并发步骤由驱动按事务排队；前置步骤失败或跳过的步骤记为跳过
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(index: int, command: SavedCommand) -> Optional[TestItemResultSchema]:
+            requires = await asyncio.gather(*(tasks[step_id] for step_id in run.dependencies.get(command.id, [])))
+            if run.cancel_requested or run.stop_requested:
+                return None
+            if not all(item is not None and item.is_ok for item in requires):
+                return None
+            return await self._execute_step(run, index, command)
+
+        # 创建任务期间不让出事件循环，所有节点开始执行时依赖的任务都已存在
+        for index, command in enumerate(run.commands):
+            tasks[command.id] = asyncio.create_task(run_node(index, command))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        # 测试项按计划顺序保存，未执行的步骤记为跳过
+        executed = {item.id: item for item in run.test_items}
+        run.test_items = [
+            executed.get(command.id) or self._build_item(command, None, False, "skipped") for command in run.commands
+        ]
+
+    async def _execute(self, run: WorkflowRun):
+        """后台执行整个工作流"""
+        run.state = WorkflowRunState.RUNNING
+        self._publish(run, "started", f"开始测试 {run.request.mac_address}")
+        unsubscribe = urc_service.subscribe(run.on_urc)
+
+        try:
+            if run.dependencies is None:
+                await self._execute_sequential(run)
+            else:
+                await self._execute_graph(run)
+
+            run.end_time = int(time.time() * 1000)
+            run.test_result_id = await self._save_result(run)
+            run.state = WorkflowRunState.CANCELLED if run.cancel_requested else WorkflowRunState.COMPLETED
+            self._publish(run, "finished", f"测试完成: 通过 {run.passed_tests}, 失败 {run.failed_tests}")
+
+        except asyncio.CancelledError:
+            run.state = WorkflowRunState.CANCELLED
+            run.end_time = int(time.time() * 1000)
+            raise
+        except Exception as e:
+            logger.error(f"Workflow run {run.run_id} failed: {e}")
+            run.state = WorkflowRunState.FAILED
+            run.error = str(e)
+            run.end_time = int(time.time() * 1000)
+            self._publish(run, "failed", f"测试执行失败: {e}", success=False)
+        finally:
+            unsubscribe()
+
+    async def _save_result(self, run: WorkflowRun) -> str:
+        """保存测试结果"""
+        request = SaveTestResultRequest(
+            mac_address=run.request.mac_address,
+            test_items=run.test_items,
+            start_time=run.start_time,
+            end_time=run.end_time,
+            total_tests=len(run.commands),
+            passed_tests=run.passed_tests,
+            failed_tests=run.failed_tests,
+            skipped_tests=run.skipped_tests,
+            operator=run.request.operator,
+            workstation=run.request.workstation,
+            device_id=run.request.device_id
+        )
+        result = await result_spool_service.submit(request)
+        return result.id
+
+    def _publish(self, run: WorkflowRun, event: str, message: str,
+                 extra: Optional[Dict] = None, success: bool = True):
+        """通过事件总线推送工作流进度（加入推送队列后立即返回）"""
+        data = {"event": event, "run": run.to_status().model_dump(mode="json")}
+        if extra:
+            data.update(extra)
+        ws_message = WSResponseMessage(
+            type=WSMessageType.WORKFLOW,
+            message=message,
+            serial_id=run.request.serial_id,
+            data=data,
+            timestamp=datetime.now().isoformat(),
+            success=success
+        )
+        self._enqueue_event(ws_message.model_dump(mode="json"))
+
+    def _enqueue_event(self, message: Dict):
+        """加入推送队列；推送跟不上时丢弃最旧的事件，运行状态仍可通过接口查询"""
+        loop = asyncio.get_running_loop()
+        if self._publisher is None or self._publisher.done() or self._publisher.get_loop() is not loop:
+            self._events = asyncio.Queue(maxsize=settings.WORKFLOW_EVENT_QUEUE_SIZE)
+            self._publisher = loop.create_task(self._publish_events(self._events))
+        if self._events.full():
+            self._events.get_nowait()
+            self._events.task_done()
+            logger.warning("Workflow event queue full, oldest event dropped")
+        self._events.put_nowait(message)
+
+    async def _publish_events(self, queue: "asyncio.Queue[Dict]"):
+        """后台按顺序推送进度事件"""
+        while True:
+            message = await queue.get()
+            try:
+                await event_bus.publish(message)
+            finally:
+                queue.task_done()
+
+
+# 创建服务实例
+workflow_service = WorkflowService()
@@ -0,0 +1,22 @@
+"""
+Virtual Device Simulator
+虚拟 AT 设备模拟器：无需硬件即可对串口驱动进行负载测试与回归测试（仅 POSIX）
+"""
+
+from app.simulator.device import (
+    DEFAULT_RESPONSES,
+    DeviceStats,
+    FaultConfig,
+    ResponseRule,
+    VirtualATDevice,
+    default_rules,
+)
+
+__all__ = [
+    "DEFAULT_RESPONSES",
+    "DeviceStats",
+    "FaultConfig",
+    "ResponseRule",
+    "VirtualATDevice",
+    "default_rules",
+]
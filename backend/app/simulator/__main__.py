@@ -0,0 +1,53 @@
+"""
+启动虚拟 AT 设备
+
+用法: cd backend && python -m app.simulator --devices 4 --latency 0.01 --baudrate 115200
+"""
+
+import argparse
+import logging
+import time
+
+from app.simulator.device import FaultConfig, VirtualATDevice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="虚拟 AT 设备（伪终端）")
+    parser.add_argument("--devices", type=int, default=1, help="虚拟设备数量")
+    parser.add_argument("--latency", type=float, default=0.0, help="应答延迟(秒)")
+    parser.add_argument("--baudrate", type=int, default=None, help="按该波特率逐字节发送应答")
+    parser.add_argument("--strict-baudrate", action="store_true", help="打开方波特率与 --baudrate 不一致时只回乱码")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="不应答概率")
+    parser.add_argument("--garble-rate", type=float, default=0.0, help="篡改应答概率")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="截断应答概率")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ERROR 应答概率")
+    parser.add_argument("--seed", type=int, default=None, help="故障注入随机种子")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    faults = FaultConfig(
+        drop_rate=args.drop_rate,
+        garble_rate=args.garble_rate,
+        truncate_rate=args.truncate_rate,
+        error_rate=args.error_rate
+    )
+    devices = [
+        VirtualATDevice(latency=args.latency, baudrate=args.baudrate, faults=faults, seed=args.seed,
+                        strict_baudrate=args.strict_baudrate)
+        for _ in range(args.devices)
+    ]
+    for device in devices:
+        print(device.start(), flush=True)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for device in devices:
+            device.stop()
+
+
+if __name__ == "__main__":
+    main()
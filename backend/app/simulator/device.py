@@ -0,0 +1,280 @@
+"""
+Virtual AT Device
+基于 Linux 伪终端的虚拟 AT 设备：按脚本应答指令，支持按指令延迟、按波特率逐字节发送和故障注入
+"""
+
+import logging
+import os
+import random
+import re
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Pattern, Union
+
+try:
+    import pty
+    import termios
+    import tty
+except ImportError:  # Windows 无伪终端
+    pty = termios = tty = None
+
+logger = logging.getLogger(__name__)
+
+Response = Union[str, bytes, Callable[[str], Union[str, bytes]]]
+
+# 默认应答表（与前端演示指令一致）
+DEFAULT_RESPONSES: Dict[str, str] = {
+    "AT": "OK\r\n",
+    "AT+MAC?": "026501123456\r\nOK\r\n",
+    "Eeprom": "EEPROM Test OK\r\n",
+    "ON1": "LED1OK\r\n",
+    "ON2": "LED2OK\r\n",
+    "ON3": "LED3OK\r\n",
+    "DPLCA": "DPLCA OK\r\n",
+    "S485B": "485BOK\r\n",
+    "AT+GMR": "SIM800L_V1.0.0\r\nOK\r\n",
+    "AT+CGMI": "SIMCOM_Ltd\r\nOK\r\n",
+    "AT+CGMM": "SIM800L\r\nOK\r\n",
+    "AT+CGMR": "SIM800L_V1.0.0\r\nOK\r\n",
+    "AT+CGSN": "123456789012345\r\nOK\r\n",
+    "AT+CSQ": "+CSQ: 20,99\r\nOK\r\n",
+    "AT+CREG?": "+CREG: 0,1\r\nOK\r\n",
+    "AT+COPS?": "+COPS: 0,0,\"China Mobile\"\r\nOK\r\n",
+}
+
+
+@dataclass
+class ResponseRule:
+    """应答规则：pattern 为完整指令或正则，response 可以是固定内容或根据指令生成内容的函数"""
+    pattern: Union[str, Pattern]
+    response: Response
+    latency: Optional[float] = None  # 该指令的应答延迟(秒)，None 使用设备默认延迟
+
+    def match(self, command: str) -> bool:
+        if isinstance(self.pattern, str):
+            return self.pattern == command
+        return self.pattern.fullmatch(command) is not None
+
+    def render(self, command: str) -> bytes:
+        response = self.response(command) if callable(self.response) else self.response
+        return response.encode() if isinstance(response, str) else response
+
+
+def default_rules() -> List[ResponseRule]:
+    """默认规则：固定应答表 + 写 MAC 指令"""
+    rules = [ResponseRule(command, response) for command, response in DEFAULT_RESPONSES.items()]
+    rules.append(ResponseRule(re.compile(r"AT\+MAC=[0-9A-Fa-f]{12}"), "OK\r\n"))
+    return rules
+
+
+@dataclass
+class FaultConfig:
+    """故障注入配置（概率取值 0~1）"""
+    drop_rate: float = 0.0  # 不应答
+    garble_rate: float = 0.0  # 随机篡改应答中的一个字节
+    truncate_rate: float = 0.0  # 只发送一半应答
+    stall_rate: float = 0.0  # 应答前额外停顿
+    stall_time: float = 1.0  # 停顿时长(秒)
+    error_rate: float = 0.0  # 以 ERROR 应答
+    disconnect_after: Optional[int] = None  # 收到 N 条指令后挂断
+
+
+@dataclass
+class DeviceStats:
+    """虚拟设备统计"""
+    commands: int = 0
+    responses: int = 0
+    unknown: int = 0
+    faults: Dict[str, int] = field(default_factory=dict)
+
+
+class VirtualATDevice:
+    """虚拟 AT 设备：打开后 port 可像真实串口一样被 SerialDriver.connect 打开"""
+
+    FRAME_IDLE_TIME = 0.02  # 无行结束符时，空闲多久视为一帧（十六进制原始数据）
+
+    def __init__(self, rules: Optional[List[ResponseRule]] = None, latency: float = 0.0,
+                 baudrate: Optional[int] = None, faults: Optional[FaultConfig] = None,
+                 unknown_response: Optional[Response] = "ERROR\r\n", seed: Optional[int] = None,
+                 strict_baudrate: bool = False):
+        self.rules = default_rules() if rules is None else rules
+        self.latency = latency
+        self.baudrate = baudrate
+        self.strict_baudrate = strict_baudrate  # 打开方波特率与设备不一致时只回乱码
+        self.faults = faults or FaultConfig()
+        self.unknown_response = unknown_response
+        self.stats = DeviceStats()
+        self._random = random.Random(seed)
+        self._master_fd: Optional[int] = None
+        self._slave_fd: Optional[int] = None
+        self._write_lock = threading.Lock()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.port: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    def start(self) -> str:
+        """创建伪终端并开始应答，返回可供打开的串口路径"""
+        if pty is None:
+            raise RuntimeError("虚拟 AT 设备需要 POSIX 伪终端")
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._master_fd)
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"virtual-at-{self.port}", daemon=True)
+        self._thread.start()
+        logger.info(f"Virtual AT device listening on {self.port}")
+        return self.port
+
+    def stop(self):
+        """停止应答并关闭伪终端"""
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+        self._close()
+
+    def hang_up(self):
+        """模拟设备掉线：关闭伪终端，已打开的串口随之报错"""
+        self._running = False
+        self._close()
+
+    def _close(self):
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master_fd = self._slave_fd = None
+
+    def __enter__(self) -> "VirtualATDevice":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # 数据收发
+    # ------------------------------------------------------------------
+
+    def send_unsolicited(self, data: Union[str, bytes]):
+        """主动上报（URC）"""
+        self._send(data.encode() if isinstance(data, str) else data)
+
+    def _send(self, data: bytes):
+        """按波特率节奏写出数据（8N1 每字节 10 bit）"""
+        if not data or self._master_fd is None:
+            return
+        with self._write_lock:
+            if not self.baudrate:
+                os.write(self._master_fd, data)
+                return
+            byte_time = 10.0 / self.baudrate
+            chunk = max(1, int(0.001 / byte_time))  # 约每毫秒写一次
+            start = time.perf_counter()
+            for offset in range(0, len(data), chunk):
+                os.write(self._master_fd, data[offset:offset + chunk])
+                delay = start + (offset + chunk) * byte_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def _run(self):
+        """后台线程：读取指令并应答"""
+        pending = b""
+        while self._running:
+            try:
+                readable, _, _ = select.select([self._master_fd], [], [], self.FRAME_IDLE_TIME)
+            except (OSError, ValueError, TypeError):
+                return
+            if not readable:
+                if pending:
+                    # 无行结束符的原始数据，空闲后整帧处理
+                    self._handle_frame(pending)
+                    pending = b""
+                continue
+            try:
+                pending += os.read(self._master_fd, 4096)
+            except (OSError, TypeError):
+                # 读取过程中被 hang_up 关闭
+                return
+
+            while self._running:
+                match = re.search(rb"\r\n|\r|\n", pending)
+                if match is None:
+                    break
+                line, pending = pending[:match.start()], pending[match.end():]
+                if line:
+                    self._handle_frame(line)
+
+    def _handle_frame(self, frame: bytes):
+        """处理一条指令"""
+        self.stats.commands += 1
+        if self.strict_baudrate and not self._line_speed_matches():
+            self._count_fault("baudrate")
+            self._send(bytes(self._random.randrange(0x80, 0x100) for _ in range(len(frame))))
+            return
+        command = frame.decode("utf-8", errors="replace") if self._is_text(frame) else frame.hex().upper()
+
+        faults = self.faults
+        if faults.disconnect_after is not None and self.stats.commands > faults.disconnect_after:
+            self._count_fault("disconnect")
+            self.hang_up()
+            return
+
+        rule = next((rule for rule in self.rules if rule.match(command)), None)
+        if rule is None:
+            self.stats.unknown += 1
+            if self.unknown_response is None:
+                return
+            response = ResponseRule(command, self.unknown_response).render(command)
+            latency = self.latency
+        else:
+            response = rule.render(command)
+            latency = self.latency if rule.latency is None else rule.latency
+
+        if self._chance(faults.drop_rate, "drop"):
+            return
+        if self._chance(faults.error_rate, "error"):
+            response = b"ERROR\r\n"
+        if self._chance(faults.garble_rate, "garble") and response:
+            position = self._random.randrange(len(response))
+            response = response[:position] + bytes([response[position] ^ 0x5A]) + response[position + 1:]
+        if self._chance(faults.truncate_rate, "truncate"):
+            response = response[:len(response) // 2]
+        if self._chance(faults.stall_rate, "stall"):
+            latency += faults.stall_time
+
+        if latency > 0:
+            time.sleep(latency)
+        self._send(response)
+        self.stats.responses += 1
+
+    def _line_speed_matches(self) -> bool:
+        """打开方设置的波特率是否与设备一致"""
+        if not self.baudrate or self._slave_fd is None:
+            return True
+        try:
+            speed = termios.tcgetattr(self._slave_fd)[5]
+        except termios.error:
+            return True
+        return speed == getattr(termios, f"B{self.baudrate}", speed)
+
+    @staticmethod
+    def _is_text(frame: bytes) -> bool:
+        return all(0x20 <= byte < 0x7F for byte in frame)
+
+    def _chance(self, rate: float, fault: str) -> bool:
+        if rate > 0 and self._random.random() < rate:
+            self._count_fault(fault)
+            return True
+        return False
+
+    def _count_fault(self, fault: str):
+        self.stats.faults[fault] = self.stats.faults.get(fault, 0) + 1
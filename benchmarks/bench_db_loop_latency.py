@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+DB Load vs Serial Latency Benchmark
+大量数据库查询进行时串口事务的往返延迟：查询在数据库线程池中执行 vs 直接在事件循环中执行
+
+预先写入 --rows 条指令，--readers 个并发任务持续读取完整指令列表（查询 + 转换为 schema），
+同时在虚拟 AT 设备（伪终端）上逐条发送 --count 条 AT 指令，统计往返耗时
+
+模式:
+  idle      无数据库负载（基线）
+  executor  CommandService.get_all_commands（run_in_db，只读线程池）
+  on_loop   同样的查询与转换直接在事件循环中执行（对照组）
+
+用法: uv run python benchmarks/bench_db_loop_latency.py [--rows 3000] [--readers 4] [--count 40] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+MODES = ("idle", "executor", "on_loop")
+
+
+def summarize(mode: str, latencies: List[float], queries: int, duration: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "mode": mode,
+        "samples": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(statistics.quantiles(ordered, n=20)[-1], 2),
+        "max_ms": round(ordered[-1], 2),
+        "queries_per_second": round(queries / duration, 1),
+    }
+
+
+async def measure(driver, serial_id: int, load, args) -> Dict:
+    """--readers 个任务持续执行 load 期间的串口事务耗时（毫秒）"""
+    stop = asyncio.Event()
+    queries = 0
+
+    async def worker():
+        nonlocal queries
+        while not stop.is_set():
+            await load()
+            queries += 1
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.readers if load else 0)]
+    await asyncio.sleep(0.05)
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for _ in range(args.count):
+            sent = time.perf_counter()
+            await driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=5.0)
+            latencies.append((time.perf_counter() - sent) * 1000)
+            await asyncio.sleep(0.005)
+    finally:
+        stop.set()
+        await asyncio.gather(*workers)
+    return latencies, queries, time.perf_counter() - start
+
+
+async def main_async(args):
+    from sqlmodel import SQLModel, Session, select
+    from app.core.database import Command, create_db_engine
+    from app.core.migrations import run_migrations
+    from app.drivers.serial_driver import SerialDriver
+    from app.services import command_service as command_module
+    from app.services.command_service import command_service
+    from app.simulator import VirtualATDevice
+
+    logging.disable(logging.WARNING)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_db_engine(url)
+        read_engine = create_db_engine(url, readonly=True)
+        SQLModel.metadata.create_all(engine)
+        run_migrations(engine)
+        with Session(engine) as session:
+            for index in range(args.rows):
+                session.add(Command(id=f"cmd-{index}", name=f"指令{index}", command=f"AT+TEST{index}", description=""))
+            session.commit()
+        saved = (command_module.engine, command_module.read_engine)
+        command_module.engine, command_module.read_engine = engine, read_engine
+
+        async def query_on_loop():
+            with Session(read_engine) as session:
+                commands = [command_service._command_to_schema(c) for c in session.exec(select(Command)).all()]
+            await asyncio.sleep(0)
+            return commands
+
+        loads = {"idle": None, "executor": command_service.get_all_commands, "on_loop": query_on_loop}
+        device = VirtualATDevice()
+        device.start()
+        driver = SerialDriver()
+        try:
+            serial_id = await driver.connect(device.port)
+            for mode in args.modes:
+                latencies, queries, duration = await measure(driver, serial_id, loads[mode], args)
+                results.append(summarize(mode, latencies, queries, duration))
+        finally:
+            await driver.disconnect()
+            device.stop()
+            command_module.engine, command_module.read_engine = saved
+            read_engine.dispose()
+            engine.dispose()
+
+    print(f"{'mode':<10}{'samples':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'queries/s':>11}")
+    for row in results:
+        print(f"{row['mode']:<10}{row['samples']:>9}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['max_ms']:>10}{row['queries_per_second']:>11}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库负载下的串口事务延迟基准测试")
+    parser.add_argument("--modes", type=lambda s: s.split(","), default=list(MODES), help="逗号分隔的模式")
+    parser.add_argument("--rows", type=int, default=3000, help="预置的指令条数")
+    parser.add_argument("--readers", type=int, default=4, help="并发读取指令列表的任务数")
+    parser.add_argument("--count", type=int, default=40, help="每种模式发送的 AT 指令数")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Profile Benchmark
+对比默认存储配置与生产存储配置下，并发保存测试结果与查询历史列表时的延迟和吞吐
+
+配置:
+  default     回滚日志模式，读写共用一个连接、一个数据库线程（依次排队）
+  production  WAL + synchronous=NORMAL + mmap/cache/busy_timeout，单个写连接与只读连接池分别在各自线程中执行
+
+负载: 预先写入 --history 条测试结果（每条 --items 个测试项），在 --duration 秒内
+  --writers 个工位各按 --save-rate 条/秒保存测试结果，--readers 个客户端持续查询列表（每页 100 条）与指令失败率统计
+
+用法: uv run python benchmarks/bench_db_profile.py [--history 2000] [--writers 4] [--readers 2] [--save-rate 20] [--read-pool N] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+PROFILES = ("default", "production")
+
+
+def summarize(latencies: List[float], duration: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "per_second": round(len(ordered) / duration, 1),
+        "p50_ms": round(statistics.median(ordered), 2) if ordered else None,
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1], 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None,
+    }
+
+
+def build_request(items: int):
+    from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+
+    now = int(time.time() * 1000)
+    return SaveTestResultRequest(
+        mac_address="026501123456",
+        test_items=[
+            TestItemResultSchema(
+                id=f"cmd-{i}", name=f"Step {i}", command="AT", expected_response="OK",
+                actual_response="OK\r\n", is_ok=i % 10 != 0, reason="expected_match", timestamp=now
+            )
+            for i in range(items)
+        ],
+        start_time=now, end_time=now, total_tests=items, passed_tests=items,
+        failed_tests=0, skipped_tests=0, operator="bench", workstation="bench"
+    )
+
+
+async def run_profile(profile: str, args) -> Dict:
+    from sqlmodel import SQLModel, Session
+    from app.core import database
+    from app.core.config import settings
+    from app.core.migrations import run_migrations
+    from app.services import test_result_service as test_result_module
+    from app.services.test_result_service import test_result_service
+
+    production = profile == "production"
+    read_pool = args.read_pool or settings.DATABASE_READ_POOL_SIZE
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = database.create_db_engine(url, production=production)
+        SQLModel.metadata.create_all(engine)
+        run_migrations(engine)
+        if production:
+            read_engine = database.create_db_engine(url, readonly=True, pool_size=read_pool, production=True)
+            write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bench-write")
+            read_executor = ThreadPoolExecutor(max_workers=read_pool, thread_name_prefix="bench-read")
+        else:
+            read_engine = engine
+            write_executor = read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bench-db")
+
+        saved = (test_result_module.engine, test_result_module.read_engine, database.db_executor, database.db_read_executor)
+        test_result_module.engine, test_result_module.read_engine = engine, read_engine
+        database.db_executor, database.db_read_executor = write_executor, read_executor
+
+        request = build_request(args.items)
+        try:
+            # 预置历史数据
+            for _ in range(args.history):
+                with Session(engine) as session:
+                    test_result_service._save_test_result(session, request)
+
+            stop = asyncio.Event()
+            save_latencies: List[float] = []
+            list_latencies: List[float] = []
+            errors: List[str] = []
+            command_ids = [f"cmd-{i}" for i in range(args.items)]
+
+            async def writer():
+                interval = 1 / args.save_rate if args.save_rate else 0
+                next_save = time.perf_counter()
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        await test_result_service.save_test_result(request)
+                        save_latencies.append((time.perf_counter() - start) * 1000)
+                    except Exception as e:
+                        errors.append(str(e))
+                    # 按固定速率保存，两种配置承受相同的写入负载
+                    next_save += interval
+                    await asyncio.sleep(max(0.0, next_save - time.perf_counter()))
+
+            async def reader():
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        await test_result_service.get_test_results(page=1, page_size=100)
+                        await test_result_service.get_failure_stats(command_ids)
+                        list_latencies.append((time.perf_counter() - start) * 1000)
+                    except Exception as e:
+                        errors.append(str(e))
+                    await asyncio.sleep(0)
+
+            tasks = [asyncio.create_task(writer()) for _ in range(args.writers)]
+            tasks += [asyncio.create_task(reader()) for _ in range(args.readers)]
+            await asyncio.sleep(args.duration)
+            stop.set()
+            await asyncio.gather(*tasks)
+
+            return {
+                "profile": profile,
+                "save": summarize(save_latencies, args.duration),
+                "list": summarize(list_latencies, args.duration),
+                "errors": len(errors),
+            }
+        finally:
+            test_result_module.engine, test_result_module.read_engine, database.db_executor, database.db_read_executor = saved
+            write_executor.shutdown()
+            read_executor.shutdown()
+            if read_engine is not engine:
+                read_engine.dispose()
+            engine.dispose()
+
+
+def print_table(results: List[Dict]):
+    print(f"{'profile':<12}{'op':<6}{'count':>8}{'/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for result in results:
+        for op in ("save", "list"):
+            row = result[op]
+            print(
+                f"{result['profile']:<12}{op:<6}{row['count']:>8}{row['per_second']:>9}"
+                f"{row['p50_ms']!s:>10}{row['p95_ms']!s:>10}{row['max_ms']!s:>10}"
+            )
+        if result["errors"]:
+            print(f"{result['profile']:<12}errors: {result['errors']}")
+
+
+async def main_async(args):
+    logging.disable(logging.WARNING)
+    results = [await run_profile(profile, args) for profile in args.profiles]
+    print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 存储配置基准测试")
+    parser.add_argument("--profiles", type=lambda s: s.split(","), default=list(PROFILES), help="逗号分隔的配置")
+    parser.add_argument("--history", type=int, default=2000, help="预置的测试结果条数")
+    parser.add_argument("--items", type=int, default=20, help="每条测试结果的测试项数")
+    parser.add_argument("--writers", type=int, default=4, help="并发保存的工位数")
+    parser.add_argument("--readers", type=int, default=2, help="并发查询的客户端数")
+    parser.add_argument("--save-rate", type=float, default=20.0, help="每个工位每秒保存的测试结果数，0 表示不限速")
+    parser.add_argument("--read-pool", type=int, default=None, help="production 配置的只读连接池大小（默认取配置）")
+    parser.add_argument("--duration", type=float, default=5.0, help="每种配置的测量时长（秒）")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Serial Driver Backend Benchmark
+对比 executor 与 asyncio 两种串口驱动后端的单指令延迟（基于 Linux 伪终端，无需硬件）
+
+用法: uv run python benchmarks/bench_driver_backends.py [--count 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.drivers.serial_driver import create_serial_driver  # noqa: E402
+from app.simulator import VirtualATDevice  # noqa: E402
+
+
+async def measure(backend: str, count: int) -> dict:
+    """对指定后端执行 count 次 AT 事务并统计延迟"""
+    device = VirtualATDevice()
+    device.start()
+
+    driver = create_serial_driver(backend)
+    serial_id = await driver.connect(device.port, baudrate=115200)
+    latencies = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            result = await driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=1.0)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert result.matched is not None, "response timed out"
+    finally:
+        await driver.disconnect()
+        device.stop()
+
+    latencies.sort()
+    return {
+        "backend": type(driver).__name__,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=500, help="每个后端执行的事务数")
+    args = parser.parse_args()
+
+    print(f"{'backend':>22} {'p50(ms)':>9} {'p99(ms)':>9} {'mean(ms)':>9}")
+    for backend in ("executor", "asyncio"):
+        stats = asyncio.run(measure(backend, args.count))
+        print(f"{stats['backend']:>22} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['mean_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Read-Until Microbenchmark
+对比旧版逐字节 _read_until_sync 与 PortReader.read_response + ResponseMatcher 分块引擎的 CPU 开销
+
+用法: uv run python benchmarks/bench_read_until.py
+"""
+
+import asyncio
+import inspect
+import sys
+import time
+from pathlib import Path
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.drivers.port_reader import PortReader  # noqa: E402
+from app.drivers.response_reader import ResponseMatcher  # noqa: E402
+
+
+class MemorySerial:
+    """内存串口：数据按 fifo_size 分批“到达”，模拟 UART FIFO"""
+
+    def __init__(self, payload: bytes, fifo_size: int):
+        self.payload = payload
+        self.fifo_size = fifo_size
+        self.pos = 0
+        self.timeout = 1.0
+
+    @property
+    def in_waiting(self) -> int:
+        return min(self.fifo_size, len(self.payload) - self.pos)
+
+    def read(self, size: int = 1) -> bytes:
+        chunk = self.payload[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+def legacy_read_until(connection, terminator: bytes, max_size: int = 1024) -> bytes:
+    """基线前的实现：逐字节读取 + 全缓冲区搜索"""
+    data = b""
+    start_time = time.time()
+    timeout = connection.timeout or 1.0
+
+    while len(data) < max_size:
+        if time.time() - start_time > timeout:
+            break
+        char = connection.read(1)
+        if not char:
+            break
+        data += char
+        if terminator in data:
+            break
+
+    return data
+
+
+async def chunked_read_until(connection, terminator: bytes, max_size: int = 1024) -> bytes:
+    """分块引擎：后台读取按 in_waiting 批量写入环形缓冲区，read_response 只在新数据尾部匹配"""
+    reader = PortReader(0, connection, asyncio.get_running_loop())
+    while connection.in_waiting:
+        reader._ingest(connection.read(connection.in_waiting))
+    matcher = ResponseMatcher((terminator,), max_size=max_size)
+    await reader.read_response(matcher, connection.timeout or 1.0)
+    return matcher.data
+
+
+async def bench(func, payload: bytes, fifo_size: int, number: int) -> float:
+    """返回单次读取的平均耗时（微秒），取 3 轮中最快的一轮"""
+    max_size = len(payload) + 64
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            result = func(MemorySerial(payload, fifo_size), b"\r\nOK\r\n", max_size)
+            if inspect.isawaitable(result):
+                await result
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+async def main_async():
+    print(f"{'size':>8} {'fifo':>6} {'legacy(us)':>12} {'chunked(us)':>12} {'speedup':>8}")
+    for size in (64, 1024, 4096, 16384):
+        payload = b"D" * size + b"\r\nOK\r\n"
+        number = max(5, 20000 // size)
+        for fifo_size in (16, 4096):
+            legacy = await bench(legacy_read_until, payload, fifo_size, number)
+            chunked = await bench(chunked_read_until, payload, fifo_size, number)
+            print(f"{size:>8} {fifo_size:>6} {legacy:>12.1f} {chunked:>12.1f} {legacy / chunked:>7.1f}x")
+
+
+def main():
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test Result Query Benchmark
+在合成的大型测试结果数据库上对比执行索引迁移前后的历史查询耗时
+
+数据: --results 条测试结果（默认 20 万），每条 --items 个测试项（默认 20，即 400 万行测试项），
+  创建时间分布在最近 180 天，MAC 以一定比例重测，操作员/工位/设备ID 各有若干取值
+查询: TestResultService 的列表（无过滤、按 MAC/操作员+日期/工位/设备ID 过滤）、详情、失败率统计与删除
+
+用法: uv run python benchmarks/bench_result_queries.py [--results 200000] [--items 20] [--repeat 5] [--db path]
+  指定 --db 时复用已生成的数据库（只生成一次，迁移前先删除索引）
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy 在 SQLite 中的 DateTime 存储格式
+OPERATORS = [f"operator-{i}" for i in range(20)]
+WORKSTATIONS = [f"station-{i}" for i in range(16)]
+
+
+def generate(path: Path, results: int, items: int, seed: int = 1):
+    """用 sqlite3 直接批量写入合成数据（表结构由模型创建）"""
+    from sqlmodel import SQLModel
+    from app.core.database import create_db_engine
+
+    engine = create_db_engine(f"sqlite:///{path}", production=False)
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    macs = [f"0265{rng.getrandbits(32):08X}" for _ in range(int(results * 0.8))]
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    batch = 5000
+    for start in range(0, results, batch):
+        result_rows = []
+        item_rows = []
+        for _ in range(min(batch, results - start)):
+            result_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            created = now - timedelta(seconds=rng.uniform(0, 180 * 86400))
+            created_text = created.strftime(DATETIME_FORMAT)
+            failed = sum(rng.random() < 0.003 for _ in range(items))
+            result_rows.append((
+                result_id, rng.choice(macs), created_text, created_text, items, items - failed, failed, 0,
+                rng.choice(OPERATORS), rng.choice(WORKSTATIONS), f"DUT-{rng.randrange(1000)}", created_text
+            ))
+            for index in range(items):
+                ok = rng.random() >= 0.003
+                item_rows.append((
+                    str(uuid.UUID(int=rng.getrandbits(128))), result_id, f"cmd-{index}", f"Step {index}", "AT",
+                    "OK", "OK\r\n" if ok else "ERROR\r\n", ok, "expected_match" if ok else "expected_mismatch",
+                    created_text, False, None
+                ))
+        connection.executemany("INSERT INTO test_results VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", result_rows)
+        connection.executemany(
+            "INSERT INTO test_item_results (id, test_result_id, command_id, name, command, expected_response, "
+            "actual_response, is_ok, reason, timestamp, has_notification, user_choice) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", item_rows
+        )
+        connection.commit()
+        print(f"\rgenerated {start + len(result_rows)}/{results} results", end="", flush=True)
+    print()
+    connection.close()
+
+
+def drop_indexes(path: Path):
+    connection = sqlite3.connect(path)
+    for (name,) in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_test_%'"
+    ).fetchall():
+        connection.execute(f"DROP INDEX {name}")
+    connection.execute("DROP TABLE IF EXISTS schema_migrations")
+    connection.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    connection.commit()
+    connection.close()
+
+
+async def measure_queries(repeat: int, sample: Dict) -> Dict[str, float]:
+    """各查询执行 repeat 次的中位耗时（毫秒）"""
+    from app.services.test_result_service import test_result_service
+
+    since = datetime.now() - timedelta(days=30)
+    command_ids = [f"cmd-{i}" for i in range(20)]
+    queries: Dict[str, Callable] = {
+        "list (no filter)": lambda: test_result_service.get_test_results(page=1, page_size=20),
+        "list page 50": lambda: test_result_service.get_test_results(page=50, page_size=20),
+        "list by mac": lambda: test_result_service.get_test_results(mac_address=sample["mac_address"]),
+        "list by operator + 7 days": lambda: test_result_service.get_test_results(
+            operator=sample["operator"], start_date=datetime.now() - timedelta(days=7)
+        ),
+        "list by workstation": lambda: test_result_service.get_test_results(workstation=sample["workstation"]),
+        "list by device_id": lambda: test_result_service.get_test_results(device_id=sample["device_id"]),
+        "detail": lambda: test_result_service.get_test_result_by_id(sample["id"]),
+        "failure stats (30 days)": lambda: test_result_service.get_failure_stats(command_ids, since),
+    }
+    timings = {}
+    for name, query in queries.items():
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await query()
+            durations.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(durations)
+
+    start = time.perf_counter()
+    assert await test_result_service.delete_test_result(sample["delete_id"])
+    timings["delete"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def pick_sample(path: Path) -> Dict:
+    connection = sqlite3.connect(path)
+    row = connection.execute(
+        "SELECT id, mac_address, operator, workstation, device_id FROM test_results "
+        "ORDER BY rowid LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM test_results)"
+    ).fetchone()
+    delete_ids = [r[0] for r in connection.execute("SELECT id FROM test_results ORDER BY rowid DESC LIMIT 2")]
+    connection.close()
+    keys = ("id", "mac_address", "operator", "workstation", "device_id")
+    return {**dict(zip(keys, row)), "delete_ids": delete_ids}
+
+
+async def run(path: Path, args):
+    from app.core.database import create_db_engine
+    from app.core.migrations import run_migrations
+    from app.services import test_result_service as test_result_module
+
+    engine = create_db_engine(f"sqlite:///{path}")
+    read_engine = create_db_engine(f"sqlite:///{path}", readonly=True)
+    test_result_module.engine, test_result_module.read_engine = engine, read_engine
+    sample = pick_sample(path)
+    try:
+        before = await measure_queries(args.repeat, {**sample, "delete_id": sample["delete_ids"][0]})
+        start = time.perf_counter()
+        run_migrations(engine)
+        migrate_s = time.perf_counter() - start
+        after = await measure_queries(args.repeat, {**sample, "delete_id": sample["delete_ids"][1]})
+    finally:
+        read_engine.dispose()
+        engine.dispose()
+
+    connection = sqlite3.connect(path)
+    results, items = (connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("test_results", "test_item_results"))
+    connection.close()
+    print(f"{results} results, {items} items, migration took {migrate_s:.1f}s")
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<28}{before[name]:>12.2f}{after[name]:>12.2f}{before[name] / after[name]:>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测试结果查询索引基准测试")
+    parser.add_argument("--results", type=int, default=200000, help="测试结果条数")
+    parser.add_argument("--items", type=int, default=20, help="每条测试结果的测试项数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询的执行次数（取中位数）")
+    parser.add_argument("--db", type=Path, help="合成数据库路径（不存在时生成，存在时复用）")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or Path(tmp) / "bench.db"
+        if not path.exists():
+            generate(path, args.results, args.items)
+        drop_indexes(path)
+        asyncio.run(run(path, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Result Spool Benchmark
+多个工位同时完成测试时，保存测试结果的确认延迟：直接写入数据库 vs 后写队列（spool 落盘后确认）
+
+每轮 --stations 个工位同时保存一条测试结果（每条 --items 个测试项），共 --rounds 轮，轮间隔 --gap 秒；
+spool 模式另外统计最后一次确认到全部结果写入数据库的时间
+
+用法: uv run python benchmarks/bench_result_spool.py [--stations 32] [--items 50] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend app to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+
+def build_request(index: int, items: int):
+    from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+
+    now = int(time.time() * 1000)
+    return SaveTestResultRequest(
+        mac_address=f"0265011{index:05X}",
+        test_items=[
+            TestItemResultSchema(
+                id=f"cmd-{i}", name=f"Step {i}", command="AT", expected_response="OK",
+                actual_response="OK\r\n", is_ok=True, reason="expected_match", timestamp=now
+            )
+            for i in range(items)
+        ],
+        start_time=now, end_time=now, total_tests=items, passed_tests=items,
+        failed_tests=0, skipped_tests=0, operator="bench", workstation=f"station-{index}"
+    )
+
+
+async def run_mode(mode: str, args) -> Dict:
+    from sqlmodel import SQLModel
+    from app.core.database import create_db_engine
+    from app.services import test_result_service as test_result_module
+    from app.services.result_spool_service import ResultSpoolService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_db_engine(url)
+        read_engine = create_db_engine(url, readonly=True)
+        SQLModel.metadata.create_all(engine)
+        saved = (test_result_module.engine, test_result_module.read_engine)
+        test_result_module.engine, test_result_module.read_engine = engine, read_engine
+
+        spool = ResultSpoolService()
+        if mode == "spool":
+            await spool.start(Path(tmp) / "results.spool")
+        requests = [build_request(i, args.items) for i in range(args.stations)]
+        latencies: List[float] = []
+
+        async def station(request):
+            start = time.perf_counter()
+            await spool.submit(request)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        try:
+            for _ in range(args.rounds):
+                await asyncio.sleep(args.gap)
+                await asyncio.gather(*(station(request) for request in requests))
+            acked = time.perf_counter()
+            if mode == "spool":
+                while spool.drained_count < args.stations * args.rounds:
+                    await asyncio.sleep(0.005)
+            drain_lag_ms = (time.perf_counter() - acked) * 1000
+        finally:
+            await spool.stop()
+            test_result_module.engine, test_result_module.read_engine = saved
+            read_engine.dispose()
+            engine.dispose()
+
+        latencies.sort()
+        return {
+            "mode": mode,
+            "results": len(latencies),
+            "ack_p50_ms": round(statistics.median(latencies), 2),
+            "ack_p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 2),
+            "ack_max_ms": round(latencies[-1], 2),
+            "drain_lag_ms": round(drain_lag_ms, 1),
+        }
+
+
+async def main_async(args):
+    logging.disable(logging.WARNING)
+    print(f"{'mode':<8}{'results':>9}{'ack p50':>10}{'ack p99':>10}{'ack max':>10}{'lag ms':>10}")
+    for mode in ("direct", "spool"):
+        row = await run_mode(mode, args)
+        print(f"{row['mode']:<8}{row['results']:>9}{row['ack_p50_ms']:>10}{row['ack_p99_ms']:>10}"
+              f"{row['ack_max_ms']:>10}{row['drain_lag_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测试结果后写队列基准测试")
+    parser.add_argument("--stations", type=int, default=32, help="同时完成测试的工位数")
+    parser.add_argument("--items", type=int, default=50, help="每条测试结果的测试项数")
+    parser.add_argument("--rounds", type=int, default=10, help="轮数")
+    parser.add_argument("--gap", type=float, default=0.2, help="轮间隔（秒）")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Serial Throughput & Latency Benchmark Suite
+基于虚拟 AT 设备（伪终端）与临时 SQLite 数据库，测量 1/4/16/64 个串口并发时各层的吞吐、延迟与 CPU 开销
+
+场景:
+  driver     SerialDriver.write_read_until
+  service    SerialService.send_at_command
+  websocket  WebSocket 终端（uvicorn + websockets 客户端，与前端路径一致）
+  db         TestResultService.save_test_result（每个串口一个并发工位，ops/s 即每秒保存的测试结果数；
+             --items 300 模拟含数百个测试项的计划）
+
+虚拟设备运行在独立子进程中，CPU 统计只包含被测进程（websocket 场景包含同进程的客户端）。
+
+用法: uv run python benchmarks/bench_suite.py [--ports 1,4,16,64] [--commands 200] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+# Add backend app to Python path
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = ("driver", "service", "websocket", "db")
+
+
+class VirtualDevices:
+    """在子进程中启动 N 个虚拟 AT 设备"""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.process = None
+        self.ports: List[str] = []
+
+    def __enter__(self) -> List[str]:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.simulator", "--devices", str(self.count)],
+            cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        self.ports = [self.process.stdout.readline().strip() for _ in range(self.count)]
+        return self.ports
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(5)
+
+
+def summarize(scenario: str, ports: int, latencies: List[float], duration: float, cpu: float) -> Dict:
+    """汇总一次测量结果（延迟单位毫秒）"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "scenario": scenario,
+        "ports": ports,
+        "operations": count,
+        "duration_s": round(duration, 4),
+        "ops_per_s": round(count / duration, 1) if duration else 0.0,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[max(0, int(count * 0.99) - 1)], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "cpu_ms_per_op": round(cpu * 1000 / count, 4),
+    }
+
+
+async def measure(scenario: str, ports: int, workers: List[Callable]) -> Dict:
+    """并发运行每个串口的工作协程，统计延迟、吞吐与 CPU"""
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(latencies) for worker in workers))
+    duration = time.perf_counter() - start
+    return summarize(scenario, ports, latencies, duration, time.process_time() - cpu_start)
+
+
+async def bench_driver(serial_ids: List[int], commands: int) -> Dict:
+    from app.drivers.serial_driver import serial_driver
+
+    def worker_for(serial_id: int):
+        async def worker(latencies: List[float]):
+            for _ in range(commands):
+                start = time.perf_counter()
+                response = await serial_driver.write_read_until(serial_id, b"AT\r\n", b"OK\r\n")
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.endswith(b"OK\r\n"), response
+        return worker
+
+    return await measure("driver", len(serial_ids), [worker_for(serial_id) for serial_id in serial_ids])
+
+
+async def bench_service(serial_ids: List[int], commands: int) -> Dict:
+    from app.services.serial_service import serial_service
+
+    def worker_for(serial_id: int):
+        async def worker(latencies: List[float]):
+            for _ in range(commands):
+                start = time.perf_counter()
+                result = await serial_service.send_at_command("AT", serial_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert result.received_data.endswith("OK\r\n"), result.received_data
+        return worker
+
+    return await measure("service", len(serial_ids), [worker_for(serial_id) for serial_id in serial_ids])
+
+
+async def bench_websocket(serial_ids: List[int], commands: int) -> Dict:
+    import uvicorn
+    import websockets
+    from app.main import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        http_port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=http_port, log_level="warning", lifespan="off"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    def worker_for(serial_id: int):
+        async def worker(latencies: List[float]):
+            url = f"ws://127.0.0.1:{http_port}/api/v1/ws/terminal/bench-{serial_id}"
+            async with websockets.connect(url) as ws:
+                await ws.recv()  # 欢迎消息
+                message = json.dumps({"type": "command", "command": "AT", "serial_id": serial_id})
+                for _ in range(commands):
+                    start = time.perf_counter()
+                    await ws.send(message)
+                    response = json.loads(await ws.recv())
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    assert response["type"] == "response", response
+        return worker
+
+    try:
+        return await measure("websocket", len(serial_ids), [worker_for(serial_id) for serial_id in serial_ids])
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+async def bench_db(workstations: int, saves: int, items: int) -> Dict:
+    from sqlmodel import SQLModel
+    from app.core.database import create_db_engine
+    from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+    from app.services import test_result_service as test_result_module
+    from app.services.test_result_service import test_result_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        test_result_module.engine = engine
+        now = int(time.time() * 1000)
+        request = SaveTestResultRequest(
+            mac_address="026501123456",
+            test_items=[
+                TestItemResultSchema(
+                    id=f"cmd-{i}", name=f"Step {i}", command="AT", expected_response="OK",
+                    actual_response="OK\r\n", is_ok=True, reason="expected_match", timestamp=now
+                )
+                for i in range(items)
+            ],
+            start_time=now, end_time=now, total_tests=items, passed_tests=items,
+            failed_tests=0, skipped_tests=0, operator="bench", workstation="bench"
+        )
+
+        def worker_for(index: int):
+            async def worker(latencies: List[float]):
+                for _ in range(saves):
+                    start = time.perf_counter()
+                    await test_result_service.save_test_result(request)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    await asyncio.sleep(0)
+            return worker
+
+        try:
+            return await measure("db", workstations, [worker_for(i) for i in range(workstations)])
+        finally:
+            engine.dispose()
+
+
+async def run_ports(ports: int, args) -> List[Dict]:
+    """在 N 个虚拟设备上依次运行串口相关场景"""
+    from app.drivers.serial_driver import serial_driver
+
+    results = []
+    serial_scenarios = [s for s in args.scenarios if s != "db"]
+    if serial_scenarios:
+        with VirtualDevices(ports) as paths:
+            serial_ids = [await serial_driver.connect(path, baudrate=115200) for path in paths]
+            try:
+                for scenario in serial_scenarios:
+                    bench = {"driver": bench_driver, "service": bench_service, "websocket": bench_websocket}[scenario]
+                    results.append(await bench(serial_ids, args.commands))
+                    print_result(results[-1])
+            finally:
+                await serial_driver.disconnect()
+    if "db" in args.scenarios:
+        results.append(await bench_db(ports, args.saves, args.items))
+        print_result(results[-1])
+    return results
+
+
+def print_result(result: Dict):
+    print(f"{result['scenario']:>10} {result['ports']:>6} {result['ops_per_s']:>10.1f} "
+          f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['cpu_ms_per_op']:>11.4f}", flush=True)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ports", default="1,4,16,64", help="并发串口数列表")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="要运行的场景")
+    parser.add_argument("--commands", type=int, default=200, help="每个串口执行的指令数")
+    parser.add_argument("--saves", type=int, default=50, help="db 场景每个工位保存的测试结果数")
+    parser.add_argument("--items", type=int, default=20, help="每个测试结果的测试项数")
+    parser.add_argument("--backend", choices=("executor", "asyncio"), default=None, help="串口驱动后端")
+    parser.add_argument("--output", default="bench_results.json", help="JSON 结果文件")
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {sorted(unknown)}")
+
+    # 驱动后端由配置决定，必须在导入 app 之前设置
+    if args.backend:
+        os.environ["SERIAL_DRIVER_BACKEND"] = args.backend
+    from app.core.config import settings
+    logging.disable(logging.WARNING)
+
+    print(f"{'scenario':>10} {'ports':>6} {'ops/s':>10} {'p50(ms)':>9} {'p99(ms)':>9} {'cpu(ms)/op':>11}")
+    results = []
+    for ports in (int(p) for p in args.ports.split(",")):
+        results.extend(asyncio.run(run_ports(ports, args)))
+
+    report = {
+        "version": settings.VERSION,
+        "git_revision": git_revision(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": settings.SERIAL_DRIVER_BACKEND,
+        "params": {"commands": args.commands, "saves": args.saves, "items": args.items},
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ export interface SavedCommand {
   send_as_hex: boolean
   show_notification: boolean
   target_serial_id?: number // 目标串口ID，null表示使用当前选择的串口
+  read_timeout?: number | null // 响应超时(秒)，null表示按历史耗时自适应
   created_at: number // 毫秒时间戳
 }
 
@@ -24,6 +25,7 @@ export interface CreateCommandRequest {
   send_as_hex?: boolean
   show_notification?: boolean
   target_serial_id?: number
+  read_timeout?: number // 响应超时(秒)，不指定则按历史耗时自适应
 }
 
 export interface UpdateCommandRequest {
@@ -34,6 +36,7 @@ export interface UpdateCommandRequest {
   send_as_hex?: boolean
   show_notification?: boolean
   target_serial_id?: number
+  read_timeout?: number // 0 表示恢复自适应
 }
 
 export interface CommandsListResponse {
@@ -41,6 +44,25 @@ export interface CommandsListResponse {
   total: number
 }
 
+export interface CommandLatencyStats {
+  serial_id: number
+  command: string
+  samples: number
+  p50_ms: number
+  p99_ms: number
+  max_ms: number
+  learned_timeout?: number // 学习到的超时(秒)，样本不足时为空
+}
+
+export interface CommandTimeoutInfo {
+  command_id: string
+  name: string
+  command: string
+  read_timeout?: number // 人工设置的超时(秒)
+  default_timeout: number
+  ports: CommandLatencyStats[]
+}
+
 export interface APIResponse<T = any> {
   code: number
   msg: string
@@ -99,3 +121,17 @@ export const getCommandsCount = async (): Promise<number> => {
   // 由于拦截器已经处理了错误检查和数据提取，这里直接返回
   return response
 }
+
+/**
+ * 获取每条指令的超时设置与各串口学习到的超时
+ */
+export const getCommandTimeouts = async (): Promise<CommandTimeoutInfo[]> => {
+  return await api.get<CommandTimeoutInfo[]>('/commands/timeouts')
+}
+
+/**
+ * 清除指令的历史耗时统计
+ */
+export const resetCommandLatency = async (id: string): Promise<void> => {
+  await api.delete(`/commands/${id}/latency`)
+}
@@ -0,0 +1,76 @@
+/**
+ * Dispatcher API - 多工装调度API
+ */
+
+import { api } from './index'
+
+export interface DispatchUnit {
+  mac_address: string // MAC地址或条码
+  plan_id?: string
+  operator?: string
+  workstation?: string
+  device_id?: string
+  stop_on_failure?: boolean
+  optimize_order?: boolean
+  abort_on_hard_failure?: boolean
+}
+
+export interface PortThroughput {
+  serial_id: number
+  port: string
+  busy: boolean
+  current_unit?: string
+  completed: number
+  passed: number
+  failed: number
+  avg_cycle_time: number // 秒
+  units_per_hour: number
+}
+
+export interface DispatchUnitResult {
+  mac_address: string
+  serial_id: number
+  run_id?: string
+  passed: boolean
+  test_result_id?: string
+  error?: string
+  cycle_time: number // 秒
+  finished_at: number // 毫秒时间戳
+}
+
+export interface DispatcherStatus {
+  running: boolean
+  queued: number
+  total_completed: number
+  units_per_hour: number
+  ports: PortThroughput[]
+  recent: DispatchUnitResult[]
+}
+
+/**
+ * 获取调度状态与各串口产能
+ */
+export const getDispatcherStatus = async (): Promise<DispatcherStatus> => {
+  return await api.get<DispatcherStatus>('/dispatcher/status')
+}
+
+/**
+ * 加入待测单元
+ */
+export const enqueueUnits = async (units: DispatchUnit[]): Promise<{ queued: number }> => {
+  return await api.post<{ queued: number }>('/dispatcher/units', { units })
+}
+
+/**
+ * 启动调度，不指定串口则使用全部已连接串口
+ */
+export const startDispatcher = async (serialIds?: number[]): Promise<DispatcherStatus> => {
+  return await api.post<DispatcherStatus>('/dispatcher/start', { serial_ids: serialIds })
+}
+
+/**
+ * 停止调度
+ */
+export const stopDispatcher = async (): Promise<DispatcherStatus> => {
+  return await api.post<DispatcherStatus>('/dispatcher/stop')
+}
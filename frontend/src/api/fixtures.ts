@@ -0,0 +1,74 @@
+/**
+ * Fixtures API - 工装配置API
+ */
+
+import { api } from './index'
+
+export interface CreateFixtureProfileRequest {
+  station: string // 工位名称
+  serial_id: number // 固定的串口ID
+  port?: string // 设备路径
+  hwid?: string // 硬件ID，指定时按硬件ID查找设备
+  baudrate?: number
+  bytesize?: number
+  parity?: string
+  stopbits?: number
+  timeout?: number
+  idle_gap?: number
+  auto_baudrate?: boolean
+  enabled?: boolean // 启动时是否自动连接
+}
+
+export interface FixtureProfile extends Required<Omit<CreateFixtureProfileRequest, 'idle_gap'>> {
+  id: string
+  idle_gap?: number
+  connected: boolean
+  connected_port?: string
+  created_at: number // 毫秒时间戳
+}
+
+export interface FixtureConnectResult {
+  profile_id: string
+  station: string
+  serial_id: number
+  port?: string
+  baudrate?: number
+  connected: boolean
+  error?: string
+  elapsed_ms: number
+}
+
+/**
+ * 获取所有工装配置及连接状态
+ */
+export const getFixtureProfiles = async (): Promise<FixtureProfile[]> => {
+  return await api.get<FixtureProfile[]>('/fixtures/')
+}
+
+/**
+ * 创建工装配置
+ */
+export const createFixtureProfile = async (data: CreateFixtureProfileRequest): Promise<FixtureProfile> => {
+  return await api.post<FixtureProfile>('/fixtures/', data)
+}
+
+/**
+ * 删除工装配置
+ */
+export const deleteFixtureProfile = async (id: string): Promise<void> => {
+  await api.delete(`/fixtures/${id}`)
+}
+
+/**
+ * 并行连接所有启用的工装
+ */
+export const connectAllFixtures = async (): Promise<FixtureConnectResult[]> => {
+  return await api.post<FixtureConnectResult[]>('/fixtures/connect')
+}
+
+/**
+ * 连接单个工装
+ */
+export const connectFixture = async (id: string): Promise<FixtureConnectResult> => {
+  return await api.post<FixtureConnectResult>(`/fixtures/${id}/connect`)
+}
@@ -15,6 +15,17 @@ export interface SerialConfig {
   parity: string
   stopbits: number
   timeout: number
+  idle_gap?: number // 无终止符响应的字节间空闲间隔(秒)
+  auto_baudrate?: boolean // 自动检测波特率，优先使用该设备上次检测到的波特率
+}
+
+export interface BaudrateDetectResult {
+  port: string
+  hwid: string
+  baudrate?: number // 未检测到时为空
+  cached: boolean // 直接使用已保存的检测结果
+  probes: number
+  elapsed_ms: number
 }
 
 export interface SerialConnectionInfo {
@@ -42,6 +53,7 @@ export interface SerialConnectResponse {
 export interface RawDataRequest {
   data: string
   serial_id?: number
+  idle_gap?: number // 字节间空闲间隔(秒)，收到数据后空闲即结束响应
 }
 
 export interface RawDataResponse {
@@ -51,11 +63,76 @@ export interface RawDataResponse {
   timestamp: number
 }
 
+export interface BatchStep {
+  id?: string
+  name?: string
+  data: string
+  send_as_hex?: boolean
+  target_serial_id?: number | null
+  expected_response?: string
+  read_timeout?: number
+  idle_gap?: number // 字节间空闲间隔(秒)
+}
+
+export interface BatchRequest {
+  steps: BatchStep[]
+  serial_id?: number
+  stop_on_failure?: boolean
+}
+
+export interface BatchStepResult {
+  index: number
+  id?: string
+  name?: string
+  serial_id?: number
+  sent_data: string
+  received_data: string
+  expected_response: string
+  is_ok: boolean
+  reason: string
+  error?: string
+  elapsed_ms: number
+  timestamp: number
+}
+
+export interface BatchSummary {
+  total_steps: number
+  executed_steps: number
+  passed_steps: number
+  failed_steps: number
+  elapsed_ms: number
+}
+
+export interface UrcEvent {
+  serial_id: number
+  line: string // 不含行结束符
+  timestamp: number
+}
+
+export interface BroadcastRequest {
+  data: string
+  serial_ids?: number[] // 不指定则发送到所有已连接串口
+  send_as_hex?: boolean
+  expected_response?: string
+  port_timeout?: number // 每个串口的最长耗时(秒)，含排队等待
+  read_timeout?: number
+  idle_gap?: number
+}
+
+export interface BroadcastResponse {
+  results: BatchStepResult[]
+  total_ports: number
+  passed_ports: number
+  failed_ports: number
+  elapsed_ms: number
+}
+
 // API接口 - 支持通用指令交互
 export const serialAPI = {
   // 获取可用串口列表
-  async getAvailablePorts(): Promise<SerialPortInfo[]> {
-    const response = await api.get<SerialPortInfo[]>('/serial/ports')
+  async getAvailablePorts(refresh = false): Promise<SerialPortInfo[]> {
+    // 读取后端缓存的串口清单，插拔变化会通过 WebSocket 'ports' 消息推送
+    const response = await api.get<SerialPortInfo[]>('/serial/ports', { params: { refresh } })
     return response
   },
 
@@ -65,6 +142,11 @@ export const serialAPI = {
     return response.port
   },
 
+  // 并行检测多个串口的波特率
+  async detectBaudrate(ports: string[], force = false): Promise<BaudrateDetectResult[]> {
+    return await api.post<BaudrateDetectResult[]>('/serial/detect-baudrate', { ports, force })
+  },
+
   // 连接串口
   async connectSerial(config: SerialConfig): Promise<SerialConnectResponse> {
     const response = await api.post<SerialConnectResponse>('/serial/connect', config)
@@ -82,6 +164,11 @@ export const serialAPI = {
     return response
   },
 
+  // 最近的主动上报（实时上报通过 WebSocket 'urc' 消息推送）
+  async getRecentUrcs(serialId?: number): Promise<UrcEvent[]> {
+    return await api.get<UrcEvent[]>('/serial/urcs', { params: { serial_id: serialId } })
+  },
+
   // 发送指令（支持AT指令和其他自定义指令）
   async sendATCommand(command: string, serialId?: number): Promise<RawDataResponse> {
     const response = await api.post<RawDataResponse>('/serial/send-at', { 
@@ -99,4 +186,55 @@ export const serialAPI = {
     })
     return response
   },
+
+  // 同一指令并行发送到多个串口
+  async broadcast(request: BroadcastRequest): Promise<BroadcastResponse> {
+    return await api.post<BroadcastResponse>('/serial/broadcast', request)
+  },
+
+  // 批量执行指令（NDJSON流式返回，每完成一步回调一次）
+  async runBatch(request: BatchRequest, onStep?: (step: BatchStepResult) => void): Promise<BatchSummary> {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+    if (typeof window !== 'undefined' && window.sessionId) {
+      headers['X-Session-Id'] = window.sessionId
+    }
+    const response = await fetch('/api/v1/serial/batch', {
+      method: 'POST',
+      headers,
+      body: JSON.stringify(request)
+    })
+    if (!response.ok || !response.body) {
+      throw new Error(`批量执行失败: HTTP ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let summary: BatchSummary | null = null
+
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      let newline = buffer.indexOf('\n')
+      while (newline >= 0) {
+        const line = buffer.slice(0, newline).trim()
+        buffer = buffer.slice(newline + 1)
+        if (line) {
+          const message = JSON.parse(line)
+          if (message.type === 'step') {
+            onStep?.(message.data)
+          } else if (message.type === 'summary') {
+            summary = message.data
+          }
+        }
+        newline = buffer.indexOf('\n')
+      }
+    }
+
+    if (!summary) {
+      throw new Error('批量执行未返回汇总结果')
+    }
+    return summary
+  },
 }
\ No newline at end of file
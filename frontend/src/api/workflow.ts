@@ -0,0 +1,127 @@
+/**
+ * Workflow API - 测试计划与后端工作流API
+ */
+
+import { api } from './index'
+import type { UrcEvent } from './serial'
+import type { TestItemResult } from './testResults'
+
+export interface TestPlan {
+  id: string
+  name: string
+  description: string
+  command_ids: string[]
+  pinned_command_ids: string[] // 优化排序时保持原位置的指令
+  dependencies?: Record<string, string[]> | null // 步骤依赖，为空表示顺序执行
+  created_at: number // 毫秒时间戳
+}
+
+export interface CreateTestPlanRequest {
+  name: string
+  description?: string
+  command_ids: string[]
+  pinned_command_ids?: string[]
+  dependencies?: Record<string, string[]> // {指令ID: [前置指令ID]}，指定后相互独立的步骤并发执行
+}
+
+export interface WorkflowRunRequest {
+  plan_id?: string // 不指定则按指令列表顺序执行全部常用指令
+  mac_address: string
+  serial_id?: number
+  operator?: string
+  workstation?: string
+  device_id?: string
+  stop_on_failure?: boolean
+  optimize_order?: boolean // 按历史失败率重排步骤，最可能失败的先执行
+  abort_on_hard_failure?: boolean // 无响应/响应不符/串口错误时立即结束
+}
+
+export type WorkflowRunState =
+  | 'pending'
+  | 'running'
+  | 'waiting_confirmation'
+  | 'completed'
+  | 'failed'
+  | 'cancelled'
+
+export interface WorkflowRunStatus {
+  run_id: string
+  plan_id?: string
+  mac_address: string
+  state: WorkflowRunState
+  current_step: number
+  running_steps: number[] // 正在执行的步骤序号
+  total_steps: number
+  command_ids: string[] // 实际执行顺序
+  passed_tests: number
+  failed_tests: number
+  skipped_tests: number
+  test_result_id?: string
+  error?: string
+  urcs: UrcEvent[] // 运行期间测试串口上收到的主动上报
+  start_time: number // 毫秒时间戳
+  end_time?: number // 毫秒时间戳
+}
+
+// WebSocket workflow 消息的 data：每条都带运行状态快照
+export type WorkflowEventType = 'started' | 'step' | 'confirm_required' | 'finished' | 'failed'
+
+export interface WorkflowEventData {
+  event: WorkflowEventType
+  run: WorkflowRunStatus
+  index?: number // step / confirm_required：步骤序号
+  name?: string // confirm_required：步骤名称
+  item?: TestItemResult // step：步骤判定结果
+}
+
+/**
+ * 创建测试计划
+ */
+export const createTestPlan = async (data: CreateTestPlanRequest): Promise<TestPlan> => {
+  return await api.post<TestPlan>('/workflow/plans', data)
+}
+
+/**
+ * 获取所有测试计划
+ */
+export const getTestPlans = async (): Promise<TestPlan[]> => {
+  return await api.get<TestPlan[]>('/workflow/plans')
+}
+
+/**
+ * 启动后端工作流，进度通过 WebSocket 的 workflow 消息推送
+ */
+export const startWorkflowRun = async (data: WorkflowRunRequest): Promise<WorkflowRunStatus> => {
+  return await api.post<WorkflowRunStatus>('/workflow/runs', data)
+}
+
+/**
+ * 获取工作流运行状态
+ */
+export const getWorkflowRun = async (runId: string): Promise<WorkflowRunStatus> => {
+  return await api.get<WorkflowRunStatus>(`/workflow/runs/${runId}`)
+}
+
+/**
+ * 提交人工确认结果
+ */
+export const confirmWorkflowStep = async (runId: string, choice: boolean): Promise<void> => {
+  await api.post(`/workflow/runs/${runId}/confirm`, { choice })
+}
+
+/**
+ * 取消工作流运行
+ */
+export const cancelWorkflowRun = async (runId: string): Promise<void> => {
+  await api.post(`/workflow/runs/${runId}/cancel`)
+}
+
+// 导出API实例
+export const workflowAPI = {
+  createTestPlan,
+  getTestPlans,
+  startWorkflowRun,
+  getWorkflowRun,
+  confirmWorkflowStep,
+  cancelWorkflowRun
+}
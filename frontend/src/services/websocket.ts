@@ -13,7 +13,10 @@ export enum WSMessageType {
   INFO = 'info',
   CONNECT = 'connect',
   DISCONNECT = 'disconnect',
-  AUTO_AT = "auto_at"
+  AUTO_AT = "auto_at",
+  WORKFLOW = 'workflow',
+  PORTS = 'ports', // 串口插拔，data: { added, removed, ports }
+  URC = 'urc' // 主动上报（如 +CREG:、RING），data: { serial_id, line, timestamp }
 }
 
 // WebSocket消息接口
@@ -26,6 +26,9 @@ export const useCommunicationStore = defineStore('communication', () => {
   const wsClient = ref<WebSocketClient | null>(null)
   const wsConnected = ref(false)
 
+  // 工作流进度订阅（各页面按运行ID过滤）
+  const workflowListeners = new Set<(message: WSResponseMessage) => void>()
+
   // 计算属性
   const logCount = computed(() => logs.value.length)
   const isRealTimeConnected = computed(() => wsConnected.value)
@@ -72,6 +75,10 @@ export const useCommunicationStore = defineStore('communication', () => {
     const isError = message.type === WSMessageType.ERROR
     const serialId = message.serial_id
 
+    if (message.type === WSMessageType.WORKFLOW) {
+      workflowListeners.forEach(listener => listener(message as WSResponseMessage))
+    }
+
     if (message.type === WSMessageType.AUTO_AT) {
       addLog({
         type: 'at',
@@ -103,6 +110,14 @@ export const useCommunicationStore = defineStore('communication', () => {
 
   }
 
+  // 订阅工作流进度消息，返回取消订阅函数
+  const onWorkflowMessage = (listener: (message: WSResponseMessage) => void) => {
+    workflowListeners.add(listener)
+    return () => {
+      workflowListeners.delete(listener)
+    }
+  }
+
   // 断开WebSocket
   const disconnectWebSocket = () => {
     if (wsClient.value) {
@@ -252,6 +267,7 @@ export const useCommunicationStore = defineStore('communication', () => {
     sendATCommand,
     sendRawData,
     initializeWebSocket,
-    disconnectWebSocket
+    disconnectWebSocket,
+    onWorkflowMessage
   }
 })
\ No newline at end of file
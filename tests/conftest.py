@@ -5,6 +5,7 @@ Test Configuration
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
 from backend.app.main import app
 
 
@@ -23,4 +24,27 @@ def mock_session_id():
 @pytest.fixture
 def auth_headers(mock_session_id):
     """认证请求头"""
-    return {"X-Session-Id": mock_session_id}
\ No newline at end of file
+    return {"X-Session-Id": mock_session_id}
+
+@pytest.fixture
+def temp_engine(tmp_path, monkeypatch):
+    """使用临时 SQLite 数据库替换各服务使用的全局 engine 与 read_engine"""
+    from app.core.config import settings
+    from app.core.database import create_db_engine
+    from app.core.migrations import run_migrations
+    from app.services import (
+        baudrate_service, command_service, fixture_service, test_result_service, workflow_service
+    )
+
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url)
+    read_engine = create_db_engine(url, readonly=True, pool_size=settings.DATABASE_READ_POOL_SIZE)
+    engine.echo = read_engine.echo = False
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    for module in (command_service, workflow_service, baudrate_service, fixture_service, test_result_service):
+        monkeypatch.setattr(module, "engine", engine)
+        monkeypatch.setattr(module, "read_engine", read_engine)
+    yield engine
+    read_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,63 @@
+"""
+Test Fakes
+测试用内存模拟串口
+"""
+
+import threading
+import time
+
+
+class FakeSerial:
+    """内存模拟串口：write 后按脚本返回响应（可设置响应延迟，单位秒）"""
+
+    def __init__(self, responses: dict, delay: float = 0.0):
+        self.responses = responses
+        self.delay = delay
+        self.rx = bytearray()
+        self.pending = []
+        self.writes = []
+        self.timeout = 0.05
+        self.is_open = True
+        self.port = "/dev/fake"
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> int:
+        self.writes.append(data)
+        with self._lock:
+            self.pending.append((time.monotonic() + self.delay, self.responses.get(data, b"")))
+        return len(data)
+
+    def _deliver(self):
+        """把已到时间的响应放入接收缓冲"""
+        now = time.monotonic()
+        while self.pending and self.pending[0][0] <= now:
+            self.rx += self.pending.pop(0)[1]
+
+    def feed(self, data: bytes):
+        """模拟设备主动上报"""
+        with self._lock:
+            self.rx += data
+
+    @property
+    def in_waiting(self) -> int:
+        with self._lock:
+            self._deliver()
+            return len(self.rx)
+
+    def read(self, size: int = 1) -> bytes:
+        with self._lock:
+            self._deliver()
+            chunk = bytes(self.rx[:size])
+            del self.rx[:size]
+        if not chunk:
+            time.sleep(min(self.timeout or 0.01, 0.01))
+        return chunk
+
+    def close(self):
+        self.is_open = False
+
+
+async def attach(driver, connection: FakeSerial, serial_id: int = 1) -> int:
+    """把模拟串口注册到驱动并启动后台读取器"""
+    driver._register_connection(serial_id, connection, {"port": connection.port, "timeout": 0.5})
+    return serial_id
@@ -0,0 +1,47 @@
+"""
+Baudrate Service Tests
+波特率检测测试：虚拟设备只在波特率一致时正常应答
+"""
+
+import pytest
+
+from app.drivers.serial_driver import serial_driver
+from app.schemas.serial_schemas import SerialConfig
+from app.services.baudrate_service import baudrate_service
+from app.services.serial_service import serial_service
+from app.simulator import VirtualATDevice
+from app.simulator.device import pty
+
+pytestmark = pytest.mark.skipif(pty is None, reason="需要 POSIX 伪终端")
+
+
+@pytest.mark.asyncio
+async def test_detects_ports_in_parallel_and_remembers_result(temp_engine):
+    """多个串口并行检测；再次检测直接使用记录，强制检测时先试上次成功的波特率"""
+    devices = [VirtualATDevice(baudrate=baudrate, strict_baudrate=True) for baudrate in (9600, 38400, 4800)]
+    for device in devices:
+        device.start()
+    try:
+        ports = [device.port for device in devices]
+        results = await baudrate_service.detect_many(ports)
+        assert [result.baudrate for result in results] == [9600, 38400, 4800]
+        assert [result.probes for result in results] == [5, 3, 6]
+        assert not any(result.cached for result in results)
+
+        cached = await baudrate_service.detect(ports[2])
+        assert (cached.baudrate, cached.cached, cached.probes) == (4800, True, 0)
+        forced = await baudrate_service.detect(ports[2], force=True)
+        assert (forced.baudrate, forced.cached, forced.probes) == (4800, False, 1)
+
+        # 连接时使用记录的波特率，不再检测
+        serial_id = await serial_service.connect_serial(SerialConfig(port=ports[0], auto_baudrate=True))
+        try:
+            assert serial_driver.port_configs[serial_id]["baudrate"] == 9600
+            result = await serial_service.send_at_command("AT", serial_id)
+            assert result.received_data == "OK\r\n"
+        finally:
+            await serial_driver.disconnect()
+    finally:
+        for device in devices:
+            device.stop()
+    assert devices[0].stats.commands == 5 + 1
@@ -0,0 +1,88 @@
+"""
+Database Layer Tests
+数据库测试：生产存储配置下读写互不阻塞；数据库查询在数据库线程中执行，不占用事件循环
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.core.database import Command, create_db_engine
+from app.drivers.serial_driver import SerialDriver
+from app.services.command_service import command_service
+from tests.fakes import FakeSerial, attach
+
+
+def test_production_profile_reads_do_not_wait_for_writer(tmp_path):
+    """WAL 下写事务未提交时只读连接照常查询；只读连接拒绝写入"""
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = create_db_engine(url, production=True)
+    read_engine = create_db_engine(url, readonly=True, production=True)
+    try:
+        with engine.begin() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            connection.execute(text("INSERT INTO items VALUES (1)"))
+
+        with engine.connect() as writer, read_engine.connect() as reader:
+            writer.execute(text("BEGIN IMMEDIATE"))
+            writer.execute(text("INSERT INTO items VALUES (2)"))
+            start = time.perf_counter()
+            assert reader.execute(text("SELECT COUNT(*) FROM items")).scalar() == 1
+            assert time.perf_counter() - start < 0.5
+            writer.execute(text("COMMIT"))
+            assert reader.execute(text("SELECT COUNT(*) FROM items")).scalar() == 2
+
+            with pytest.raises(OperationalError):
+                reader.execute(text("INSERT INTO items VALUES (3)"))
+    finally:
+        read_engine.dispose()
+        engine.dispose()
+
+
+async def measure_latencies(driver: SerialDriver, serial_id: int, count: int = 40) -> list:
+    """串口事务往返耗时（毫秒），每次间隔 5ms"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        result = await driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=1.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert result.data == b"OK\r\n"
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+@pytest.mark.asyncio
+async def test_db_queries_run_off_event_loop(temp_engine, monkeypatch):
+    """列表查询与转换在只读数据库线程中执行，期间串口事务照常完成（延迟对比见 benchmarks/bench_db_loop_latency.py）"""
+    with Session(temp_engine) as session:
+        for index in range(200):
+            session.add(Command(id=f"cmd-{index}", name=f"指令{index}", command=f"AT+TEST{index}", description=""))
+        session.commit()
+
+    threads = set()
+    to_schema = command_service._command_to_schema
+
+    def recording_to_schema(command):
+        threads.add(threading.current_thread().name)
+        return to_schema(command)
+
+    monkeypatch.setattr(command_service, "_command_to_schema", recording_to_schema)
+    driver = SerialDriver()
+    serial_id = await attach(driver, FakeSerial({b"AT\r\n": b"OK\r\n"}))
+    try:
+        queries = asyncio.gather(*(command_service.get_all_commands() for _ in range(4)))
+        latencies = await measure_latencies(driver, serial_id, count=5)
+        results = await queries
+    finally:
+        await driver.disconnect()
+
+    assert len(latencies) == 5
+    assert [len(commands) for commands in results] == [200] * 4
+    assert threads and all(name.startswith("db-read") for name in threads)
@@ -0,0 +1,118 @@
+"""
+Dispatcher Service Tests
+多工装调度测试（内存模拟串口 + 临时 SQLite 数据库）
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.schemas.command_schemas import CreateCommandRequest
+from app.schemas.dispatcher_schemas import DispatchUnit
+from app.services import serial_service as serial_service_module
+from app.services.command_service import command_service
+from app.services.dispatcher_service import dispatcher_service
+from tests.fakes import FakeSerial, attach
+
+
+@pytest_asyncio.fixture
+async def fixtures():
+    """两个工装：2 号工装的 LED 测试失败"""
+    driver = serial_service_module.serial_driver
+    first = FakeSerial({b"LED1\r\n": b"LED1OK\r\n"})
+    second = FakeSerial({b"LED1\r\n": b"LED1FAIL\r\n"})
+    await attach(driver, first, 1)
+    await attach(driver, second, 2)
+    yield first, second
+    await dispatcher_service.stop()
+    dispatcher_service.clear()
+    dispatcher_service.queue = None  # 每个测试使用新的事件循环
+    dispatcher_service.workers.clear()
+    dispatcher_service.recent.clear()
+    await driver.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_spreads_units_across_ports(temp_engine, fixtures):
+    """队列中的单元分配给空闲串口并行执行，并按串口统计产能"""
+    await command_service.create_command(CreateCommandRequest(name="LED", command="LED1", expected_response="LED1OK"))
+    first, second = fixtures
+
+    dispatcher_service.enqueue([DispatchUnit(mac_address=f"02650112340{i}") for i in range(6)])
+    dispatcher_service.start()
+    await asyncio.wait_for(dispatcher_service.join(), 10)
+
+    status = dispatcher_service.get_status()
+    ports = {port.serial_id: port for port in status.ports}
+    assert status.queued == 0
+    assert status.total_completed == 6
+    assert ports[1].completed >= 1 and ports[2].completed >= 1
+    assert ports[1].failed == 0 and ports[2].passed == 0
+    assert ports[1].units_per_hour > 0
+    assert len(first.writes) + len(second.writes) == 6
+    assert {result.serial_id for result in status.recent} == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_is_recorded_and_worker_continues(temp_engine, fixtures, monkeypatch):
+    """工作流抛出非业务异常时记为失败，工作者继续处理后续单元"""
+    from app.services.workflow_service import workflow_service
+
+    calls = []
+    original_run = workflow_service.run
+
+    async def flaky_run(request):
+        calls.append(request.mac_address)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return await original_run(request)
+
+    monkeypatch.setattr(workflow_service, "run", flaky_run)
+    await command_service.create_command(CreateCommandRequest(name="LED", command="LED1", expected_response="LED1OK"))
+
+    dispatcher_service.enqueue([DispatchUnit(mac_address=f"02650112340{i}") for i in range(3)])
+    dispatcher_service.start([1])
+    await asyncio.wait_for(dispatcher_service.join(), 10)
+
+    status = dispatcher_service.get_status()
+    assert status.running and status.total_completed == 3
+    failed = [result for result in status.recent if result.error]
+    assert [result.error for result in failed] == ["database is locked"]
+    assert sum(result.passed for result in status.recent) == 2
+
+
+@pytest.mark.asyncio
+async def test_plan_with_pinned_port_is_rejected(temp_engine, fixtures):
+    """指定了目标串口的指令会绕开调度分配的串口，单元直接记为失败"""
+    await command_service.create_command(
+        CreateCommandRequest(name="LED", command="LED1", expected_response="LED1OK", target_serial_id=2)
+    )
+    first, second = fixtures
+
+    dispatcher_service.enqueue([DispatchUnit(mac_address="026501123400")])
+    dispatcher_service.start([1])
+    await asyncio.wait_for(dispatcher_service.join(), 10)
+
+    [result] = dispatcher_service.get_status().recent
+    assert not result.passed and result.run_id is None and "目标串口" in result.error
+    assert first.writes == [] and second.writes == []
+
+
+@pytest.mark.asyncio
+async def test_stop_requeues_in_flight_unit(temp_engine, fixtures):
+    """停止调度时进行中的单元放回队列"""
+    await command_service.create_command(
+        CreateCommandRequest(name="LED", command="SLOW", expected_response="OK", read_timeout=5)
+    )
+
+    dispatcher_service.enqueue([DispatchUnit(mac_address="026501123400")])
+    dispatcher_service.start([1])
+    for _ in range(100):
+        if dispatcher_service.get_status().ports[0].busy:
+            break
+        await asyncio.sleep(0.01)
+    await dispatcher_service.stop()
+
+    status = dispatcher_service.get_status()
+    assert status.queued == 1 and status.total_completed == 0 and not status.running
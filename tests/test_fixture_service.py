@@ -0,0 +1,62 @@
+"""
+Fixture Service Tests
+工装配置测试：固定串口ID、按硬件ID查找设备与并行自动连接
+"""
+
+import pytest
+
+from app.core.exceptions import ConfigException
+from app.drivers.serial_driver import serial_driver
+from app.schemas.fixture_schemas import FixtureProfileCreateRequest
+from app.schemas.serial_schemas import SerialPortInfo
+from app.services.fixture_service import fixture_service
+from app.services.port_inventory_service import port_inventory_service
+from app.simulator import VirtualATDevice
+from app.simulator.device import pty
+
+pytestmark = pytest.mark.skipif(pty is None, reason="需要 POSIX 伪终端")
+
+
+@pytest.mark.asyncio
+async def test_connect_all_uses_stable_serial_ids(temp_engine, monkeypatch):
+    """工装按固定ID并行连接，临时连接不会占用工装的ID"""
+    devices = [VirtualATDevice() for _ in range(3)]
+    for device in devices:
+        device.start()
+    hwid = "USB VID:PID=1A86:7523 SER=FIXTURE2 LOCATION=1-1.2"
+    monkeypatch.setattr(port_inventory_service, "scanned_at", 1.0)
+    monkeypatch.setattr(port_inventory_service, "ports", [SerialPortInfo(
+        device=devices[1].port, name="ttyUSB1", description="USB Serial", hwid=hwid, manufacturer="QinHeng"
+    )])
+    monkeypatch.setattr(serial_driver, "reserved_ids", set())
+    try:
+        await fixture_service.create_profile(FixtureProfileCreateRequest(
+            station="工位1", serial_id=3, port=devices[0].port
+        ))
+        await fixture_service.create_profile(FixtureProfileCreateRequest(station="工位2", serial_id=1, hwid=hwid))
+        await fixture_service.create_profile(FixtureProfileCreateRequest(
+            station="工位3", serial_id=9, port="/dev/does-not-exist"
+        ))
+        with pytest.raises(ConfigException):
+            await fixture_service.create_profile(FixtureProfileCreateRequest(station="重复", serial_id=3, port="x"))
+
+        results = await fixture_service.connect_all()
+        assert [(r.station, r.serial_id, r.connected) for r in results] == [
+            ("工位2", 1, True), ("工位1", 3, True), ("工位3", 9, False)
+        ]
+        assert serial_driver.connected_ports == {1: devices[1].port, 3: devices[0].port}
+
+        # 临时连接跳过工装保留的ID（包括未连接成功的 9）
+        assert serial_driver.get_next_serial_id() == 2
+        adhoc = await serial_driver.connect(devices[2].port)
+        assert adhoc == 2
+
+        # 再次连接是幂等的
+        results = await fixture_service.connect_all()
+        assert [r.connected for r in results] == [True, True, False]
+        profiles = await fixture_service.get_profiles()
+        assert [(p.serial_id, p.connected) for p in profiles] == [(1, True), (3, True), (9, False)]
+    finally:
+        await serial_driver.disconnect()
+        for device in devices:
+            device.stop()
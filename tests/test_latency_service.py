@@ -0,0 +1,62 @@
+"""
+Latency Service Tests
+自适应超时测试
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services import serial_service as serial_service_module
+from app.services.latency_service import LatencyService, latency_service
+from app.services.serial_service import serial_service
+from tests.fakes import FakeSerial, attach
+
+
+def test_learned_timeout_from_rolling_p99(monkeypatch):
+    """样本足够后超时 = p99 × 安全系数，并受上下限约束；人工设置优先"""
+    monkeypatch.setattr(settings, "SERIAL_LATENCY_MIN_SAMPLES", 10)
+    service = LatencyService()
+
+    for _ in range(9):
+        service.record(1, "Eeprom", 0.5)
+    assert service.resolve_timeout(1, "Eeprom") == settings.SERIAL_READ_TIMEOUT
+
+    service.record(1, "Eeprom", 0.6)
+    assert service.resolve_timeout(1, "Eeprom") == pytest.approx(0.6 * settings.SERIAL_TIMEOUT_SAFETY_FACTOR)
+    assert service.resolve_timeout(1, "Eeprom", override=5.0) == 5.0
+    # 其他串口独立统计
+    assert service.resolve_timeout(2, "Eeprom") == settings.SERIAL_READ_TIMEOUT
+
+    for _ in range(10):
+        service.record(1, "AT", 0.001)
+    assert service.resolve_timeout(1, "AT") == settings.SERIAL_TIMEOUT_MIN
+
+    stats = service.get_stats("Eeprom")
+    assert [(s.serial_id, s.samples) for s in stats] == [(1, 10)]
+    assert stats[0].p99_ms == pytest.approx(600)
+
+
+@pytest.mark.asyncio
+async def test_send_at_command_records_completed_responses(monkeypatch):
+    """正常结束的响应（含无结果码、按空闲间隔结束的响应）都计入，超时不计入"""
+    monkeypatch.setattr(settings, "SERIAL_LATENCY_MIN_SAMPLES", 3)
+    latency_service.reset()
+    driver = serial_service_module.serial_driver
+    await attach(driver, FakeSerial({b"AT\r\n": b"OK\r\n", b"VER\r\n": b"V1.0"}), 1)
+    try:
+        for _ in range(3):
+            await serial_service.send_at_command("AT", 1)
+        # 自定义指令的响应没有 OK/ERROR，按串口默认空闲间隔结束
+        for _ in range(3):
+            await serial_service.send_at_command("VER", 1, read_timeout=1.0)
+        await serial_service.send_at_command("SILENT", 1, read_timeout=0.05)
+        await serial_service.send_at_command("SILENT", 1, read_timeout=0.2, idle_gap=0.05)
+    finally:
+        await driver.disconnect()
+
+    samples = {s.command: s.samples for s in latency_service.get_stats()}
+    assert samples == {"AT": 3, "VER": 3}
+    assert latency_service.resolve_timeout(1, "AT") == settings.SERIAL_TIMEOUT_MIN
+    # 无结果码的指令同样学到自适应超时，而不是一直使用默认超时
+    assert latency_service.resolve_timeout(1, "VER") < settings.SERIAL_READ_TIMEOUT
+    latency_service.reset()
@@ -0,0 +1,51 @@
+"""
+Schema Migration Tests
+数据库迁移测试：已有数据库按版本补建索引，重复执行无副作用，历史查询使用对应索引
+"""
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+from app.core.database import create_db_engine
+from app.core.migrations import MIGRATIONS, Migration, run_migrations
+
+
+def query_plan(connection, sql: str) -> str:
+    return " | ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_migrations_upgrade_existing_database(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    engine.echo = False
+    try:
+        # 旧版本数据库：只有 create_all 创建的表和主键
+        SQLModel.metadata.create_all(engine)
+        assert inspect(engine).get_indexes("test_results") == []
+
+        assert run_migrations(engine) == MIGRATIONS[-1].version
+        indexes = {index["name"] for index in inspect(engine).get_indexes("test_results")}
+        assert "ix_test_results_mac_address_created_at" in indexes
+        item_indexes = {index["name"] for index in inspect(engine).get_indexes("test_item_results")}
+        assert "ix_test_item_results_test_result_id" in item_indexes
+
+        with engine.connect() as connection:
+            plan = query_plan(connection, "SELECT * FROM test_results WHERE mac_address = 'AABBCCDDEEFF' "
+                                          "ORDER BY created_at DESC LIMIT 20")
+            assert "ix_test_results_mac_address_created_at" in plan and "TEMP B-TREE" not in plan
+            plan = query_plan(connection, "SELECT * FROM test_results ORDER BY created_at DESC LIMIT 20")
+            assert "ix_test_results_created_at" in plan
+            plan = query_plan(connection, "SELECT * FROM test_item_results WHERE test_result_id = 'x'")
+            assert "ix_test_item_results_test_result_id" in plan
+            plan = query_plan(connection, "SELECT command_id, COUNT(*) FROM test_item_results "
+                                          "WHERE command_id IN ('a', 'b') AND reason != 'skipped' "
+                                          "GROUP BY command_id")
+            assert "COVERING INDEX ix_test_item_results_command_id_timestamp" in plan
+
+        # 已执行的版本不再执行，新增的版本按顺序执行
+        applied = []
+        migrations = MIGRATIONS + [Migration(MIGRATIONS[-1].version + 1, "probe", lambda c: applied.append(1))]
+        assert run_migrations(engine, migrations) == MIGRATIONS[-1].version + 1
+        assert run_migrations(engine, migrations) == MIGRATIONS[-1].version + 1
+        assert applied == [1]
+    finally:
+        engine.dispose()
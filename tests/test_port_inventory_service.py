@@ -0,0 +1,89 @@
+"""
+Port Inventory Service Tests
+串口清单缓存与插拔监听测试
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.services import port_inventory_service as inventory_module
+from app.services.port_inventory_service import PortInventoryService
+
+
+def port(device: str) -> dict:
+    return {"device": device, "name": Path(device).name, "description": "USB Serial",
+            "hwid": f"USB VID:PID=1A86:7523 LOCATION={device}", "manufacturer": "QinHeng"}
+
+
+@pytest.fixture
+def system_ports(monkeypatch):
+    """可修改的系统串口列表"""
+    ports = [port("/dev/ttyUSB0")]
+    monkeypatch.setattr(inventory_module.serial_driver, "get_available_ports", lambda: list(ports))
+    return ports
+
+
+@pytest_asyncio.fixture
+async def events():
+    received = []
+
+    async def collect(message):
+        received.append(message)
+
+    event_bus.subscribe(collect)
+    yield received
+    event_bus.unsubscribe(collect)
+
+
+@pytest.mark.asyncio
+async def test_rescan_caches_ports_and_publishes_changes(system_ports, events):
+    """扫描结果被缓存，只有清单变化时推送"""
+    inventory = PortInventoryService()
+    await inventory.ensure_scanned()
+    assert [p.device for p in inventory.get_ports()] == ["/dev/ttyUSB0"]
+    assert events == []
+
+    assert not await inventory.rescan()
+    system_ports.append(port("/dev/ttyACM0"))
+    assert await inventory.rescan()
+    system_ports.pop(0)
+    assert await inventory.rescan()
+
+    assert [p.device for p in inventory.get_ports()] == ["/dev/ttyACM0"]
+    assert [(e["type"], [p["device"] for p in e["data"]["added"]], e["data"]["removed"]) for e in events] == [
+        ("ports", ["/dev/ttyACM0"], []),
+        ("ports", [], ["/dev/ttyUSB0"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_device_node_events_trigger_rescan(system_ports, monkeypatch, tmp_path):
+    """监听目录中出现串口设备节点时立即重新扫描，无需等待定期扫描"""
+    monkeypatch.setattr(settings, "SERIAL_PORT_WATCH_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "SERIAL_PORT_RESCAN_INTERVAL", 60.0)
+    inventory = PortInventoryService()
+    await inventory.start()
+    try:
+        if inventory._watcher is None:
+            pytest.skip("inotify not available")
+        await asyncio.sleep(0.05)
+        scans = inventory.scan_count
+
+        (tmp_path / "not-a-port").touch()
+        await asyncio.sleep(0.5)
+        assert inventory.scan_count == scans
+
+        system_ports.append(port("/dev/ttyUSB1"))
+        (tmp_path / "ttyUSB1").touch()
+        for _ in range(100):
+            if len(inventory.get_ports()) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert [p.device for p in inventory.get_ports()] == ["/dev/ttyUSB0", "/dev/ttyUSB1"]
+    finally:
+        await inventory.stop()
@@ -0,0 +1,118 @@
+"""
+Port Supervisor Service Tests
+串口断线重连测试：设备掉线后按硬件ID在新路径上重新打开，串口ID不变，掉线期间排队的指令在恢复后执行
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.drivers.serial_driver import serial_driver
+from app.services.port_inventory_service import port_inventory_service
+from app.services.port_supervisor_service import port_supervisor_service
+from app.simulator import VirtualATDevice
+from app.simulator.device import pty
+
+pytestmark = pytest.mark.skipif(pty is None, reason="需要 POSIX 伪终端")
+
+HWID = "USB VID:PID=0403:6001 SER=A10K3JQ LOCATION=1-1.4"
+
+
+@pytest.mark.asyncio
+async def test_reconnects_by_hwid_and_keeps_queued_commands(monkeypatch):
+    first = VirtualATDevice()
+    second = VirtualATDevice()
+    first.start()
+    present = {first.port: HWID}  # 当前在线的设备路径 -> 硬件ID
+    monkeypatch.setattr(serial_driver, "get_available_ports", lambda: [
+        {"device": device, "name": device, "description": "USB Serial", "hwid": hwid, "manufacturer": "FTDI"}
+        for device, hwid in present.items()
+    ])
+    monkeypatch.setattr(port_inventory_service, "ports", [])
+    monkeypatch.setattr(port_inventory_service, "scanned_at", None)
+    monkeypatch.setattr(port_supervisor_service, "hwids", {})
+    monkeypatch.setattr(settings, "SERIAL_RECONNECT_INITIAL_DELAY", 0.05)
+    await port_inventory_service.rescan()
+
+    await port_supervisor_service.start()
+    serial_id = await serial_driver.connect(first.port)
+    try:
+        # 打开串口时即记录硬件ID，不依赖定期检查
+        assert port_supervisor_service.hwids[serial_id] == HWID
+
+        # 适配器复位：原设备消失，读取器报错后串口进入重连
+        first.hang_up()
+        present.clear()
+        for _ in range(50):
+            if serial_id in serial_driver.recovering:
+                break
+            await asyncio.sleep(0.02)
+        assert serial_id in serial_driver.recovering
+        assert not serial_driver.is_port_healthy(serial_id)
+
+        # 掉线期间发出的指令排队等待，而不是立即失败
+        pending = asyncio.create_task(
+            serial_driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=1.0)
+        )
+        await asyncio.sleep(0.2)
+        assert not pending.done()
+
+        # 设备以新的路径重新枚举
+        second.start()
+        present[second.port] = HWID
+        result = await asyncio.wait_for(pending, 5.0)
+        assert result.data == b"OK\r\n"
+        assert serial_driver.connected_ports[serial_id] == second.port
+        assert port_supervisor_service.hwids[serial_id] == HWID
+        assert serial_driver.is_port_healthy(serial_id)
+        assert port_supervisor_service.reconnect_counts[serial_id] >= 1
+    finally:
+        await port_supervisor_service.stop()
+        await serial_driver.disconnect()
+        first.stop()
+        second.stop()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_during_outage_fails_queued_commands():
+    """用户断开正在重连的串口时，等待中的指令报告未连接"""
+    device = VirtualATDevice()
+    device.start()
+    serial_id = await serial_driver.connect(device.port)
+    serial_driver.auto_reconnect = True
+    try:
+        serial_driver.mark_failed(serial_id, IOError("device reset"))
+        pending = asyncio.create_task(
+            serial_driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=1.0)
+        )
+        await asyncio.sleep(0.05)
+        await serial_driver.disconnect(serial_id)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(pending, 2.0)
+        assert serial_id not in serial_driver.recovering
+    finally:
+        serial_driver.auto_reconnect = False
+        await serial_driver.disconnect()
+        device.stop()
+
+
+@pytest.mark.asyncio
+async def test_reopen_at_unknown_path_forgets_previous_hwid(monkeypatch):
+    """重连到清单中查不到硬件ID的路径后清除旧硬件ID，下次重连沿用当前路径而不是按旧设备查找"""
+    device = VirtualATDevice()
+    device.start()
+    monkeypatch.setattr(port_inventory_service, "ports", [])
+    monkeypatch.setattr(port_supervisor_service, "hwids", {})
+    await port_supervisor_service.start()
+    try:
+        serial_id = await serial_driver.connect(device.port)
+        port_supervisor_service.hwids[serial_id] = HWID  # 上一个设备的硬件ID
+        serial_driver.mark_failed(serial_id, IOError("device reset"))
+        await serial_driver.reopen(serial_id, device.port)
+        assert serial_id not in port_supervisor_service.hwids
+        assert await port_supervisor_service._locate(serial_id, device.port) == device.port
+    finally:
+        await port_supervisor_service.stop()
+        await serial_driver.disconnect()
+        device.stop()
@@ -0,0 +1,101 @@
+"""
+Result Spool Service Tests
+测试结果后写队列测试：并发保存合并落盘后立即确认，后台写入数据库；崩溃后回放幂等
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+from app.services.result_spool_service import ResultSpoolService
+from app.services.test_result_service import test_result_service
+
+
+def make_request(mac_address: str, items: int = 5) -> SaveTestResultRequest:
+    now = int(time.time() * 1000)
+    return SaveTestResultRequest(
+        mac_address=mac_address,
+        test_items=[
+            TestItemResultSchema(id=f"cmd-{i}", name=f"Step {i}", command="AT", expected_response="OK",
+                                 actual_response="OK\r\n", is_ok=True, reason="expected_match", timestamp=now)
+            for i in range(items)
+        ],
+        start_time=now, end_time=now, total_tests=items, passed_tests=items, failed_tests=0, skipped_tests=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_spike_is_acknowledged_from_spool_and_drained(temp_engine, tmp_path):
+    spool = ResultSpoolService()
+    await spool.start(tmp_path / "results.spool")
+    appends = []
+    append_sync = spool._append_sync
+    spool._append_sync = lambda data: (appends.append(data.count(b"\n")), append_sync(data))
+    try:
+        acks = await asyncio.gather(*(spool.submit(make_request(f"AABBCCDD{i:04X}")) for i in range(50)))
+        assert len({ack.id for ack in acks}) == 50
+        assert sum(appends) == 50 and len(appends) < 50  # 组提交
+
+        for _ in range(100):
+            if spool.drained_count == 50:
+                break
+            await asyncio.sleep(0.02)
+        assert spool.drained_count == 50
+    finally:
+        await spool.stop()
+
+    results, total = await test_result_service.get_test_results(page_size=100)
+    assert total == 50
+    detail = await test_result_service.get_test_result_by_id(acks[0].id)
+    assert detail.mac_address == "AABBCCDD0000" and len(detail.test_items) == 5
+    # 全部写入数据库后 spool 被清空
+    assert (tmp_path / "results.spool").stat().st_size == 0
+    assert (tmp_path / "results.spool.offset").read_text() == "0"
+
+
+@pytest.mark.asyncio
+async def test_replay_after_crash_is_idempotent(temp_engine, tmp_path):
+    """检查点之后的记录已有部分写入数据库，末行写到一半：回放不重复写入，不完整的末行被丢弃"""
+    path = tmp_path / "results.spool"
+    records = [(str(uuid.uuid4()), datetime.now(), make_request(f"0265011234{i:02X}")) for i in range(3)]
+    lines = [
+        json.dumps({"id": rid, "created_at": created.isoformat(), "request": req.model_dump(mode="json")}).encode()
+        for rid, created, req in records
+    ]
+    path.write_bytes(b"\n".join(lines) + b"\n" + lines[0][:40])
+    (tmp_path / "results.spool.offset").write_text("0")
+    # 崩溃前第一条已经写入数据库，但检查点尚未更新
+    assert await test_result_service.save_test_results_batch(records[:1]) == 1
+
+    spool = ResultSpoolService()
+    await spool.start(path)
+    await spool.stop()
+    assert spool.drained_count == 2
+
+    results, total = await test_result_service.get_test_results()
+    assert total == 3
+    assert sorted(result.id for result in results) == sorted(rid for rid, _, _ in records)
+    assert path.stat().st_size == 0
+
+    # 再次回放同一批记录不会重复写入
+    assert await test_result_service.save_test_results_batch(records) == 0
+
+
+def test_stale_checkpoint_is_reset_on_open(tmp_path):
+    """压缩截断后、写检查点前崩溃：检查点超出文件长度时从头回放，并把检查点落盘重置"""
+    path = tmp_path / "results.spool"
+    path.write_bytes(b"")
+    (tmp_path / "results.spool.offset").write_text("4096")
+
+    spool = ResultSpoolService()
+    spool.path = path
+    try:
+        assert spool._open_sync() == 0
+    finally:
+        spool._close_sync()
+    assert (tmp_path / "results.spool.offset").read_text() == "0"
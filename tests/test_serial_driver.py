@@ -0,0 +1,286 @@
+"""
+Serial Driver Tests
+串口驱动测试（使用内存模拟串口，无需硬件）
+"""
+
+import asyncio
+import os
+import re
+import time
+
+try:
+    import pty
+    import tty
+except ImportError:  # Windows 无伪终端
+    pty = tty = None
+
+import pytest
+import serial
+
+from app.drivers.port_reader import RingBuffer
+from app.drivers.response_reader import ResponseMatcher
+from app.drivers.transaction_queue import (
+    PortTransactionQueue, TransactionPriority, TransactionTimeoutError
+)
+from app.drivers.serial_driver import AsyncioSerialDriver, SerialDriver, create_serial_driver
+from tests.fakes import FakeSerial, attach
+
+
+@pytest.mark.asyncio
+async def test_transaction_matches_terminator_with_single_write():
+    """单次事务命中终止符，且只写入一次"""
+    driver = SerialDriver()
+    connection = FakeSerial({b"AT+GMR\r\n": b"V1.0.0\r\nOK\r\n"})
+    serial_id = await attach(driver, connection)
+
+    result = await driver.write_read_match(
+        serial_id, b"AT+GMR\r\n", (b"\r\nOK\r\n", b"\r\nERROR\r\n"), read_timeout=0.5
+    )
+    await driver.disconnect()
+
+    assert result.data == b"V1.0.0\r\nOK\r\n"
+    assert result.matched == repr(b"\r\nOK\r\n")
+    assert result.first_byte_time is not None
+    assert connection.writes == [b"AT+GMR\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_transaction_matches_pattern():
+    """单次事务命中正则匹配器"""
+    driver = SerialDriver()
+    serial_id = await attach(driver, FakeSerial({b"AT+CPIN?\r\n": b"\r\n+CME ERROR: 10\r\n"}))
+    pattern = re.compile(rb"\+CME ERROR:[^\r\n]*\r\n")
+
+    result = await driver.write_read_match(
+        serial_id, b"AT+CPIN?\r\n", (b"OK\r\n",), (pattern,), read_timeout=0.5
+    )
+    await driver.disconnect()
+
+    assert result.data.endswith(b"+CME ERROR: 10\r\n")
+    assert result.matched == pattern.pattern.decode("latin-1")
+
+
+@pytest.mark.asyncio
+async def test_transaction_timeout_returns_partial_data():
+    """未命中任何匹配器时返回已收到的数据"""
+    driver = SerialDriver()
+    serial_id = await attach(driver, FakeSerial({b"ON1\r\n": b"LED1"}))
+
+    result = await driver.write_read_match(serial_id, b"ON1\r\n", (b"OK\r\n",), read_timeout=0.1)
+    await driver.disconnect()
+
+    assert result.data == b"LED1"
+    assert result.matched is None
+
+
+@pytest.mark.asyncio
+async def test_write_failure_raises_without_waiting_for_response():
+    """写入失败时立即报错，不等待读取超时"""
+    driver = SerialDriver()
+    connection = FakeSerial({})
+    serial_id = await attach(driver, connection)
+
+    def broken_write(data: bytes) -> int:
+        raise OSError("device disconnected")
+
+    connection.write = broken_write
+    try:
+        for transaction in (
+            lambda: driver.write_read(serial_id, b"AT\r\n", read_timeout=2.0),
+            lambda: driver.write_read_until(serial_id, b"AT\r\n", read_timeout=2.0),
+            lambda: driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=2.0),
+        ):
+            start = time.perf_counter()
+            with pytest.raises(serial.SerialException):
+                await transaction()
+            assert time.perf_counter() - start < 0.5
+    finally:
+        await driver.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_unsolicited_data_does_not_pollute_next_response():
+    """两次事务之间的主动上报数据不会混入下一次响应"""
+    driver = SerialDriver()
+    connection = FakeSerial({b"AT\r\n": b"OK\r\n"})
+    serial_id = await attach(driver, connection)
+
+    connection.feed(b"RING\r\n")
+    time.sleep(0.05)  # 等待后台线程把主动上报收入缓冲区
+
+    result = await driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=0.5)
+    await driver.disconnect()
+
+    assert result.data == b"OK\r\n"
+
+
+def test_response_matcher_finds_terminator_across_chunks():
+    """终止符跨批次到达时仍能命中，且多余数据保留在 remainder"""
+    matcher = ResponseMatcher((b"\r\nOK\r\n",), max_size=64)
+
+    assert not matcher.feed(b"V1.0.0\r\nO")
+    assert matcher.feed(b"K\r\n+CREG: 1\r\n")
+
+    assert matcher.data == b"V1.0.0\r\nOK\r\n"
+    assert matcher.remainder == b"+CREG: 1\r\n"
+
+
+def test_response_matcher_stops_when_full():
+    """缓冲区写满时结束读取"""
+    matcher = ResponseMatcher((b"\r\n",), max_size=4)
+
+    assert matcher.feed(b"ABCDEF")
+    assert matcher.data == b"ABCD"
+    assert matcher.matched is None
+
+
+def test_ring_buffer_drops_oldest_on_overflow():
+    """环形缓冲区溢出时丢弃最旧的数据"""
+    ring = RingBuffer(8)
+    ring.write(b"abcdef")
+    assert ring.read(2) == b"ab"
+    ring.write(b"ghijkl")
+
+    assert ring.dropped == 2
+    assert ring.read() == b"efghijkl"
+
+    ring.write(b"xyz")
+    ring.unread(b"uvw")
+    assert ring.read() == b"uvwxyz"
+
+
+@pytest.mark.skipif(pty is None, reason="需要 POSIX 伪终端")
+@pytest.mark.asyncio
+async def test_asyncio_backend_over_pty():
+    """asyncio 后端通过事件循环直接读写伪终端"""
+    master_fd, slave_fd = pty.openpty()
+    tty.setraw(master_fd)
+    driver = create_serial_driver("asyncio")
+    assert isinstance(driver, AsyncioSerialDriver)
+
+    serial_id = await driver.connect(os.ttyname(slave_fd))
+    task = asyncio.get_running_loop().run_in_executor(None, os.read, master_fd, 64)
+    transaction = asyncio.ensure_future(
+        driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=1.0)
+    )
+    assert await task == b"AT\r\n"
+    os.write(master_fd, b"OK\r\n")
+    result = await transaction
+    await driver.disconnect()
+    os.close(master_fd)
+    os.close(slave_fd)
+
+    assert result.data == b"OK\r\n"
+    assert not driver.readers
+
+
+@pytest.mark.asyncio
+async def test_transaction_queue_orders_by_priority():
+    """同一串口的事务逐个执行，交互指令优先于批量步骤"""
+    queue = PortTransactionQueue(1)
+    order = []
+
+    async def step(name, priority):
+        async with queue.transaction(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await queue.acquire()
+    tasks = [
+        asyncio.ensure_future(step("batch-1", TransactionPriority.BATCH)),
+        asyncio.ensure_future(step("batch-2", TransactionPriority.BATCH)),
+        asyncio.ensure_future(step("interactive", TransactionPriority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    queue.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert not queue.busy
+
+
+@pytest.mark.asyncio
+async def test_transaction_queue_deadline():
+    """排队超过截止时间的事务抛出 TransactionTimeoutError，且不影响后续事务"""
+    queue = PortTransactionQueue(1)
+    await queue.acquire()
+
+    with pytest.raises(TransactionTimeoutError):
+        await queue.acquire(deadline=time.monotonic() + 0.05)
+
+    queue.release()
+    assert not queue.busy
+    await asyncio.wait_for(queue.acquire(), 0.1)
+
+
+@pytest.mark.asyncio
+async def test_same_port_transactions_do_not_interleave():
+    """并发发往同一串口的事务不会交错，不同串口并行执行"""
+    driver = SerialDriver()
+    first = FakeSerial({b"A\r\n": b"RESP-A\r\n", b"B\r\n": b"RESP-B\r\n"})
+    second = FakeSerial({b"C\r\n": b"RESP-C\r\n"})
+    await attach(driver, first, 1)
+    await attach(driver, second, 2)
+
+    results = await asyncio.gather(
+        driver.write_read_match(1, b"A\r\n", (b"\r\n",), read_timeout=0.5),
+        driver.write_read_match(1, b"B\r\n", (b"\r\n",), read_timeout=0.5),
+        driver.write_read_match(2, b"C\r\n", (b"\r\n",), read_timeout=0.5),
+    )
+    await driver.disconnect()
+
+    assert [r.data for r in results] == [b"RESP-A\r\n", b"RESP-B\r\n", b"RESP-C\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_idle_gap_completes_unterminated_responses():
+    """无终止符的响应在数据到达后空闲即结束，不等待读超时"""
+    driver = SerialDriver()
+    connection = FakeSerial({bytes.fromhex("0103"): bytes.fromhex("01030200FF"), b"LED1\r\n": b"LED1 FAIL\r\n"})
+    serial_id = await attach(driver, connection)
+    driver.set_idle_gap(serial_id, 0.05)
+
+    start = time.perf_counter()
+    raw = await driver.write_read(serial_id, bytes.fromhex("0103"), read_timeout=2.0)
+    raw_elapsed = time.perf_counter() - start
+
+    # 终止符事务默认不按空闲结束；按指令指定 idle_gap 后提前结束
+    result = await driver.write_read_match(serial_id, b"LED1\r\n", (b"OK\r\n",), read_timeout=2.0, idle_gap=0.05)
+    await driver.disconnect()
+
+    assert raw == bytes.fromhex("01030200FF")
+    assert raw_elapsed < 0.5
+    assert result.data == b"LED1 FAIL\r\n" and result.matched is None
+    assert result.elapsed_time < 0.5
+
+
+@pytest.mark.asyncio
+async def test_idle_gap_end_near_deadline_is_complete():
+    """空闲结束时距截止时间不足两个空闲间隔，仍判定为正常结束；无数据则为超时"""
+    driver = SerialDriver()
+    serial_id = await attach(driver, FakeSerial({b"VER\r\n": b"V1.0"}, delay=0.15))
+
+    result = await driver.write_read_match(serial_id, b"VER\r\n", (b"OK\r\n",), read_timeout=0.4, idle_gap=0.15)
+    silent = await driver.write_read_match(serial_id, b"NONE\r\n", (b"OK\r\n",), read_timeout=0.1, idle_gap=0.05)
+    await driver.disconnect()
+
+    assert result.data == b"V1.0" and result.elapsed_time < 0.4
+    assert result.complete
+    assert silent.data == b"" and not silent.complete
+
+
+@pytest.mark.asyncio
+async def test_failing_failure_listener_does_not_stop_others():
+    """故障监听者抛出异常时，其余监听者仍收到通知"""
+    driver = SerialDriver()
+    serial_id = await attach(driver, FakeSerial({}))
+    notified = []
+
+    def broken(failed_id):
+        raise RuntimeError("listener bug")
+
+    driver.failure_listeners.extend([broken, notified.append])
+    driver.mark_failed(serial_id, IOError("device reset"))
+    await driver.disconnect()
+
+    assert notified == [serial_id]
@@ -0,0 +1,119 @@
+"""
+Serial Service Tests
+串口服务测试（使用内存模拟串口，无需硬件）
+"""
+
+import pytest
+import pytest_asyncio
+
+from app.services import serial_service as serial_service_module
+from app.services.serial_service import grade_response, is_at_command, serial_service
+from app.schemas.serial_schemas import BatchRequest, BatchStep, BatchStepResult, BatchSummary, BroadcastRequest
+from tests.fakes import FakeSerial, attach
+
+
+@pytest_asyncio.fixture
+async def fake_ports():
+    """在全局串口驱动上注册两个模拟串口"""
+    driver = serial_service_module.serial_driver
+    first = FakeSerial({
+        b"AT+MAC?\r\n": b"026501123456\r\nOK\r\n",
+        b"Eeprom\r\n": b"EEPROM Test OK\r\n",
+    })
+    second = FakeSerial({b"S485B\r\n": b"485BOK\r\n", bytes.fromhex("0102"): bytes.fromhex("0304")})
+    await attach(driver, first, 1)
+    await attach(driver, second, 2)
+    yield first, second
+    await driver.disconnect()
+
+
+def test_grade_response():
+    """期望值包含判定与无期望值判定"""
+    assert grade_response("LED1OK\r\n", "LED1OK\r\n") == (True, "expected_match")
+    assert grade_response("LED1OK", "LED2OK\r\n") == (False, "expected_mismatch")
+    assert grade_response("", "OK\r\n") == (True, "has_response")
+    assert grade_response("", "") == (False, "no_response")
+
+
+@pytest.mark.asyncio
+async def test_custom_command_without_result_code_ends_on_idle_gap(fake_ports):
+    """自定义指令的响应没有 OK/ERROR 时按串口空闲间隔结束，不等满超时；AT指令仍等待结果码"""
+    first, _ = fake_ports
+    first.responses[b"LED1\r\n"] = b"LED1FAIL\r\n"
+    first.responses[b"AT+SLOW\r\n"] = b"AT+SLOW\r\n"
+
+    response = await serial_service.send_at_command("LED1", 1, read_timeout=2.0)
+    assert response.received_data == "LED1FAIL\r\n"
+    assert response.matched is None and response.elapsed_ms < 500
+
+    response = await serial_service.send_at_command("AT+SLOW", 1, read_timeout=0.3)
+    assert response.received_data == "AT+SLOW\r\n" and response.elapsed_ms >= 300
+    assert is_at_command(" at+gmr") and not is_at_command("Eeprom")
+
+
+@pytest.mark.asyncio
+async def test_run_batch_streams_steps_and_summary(fake_ports):
+    """批量执行按顺序产出每一步结果，最后产出汇总"""
+    request = BatchRequest(
+        serial_id=1,
+        steps=[
+            BatchStep(name="获取MAC", data="AT+MAC?", expected_response="026501123456"),
+            BatchStep(name="EEPROM", data="Eeprom", expected_response="EEPROM Test OK"),
+            BatchStep(name="485", data="S485B", target_serial_id=2, expected_response="485BOK"),
+            BatchStep(name="HEX", data="0102", send_as_hex=True, target_serial_id=2),
+        ],
+    )
+
+    items = [item async for item in serial_service.run_batch(request)]
+
+    steps = [item for item in items if isinstance(item, BatchStepResult)]
+    assert [step.is_ok for step in steps] == [True, True, True, True]
+    assert [step.serial_id for step in steps] == [1, 1, 2, 2]
+    assert steps[3].received_data == "0304"
+    assert isinstance(items[-1], BatchSummary)
+    assert items[-1].passed_steps == 4
+
+
+@pytest.mark.asyncio
+async def test_run_batch_stop_on_failure(fake_ports):
+    """stop_on_failure 时第一个失败步骤之后不再执行"""
+    request = BatchRequest(
+        serial_id=1,
+        stop_on_failure=True,
+        steps=[
+            BatchStep(data="AT+MAC?", expected_response="FFFFFFFFFFFF", read_timeout=0.2),
+            BatchStep(data="Eeprom"),
+        ],
+    )
+
+    items = [item async for item in serial_service.run_batch(request)]
+
+    assert len(items) == 2
+    assert items[0].reason == "expected_mismatch"
+    assert items[-1].executed_steps == 1
+    assert fake_ports[0].writes == [b"AT+MAC?\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_runs_ports_concurrently(fake_ports):
+    """广播并行发送到所有串口，慢串口按 port_timeout 超时，不拖慢其他串口"""
+    driver = serial_service_module.serial_driver
+    slow = FakeSerial({b"AT+GMR\r\n": b"V1.0\r\nOK\r\n"}, delay=2.0)
+    await attach(driver, slow, 3)
+    for fake in fake_ports:
+        fake.responses[b"AT+GMR\r\n"] = b"V1.0\r\nOK\r\n"
+        fake.delay = 0.2
+
+    response = await serial_service.broadcast(
+        BroadcastRequest(data="AT+GMR", expected_response="V1.0", port_timeout=0.5, read_timeout=3.0)
+    )
+
+    assert [result.serial_id for result in response.results] == [1, 2, 3]
+    assert [result.is_ok for result in response.results] == [True, True, False]
+    assert (response.passed_ports, response.failed_ports) == (2, 1)
+    # 并行执行：总耗时约等于单个串口的超时，而不是各串口耗时之和
+    assert response.elapsed_ms < 900
+
+    # 指定串口（含未连接的串口）
+    response = await serial_service.broadcast(BroadcastRequest(data="AT+GMR", serial_ids=[2, 9, 2]))
+    assert [(result.serial_id, result.reason) for result in response.results] == [(2, "has_response"), (9, "error")]
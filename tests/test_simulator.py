@@ -0,0 +1,79 @@
+"""
+Simulator Tests
+虚拟 AT 设备测试：通过 SerialDriver.connect 打开伪终端，与真实串口路径一致
+"""
+
+import re
+import time
+
+import pytest
+
+from app.drivers.serial_driver import create_serial_driver
+from app.simulator import FaultConfig, ResponseRule, VirtualATDevice
+from app.simulator.device import pty
+
+pytestmark = pytest.mark.skipif(pty is None, reason="需要 POSIX 伪终端")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["executor", "asyncio"])
+async def test_driver_talks_to_virtual_device(backend):
+    """默认应答表、自定义规则与十六进制原始帧"""
+    rules = [
+        ResponseRule("AT+MAC?", "026501123456\r\nOK\r\n"),
+        ResponseRule(re.compile(r"ECHO=(.*)"), lambda command: command[5:] + "\r\nOK\r\n"),
+        ResponseRule("0102", b"\x03\x04"),
+    ]
+    with VirtualATDevice(rules) as device:
+        driver = create_serial_driver(backend)
+        serial_id = await driver.connect(device.port, baudrate=115200)
+        try:
+            result = await driver.write_read_match(serial_id, b"AT+MAC?\r\n", (b"OK\r\n",), read_timeout=1.0)
+            assert result.data == b"026501123456\r\nOK\r\n"
+            result = await driver.write_read_match(serial_id, b"ECHO=hello\r\n", (b"OK\r\n",), read_timeout=1.0)
+            assert result.data == b"hello\r\nOK\r\n"
+            assert await driver.write_read(serial_id, b"\x01\x02", read_timeout=0.3) == b"\x03\x04"
+        finally:
+            await driver.disconnect()
+    assert device.stats.commands == 3
+
+
+@pytest.mark.asyncio
+async def test_virtual_device_latency_and_baud_pacing():
+    """按指令延迟与按波特率逐字节发送"""
+    rules = [ResponseRule("SLOW", "X" * 94 + "\r\nOK\r\n", latency=0.1)]
+    with VirtualATDevice(rules, baudrate=9600) as device:
+        driver = create_serial_driver()
+        serial_id = await driver.connect(device.port, baudrate=9600)
+        try:
+            start = time.perf_counter()
+            result = await driver.write_read_match(serial_id, b"SLOW\r\n", (b"OK\r\n",), read_timeout=2.0)
+            elapsed = time.perf_counter() - start
+        finally:
+            await driver.disconnect()
+    # 0.1s 延迟 + 100 字节 @9600 约 0.104s
+    assert result.matched is not None
+    assert result.first_byte_time >= 0.1
+    assert elapsed >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_virtual_device_faults():
+    """丢包与挂断故障"""
+    faults = FaultConfig(drop_rate=1.0, disconnect_after=1)
+    with VirtualATDevice(faults=faults) as device:
+        driver = create_serial_driver()
+        serial_id = await driver.connect(device.port, baudrate=115200)
+        try:
+            result = await driver.write_read_match(serial_id, b"AT\r\n", (b"OK\r\n",), read_timeout=0.3)
+            assert result.data == b"" and result.matched is None
+            await driver.write_data(serial_id, b"AT\r\n")
+            reader = driver.readers[serial_id]
+            for _ in range(50):
+                if reader.error is not None:
+                    break
+                await driver.read_data(serial_id, 1, timeout=0.05)
+            assert reader.error is not None
+        finally:
+            await driver.disconnect()
+    assert device.stats.faults == {"drop": 1, "disconnect": 1}
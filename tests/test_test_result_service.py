@@ -0,0 +1,56 @@
+"""
+Test Result Service Tests
+测试结果保存测试：主记录与数百个测试项在一个事务中批量写入，详情与列表查询结果一致
+"""
+
+import time
+
+import pytest
+
+from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+from app.services.test_result_service import test_result_service
+
+
+@pytest.mark.asyncio
+async def test_save_large_plan_in_one_transaction(temp_engine):
+    now = int(time.time() * 1000)
+    items = [
+        TestItemResultSchema(
+            id=f"cmd-{i}", name=f"Step {i}", command=f"AT+STEP{i}", expected_response="OK",
+            actual_response="OK\r\n" if i % 7 else "ERROR\r\n", is_ok=bool(i % 7),
+            reason="expected_match" if i % 7 else "expected_mismatch", timestamp=now + i,
+            user_choice=None if i % 7 else False
+        )
+        for i in range(300)
+    ]
+    saved = await test_result_service.save_test_result(SaveTestResultRequest(
+        mac_address="AABBCCDDEEFF", test_items=items, start_time=now, end_time=now + 300,
+        total_tests=300, passed_tests=257, failed_tests=43, skipped_tests=0,
+        operator="张三", workstation="工位1", device_id="DUT-1"
+    ))
+    assert saved.total_tests == 300 and saved.operator == "张三"
+    assert saved.created_at is not None
+
+    detail = await test_result_service.get_test_result_by_id(saved.id)
+    assert detail.mac_address == "AABBCCDDEEFF" and detail.device_id == "DUT-1"
+    assert detail.end_time == saved.end_time
+    assert [item.id for item in detail.test_items] == [f"cmd-{i}" for i in range(300)]
+    assert detail.test_items[7].is_ok is False and detail.test_items[7].user_choice is False
+    assert detail.test_items[299].timestamp == now + 299
+
+    results, total = await test_result_service.get_test_results()
+    assert total == 1 and results[0].id == saved.id
+
+    stats = await test_result_service.get_failure_stats(["cmd-0", "cmd-1"])
+    assert stats == {"cmd-0": (1, 1), "cmd-1": (1, 0)}
+
+
+@pytest.mark.asyncio
+async def test_save_without_items(temp_engine):
+    now = int(time.time() * 1000)
+    saved = await test_result_service.save_test_result(SaveTestResultRequest(
+        mac_address="AABBCCDDEEFF", test_items=[], start_time=now,
+        total_tests=0, passed_tests=0, failed_tests=0, skipped_tests=0
+    ))
+    detail = await test_result_service.get_test_result_by_id(saved.id)
+    assert detail.test_items == [] and detail.end_time is None
@@ -0,0 +1,98 @@
+"""
+URC Router Tests
+主动上报分离测试：URC 行不进入指令响应，并分发给订阅者
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.events import event_bus
+from app.drivers.serial_driver import SerialDriver, serial_driver
+from app.drivers.urc_router import UrcRouter
+from app.services.urc_service import urc_service
+from tests.fakes import FakeSerial, attach
+
+PREFIXES = ["RING", "+CREG:", "+CMTI:"]
+
+
+def test_router_splits_urc_lines_across_chunks():
+    """URC 行跨数据块到达时也能完整取出，其余字节原样透传"""
+    router = UrcRouter(PREFIXES)
+    passthrough, urcs = router.feed(b"\r\n+CR")
+    assert passthrough == b"\r\n" and urcs == [] and router.holding
+    passthrough, urcs = router.feed(b"EG: 5\r\n\r\n+CSQ: 20,99\r\n\r\nOK\r\n")
+    assert passthrough == b"\r\n+CSQ: 20,99\r\n\r\nOK\r\n"
+    assert urcs == ["+CREG: 5"]
+
+    # 行中间出现的前缀不是 URC
+    passthrough, urcs = router.feed(b"LED1 RING OK\r\n")
+    assert passthrough == b"LED1 RING OK\r\n" and urcs == []
+
+
+def test_router_keeps_solicited_prefix_and_releases_stale_hold():
+    """与进行中指令同名的前缀属于响应；暂存超时的行首数据放回数据流"""
+    router = UrcRouter(PREFIXES, hold_time=0.01)
+    router.solicit(b"AT+CREG?\r\n")
+    passthrough, urcs = router.feed(b"+CREG: 0,1\r\nRING\r\nOK\r\n")
+    assert passthrough == b"+CREG: 0,1\r\nOK\r\n" and urcs == ["RING"]
+    router.release()
+
+    passthrough, _ = router.feed(b"R")
+    assert passthrough == b"" and router.flush() == b""
+    time.sleep(0.02)
+    assert router.flush() == b"R"
+    passthrough, urcs = router.feed(b"ING\r\n")
+    assert passthrough == b"ING\r\n" and urcs == []
+
+
+@pytest.mark.asyncio
+async def test_urc_during_transaction_does_not_disturb_response():
+    """事务进行中到达的 URC 不混入响应，并回调给驱动的 URC 订阅者"""
+    driver = SerialDriver()
+    received = []
+    driver.urc_listeners.append(lambda serial_id, line: received.append((serial_id, line)))
+    connection = FakeSerial({
+        b"AT+CSQ\r\n": b"\r\n+CMTI: \"SM\",3\r\n\r\n+CSQ: 20,99\r\n\r\nOK\r\n",
+        b"AT+CREG?\r\n": b"\r\n+CREG: 0,1\r\n\r\nOK\r\n",
+    })
+    serial_id = await attach(driver, connection)
+    try:
+        result = await driver.write_read_match(serial_id, b"AT+CSQ\r\n", (b"\r\nOK\r\n",), read_timeout=0.5)
+        assert result.data == b"\r\n\r\n+CSQ: 20,99\r\n\r\nOK\r\n"
+
+        result = await driver.write_read_match(serial_id, b"AT+CREG?\r\n", (b"\r\nOK\r\n",), read_timeout=0.5)
+        assert b"+CREG: 0,1" in result.data
+    finally:
+        await driver.disconnect()
+    assert received == [(serial_id, "+CMTI: \"SM\",3")]
+
+
+@pytest.mark.asyncio
+async def test_urc_service_delivers_to_websocket_and_subscribers():
+    """URC 通过事件总线推送给 WebSocket，并分发给进程内订阅者"""
+    messages = []
+
+    async def collect(message):
+        messages.append(message)
+
+    events = []
+    event_bus.subscribe(collect)
+    unsubscribe = urc_service.subscribe(events.append)
+    connection = FakeSerial({})
+    serial_id = await attach(serial_driver, connection, 7)
+    try:
+        connection.feed(b"\r\nRING\r\n")
+        for _ in range(50):
+            if messages:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        unsubscribe()
+        event_bus.unsubscribe(collect)
+        await serial_driver.disconnect()
+
+    assert [(event.serial_id, event.line) for event in events] == [(serial_id, "RING")]
+    assert messages[0]["type"] == "urc" and messages[0]["serial_id"] == serial_id
+    assert urc_service.get_recent(serial_id)[-1].line == "RING"
@@ -0,0 +1,227 @@
+"""
+Workflow Service Tests
+后端工作流测试（内存模拟串口 + 临时 SQLite 数据库）
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from app.core.events import event_bus
+from app.schemas.command_schemas import CreateCommandRequest, SavedCommand, UpdateCommandRequest
+from app.schemas.test_result_schemas import SaveTestResultRequest, TestItemResultSchema
+from app.schemas.workflow_schemas import TestPlanCreateRequest, WorkflowRunRequest, WorkflowRunState
+from app.services import serial_service as serial_service_module
+from app.services.command_service import command_service
+from app.services.latency_service import latency_service
+from app.services.plan_optimizer import fail_fast_order
+from app.services.test_result_service import test_result_service
+from app.services.workflow_service import workflow_service
+from tests.fakes import FakeSerial, attach
+
+
+@pytest_asyncio.fixture
+async def fake_port():
+    driver = serial_service_module.serial_driver
+    port = FakeSerial({
+        b"AT+MAC=AABBCCDDEEFF\r\n": b"OK\r\n",
+        b"LED1\r\n": b"LED1OK\r\n",
+        b"Eeprom\r\n": b"EEPROM FAIL\r\n",
+    })
+    await attach(driver, port, 1)
+    yield port
+    await driver.disconnect()
+
+
+@pytest.fixture
+def events():
+    """收集事件总线上的工作流消息"""
+    received = []
+
+    async def collect(message):
+        received.append(message)
+
+    event_bus.subscribe(collect)
+    yield received
+    event_bus.unsubscribe(collect)
+
+
+async def create_commands(*commands):
+    """创建指令，返回指令ID列表"""
+    ids = []
+    for name, command, expected, notify in commands:
+        created = await command_service.create_command(CreateCommandRequest(
+            name=name, command=command, expected_response=expected,
+            show_notification=notify, description="请观察LED是否点亮" if notify else ""
+        ))
+        ids.append(created.id)
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_workflow_runs_plan_and_saves_result(temp_engine, fake_port, events):
+    """按计划顺序执行、替换MAC占位符、失败即停并保存结果"""
+    ids = await create_commands(
+        ("写MAC", "AT+MAC=026501123456", "OK", False),
+        ("EEPROM", "Eeprom", "EEPROM Test OK", False),
+        ("LED", "LED1", "LED1OK", False),
+    )
+    plan = await workflow_service.create_plan(TestPlanCreateRequest(name="整机测试", command_ids=ids))
+
+    status = await workflow_service.start_run(WorkflowRunRequest(
+        plan_id=plan.id, mac_address="AABBCCDDEEFF", serial_id=1, stop_on_failure=True
+    ))
+    await workflow_service.runs[status.run_id].task
+
+    status = workflow_service.get_run(status.run_id)
+    assert status.state == WorkflowRunState.COMPLETED
+    assert (status.passed_tests, status.failed_tests, status.skipped_tests) == (1, 1, 1)
+    assert fake_port.writes == [b"AT+MAC=AABBCCDDEEFF\r\n", b"Eeprom\r\n"]
+
+    saved = await test_result_service.get_test_result_by_id(status.test_result_id)
+    assert [item.reason for item in saved.test_items] == ["expected_match", "expected_mismatch", "skipped"]
+    await workflow_service.flush_events()
+    assert [event["data"]["event"] for event in events] == ["started", "step", "step", "finished"]
+
+
+@pytest.mark.asyncio
+async def test_workflow_waits_for_operator_confirmation(temp_engine, fake_port, events):
+    """需要人工确认的步骤等待确认结果后再继续"""
+    ids = await create_commands(("LED", "LED1", "LED1OK", True))
+    plan = await workflow_service.create_plan(TestPlanCreateRequest(name="LED", command_ids=ids))
+    status = await workflow_service.start_run(WorkflowRunRequest(plan_id=plan.id, mac_address="AABBCCDDEEFF", serial_id=1))
+
+    for _ in range(100):
+        if workflow_service.get_run(status.run_id).state == WorkflowRunState.WAITING_CONFIRMATION:
+            break
+        await asyncio.sleep(0.01)
+    assert workflow_service.confirm_step(status.run_id, False)
+    await workflow_service.runs[status.run_id].task
+
+    status = workflow_service.get_run(status.run_id)
+    assert status.failed_tests == 1
+    await workflow_service.flush_events()
+    assert "confirm_required" in [event["data"]["event"] for event in events]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_slow_run(temp_engine, fake_port):
+    """进度事件在后台按顺序推送，慢客户端不阻塞工作流执行"""
+    received = []
+
+    async def slow_client(message):
+        await asyncio.sleep(0.2)
+        received.append(message["data"]["event"])
+
+    ids = await create_commands(("LED1", "LED1", "LED1OK", False), ("LED2", "LED1", "LED1OK", False))
+    plan = await workflow_service.create_plan(TestPlanCreateRequest(name="LED", command_ids=ids))
+    event_bus.subscribe(slow_client)
+    try:
+        start = time.perf_counter()
+        status = await workflow_service.run(WorkflowRunRequest(plan_id=plan.id, mac_address="AABBCCDDEEFF", serial_id=1))
+        elapsed = time.perf_counter() - start
+        await workflow_service.flush_events()
+    finally:
+        event_bus.unsubscribe(slow_client)
+
+    assert status.state == WorkflowRunState.COMPLETED
+    assert elapsed < 0.4
+    assert received == ["started", "step", "step", "finished"]
+
+
+def test_fail_fast_order_keeps_pinned_steps():
+    """固定步骤保持原位置，其余步骤按 失败概率/耗时 降序"""
+    commands = [
+        SavedCommand(id=command_id, name=command_id, command=command_id, created_at=datetime.now())
+        for command_id in ("mac", "slow", "fast", "flaky")
+    ]
+    stats = {"mac": (10, 0), "slow": (10, 5), "fast": (10, 5), "flaky": (10, 1)}
+    durations = {"slow": 2.0, "fast": 0.5, "flaky": 0.2}
+
+    ordered = fail_fast_order(commands, stats, durations, pinned={"mac"})
+    assert [command.id for command in ordered] == ["mac", "fast", "flaky", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_workflow_runs_likely_failures_first(temp_engine, fake_port):
+    """按历史失败率重排步骤，首个硬失败即结束"""
+    latency_service.reset()
+    ids = await create_commands(
+        ("写MAC", "AT+MAC=026501123456", "OK", False),
+        ("LED", "LED1", "LED1OK", False),
+        ("EEPROM", "Eeprom", "EEPROM Test OK", False),
+    )
+    plan = await workflow_service.create_plan(TestPlanCreateRequest(
+        name="整机测试", command_ids=ids, pinned_command_ids=[ids[0]]
+    ))
+
+    # 历史记录：EEPROM 经常失败，LED 总是通过
+    now = int(time.time() * 1000)
+    for _ in range(5):
+        items = [
+            TestItemResultSchema(id=ids[1], name="LED", command="LED1", expected_response="LED1OK",
+                                 is_ok=True, reason="expected_match", timestamp=now),
+            TestItemResultSchema(id=ids[2], name="EEPROM", command="Eeprom", expected_response="EEPROM Test OK",
+                                 is_ok=False, reason="expected_mismatch", timestamp=now),
+        ]
+        await test_result_service.save_test_result(SaveTestResultRequest(
+            mac_address="AABBCCDDEEFF", test_items=items, start_time=now, end_time=now,
+            total_tests=2, passed_tests=1, failed_tests=1, skipped_tests=0
+        ))
+
+    status = await workflow_service.run(WorkflowRunRequest(
+        plan_id=plan.id, mac_address="AABBCCDDEEFF", serial_id=1,
+        optimize_order=True, abort_on_hard_failure=True
+    ))
+
+    assert status.command_ids == [ids[0], ids[2], ids[1]]
+    assert fake_port.writes == [b"AT+MAC=AABBCCDDEEFF\r\n", b"Eeprom\r\n"]
+    assert (status.passed_tests, status.failed_tests, status.skipped_tests) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_dependency_plan_runs_independent_ports_concurrently(temp_engine):
+    """依赖计划：不同串口上相互独立的步骤并发执行，前置步骤失败的步骤跳过"""
+    driver = serial_service_module.serial_driver
+    main_port = FakeSerial({
+        b"AT+MAC=AABBCCDDEEFF\r\n": b"OK\r\n",
+        b"AT+MAC?\r\n": b"AABBCCDDEEFF\r\nOK\r\n",
+    }, delay=0.2)
+    aux_port = FakeSerial({b"LED1\r\n": b"LED1OK\r\n", b"Eeprom\r\n": b"EEPROM FAIL\r\nERROR\r\n"}, delay=0.2)
+    await attach(driver, main_port, 1)
+    await attach(driver, aux_port, 2)
+    try:
+        ids = await create_commands(
+            ("写MAC", "AT+MAC=026501123456", "OK", False),
+            ("读MAC", "AT+MAC?", "OK", False),
+            ("EEPROM", "Eeprom", "EEPROM Test OK", False),
+            ("LED", "LED1", "LED1OK", False),
+        )
+        for command_id, serial_id in zip(ids, (1, 1, 2, 2)):
+            await command_service.update_command(command_id, UpdateCommandRequest(target_serial_id=serial_id))
+        write_mac, read_mac, eeprom, led = ids
+        plan = await workflow_service.create_plan(TestPlanCreateRequest(
+            name="多串口", command_ids=ids, dependencies={read_mac: [write_mac], led: [eeprom]}
+        ))
+
+        start = time.perf_counter()
+        status = await workflow_service.run(WorkflowRunRequest(plan_id=plan.id, mac_address="AABBCCDDEEFF"))
+        elapsed = time.perf_counter() - start
+    finally:
+        await driver.disconnect()
+
+    assert elapsed < 0.7  # 两个串口各两步串行需 0.8 秒
+    assert main_port.writes == [b"AT+MAC=AABBCCDDEEFF\r\n", b"AT+MAC?\r\n"]
+    assert aux_port.writes == [b"Eeprom\r\n"]
+    saved = await test_result_service.get_test_result_by_id(status.test_result_id)
+    assert [item.reason for item in saved.test_items] == [
+        "expected_match", "expected_match", "expected_mismatch", "skipped"
+    ]
+
+
+def test_plan_dependencies_reject_cycles():
+    with pytest.raises(ValueError, match="循环"):
+        TestPlanCreateRequest(name="环", command_ids=["a", "b"], dependencies={"a": ["b"], "b": ["a"]})